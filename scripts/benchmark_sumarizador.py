@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Mede o tempo e a memória do sumarizador sobre uma árvore de resultados
+sintéticos (veja gerar_resultados_sinteticos.py).
+
+Cada estágio é executado em um processo próprio, do qual são medidos o tempo
+de parede, o tempo de CPU (usuário + sistema) e o pico de memória residente
+(RSS), obtidos com os.wait4:
+  - geracao: geração da árvore, só quando ela ainda não existe (ou com
+    parâmetros diferentes);
+  - carga_csv: leitura de todas as rodadas de todos os testes a partir dos
+    CSVs, sem o cache binário (.cache/ das rodadas);
+  - carga_cache: a mesma leitura, com o cache já gravado;
+  - sumarizacao: sumarizador completo, redesenhando todos os gráficos
+    (--refazer);
+  - sumarizacao_incremental: sumarizador novamente, reaproveitando os
+    gráficos do manifesto.
+
+Com --repeticoes N, cada estágio (exceto a geração) é repetido N vezes e é
+registrada a mediana. Os resultados são acrescentados, uma linha JSON por
+execução, ao arquivo de --resultados, com o commit do git, as versões do
+Python, NumPy e pandas e os parâmetros do cenário, e comparados com a última
+execução anterior do mesmo cenário.
+
+Uso:
+    benchmark_sumarizador.py [--testes N] [--rodadas N] [--duracao S] [--nucleos N]
+        [--arvore DIR] [--repeticoes N] [-j N] [--resultados ARQ] [--estagios ...]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import platform
+import argparse
+import subprocess
+from datetime import datetime
+
+import numpy as np
+
+import gerar_resultados_sinteticos as sintetico
+
+DIR_SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+SUMARIZADOR = os.path.join(DIR_SCRIPTS, "sumarizar-experimento.py")
+ESTAGIOS = ("carga_csv", "carga_cache", "sumarizacao", "sumarizacao_incremental")
+RESULTADOS_PADRAO = "benchmark_sumarizador.jsonl"
+
+# Leitura de todas as rodadas, executada em um processo à parte
+CODIGO_CARGA = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from experiment_data import load_test_data
+for teste in sys.argv[3:]:
+    load_test_data(sys.argv[2], teste)
+"""
+
+
+def run_measured(comando, saida=subprocess.DEVNULL):
+    """
+    Executa 'comando' e retorna {"parede", "cpu", "rss_mb"}: tempo de parede
+    e de CPU (s) e pico de memória residente (MiB) do processo.
+    """
+    with tempfile.TemporaryFile() as erros:
+        inicio = time.perf_counter()
+        processo = subprocess.Popen(comando, stdout=saida, stderr=erros)
+        _, status, uso = os.wait4(processo.pid, 0)
+        parede = time.perf_counter() - inicio
+        processo.returncode = os.waitstatus_to_exitcode(status)
+        if processo.returncode != 0:
+            erros.seek(0)
+            raise RuntimeError(f"'{' '.join(comando[:3])} ...' terminou com o código {processo.returncode}:\n"
+                               f"{erros.read().decode(errors='replace')}")
+    # ru_maxrss é informado em KiB no Linux (e em bytes no macOS)
+    rss = uso.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {"parede": parede, "cpu": uso.ru_utime + uso.ru_stime, "rss_mb": rss}
+
+
+def median_of(medicoes):
+    return {chave: float(np.median([m[chave] for m in medicoes])) for chave in medicoes[0]}
+
+
+def clear_caches(arvore, testes):
+    for teste in testes:
+        test_dir = os.path.join(arvore, teste)
+        for rodada in os.listdir(test_dir):
+            shutil.rmtree(os.path.join(test_dir, rodada, ".cache"), ignore_errors=True)
+
+
+def prepare_tree(arvore, cenario, jobs):
+    """Gera a árvore se ela não existir com os mesmos parâmetros. Retorna (testes, medição ou None)."""
+    marcador = os.path.join(arvore, sintetico.MARCADOR)
+    try:
+        with open(marcador, encoding="utf-8") as f:
+            if json.load(f) == cenario:
+                return [sintetico.test_name(i) for i in range(cenario["testes"])], None
+    except (OSError, ValueError):
+        pass
+    shutil.rmtree(arvore, ignore_errors=True)
+    comando = [sys.executable, os.path.join(DIR_SCRIPTS, "gerar_resultados_sinteticos.py"), "-d", arvore, "-j", str(jobs)]
+    for chave, valor in cenario.items():
+        if isinstance(valor, bool):
+            comando += [f"--{chave.replace('_', '-')}"] if valor else []
+        else:
+            comando += [f"--{chave.replace('_gbps', '')}", str(valor)]
+    medicao = run_measured(comando)
+    return [sintetico.test_name(i) for i in range(cenario["testes"])], medicao
+
+
+def run_stage(estagio, arvore, testes, jobs):
+    carga = [sys.executable, "-c", CODIGO_CARGA, DIR_SCRIPTS, arvore, *testes]
+    sumarizador = [sys.executable, SUMARIZADOR, "-d", arvore, "-j", str(jobs)]
+    for teste in testes:
+        sumarizador += ["-t", teste]
+    if estagio == "carga_csv":
+        clear_caches(arvore, testes)
+        return run_measured(carga)
+    if estagio == "carga_cache":
+        return run_measured(carga)
+    if estagio == "sumarizacao":
+        return run_measured(sumarizador + ["--refazer"])
+    return run_measured(sumarizador)
+
+
+def git_version():
+    """Commit atual (com '-modificado' se houver alterações não commitadas), ou None fora de um repositório."""
+    try:
+        commit = subprocess.run(["git", "-C", DIR_SCRIPTS, "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True, check=True).stdout.strip()
+        alterado = subprocess.run(["git", "-C", DIR_SCRIPTS, "status", "--porcelain", "--untracked-files=no"],
+                                  capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-modificado" if alterado else "")
+
+
+def library_versions():
+    import pandas
+    return {"python": platform.python_version(), "numpy": np.__version__, "pandas": pandas.__version__}
+
+
+def previous_result(arquivo, cenario, jobs):
+    """Última execução registrada em 'arquivo' com o mesmo cenário e a mesma quantidade de processos."""
+    anterior = None
+    try:
+        with open(arquivo, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    continue
+                if registro.get("cenario") == cenario and registro.get("jobs") == jobs:
+                    anterior = registro
+    except OSError:
+        pass
+    return anterior
+
+
+def print_results(registro, anterior):
+    print(f"\nCenário: {registro['cenario']['testes']} testes × {registro['cenario']['rodadas']} rodadas × "
+          f"{registro['cenario']['duracao']} s × {registro['cenario']['nucleos']} núcleos (-j {registro['jobs']})")
+    if anterior:
+        print(f"Comparação com {anterior.get('versao') or 'versão desconhecida'} ({anterior['data']})")
+    print(f"{'Estágio':<26}{'Parede (s)':>12}{'CPU (s)':>10}{'RSS (MiB)':>11}{'Variação':>11}")
+    for estagio, m in registro["estagios"].items():
+        variacao = ""
+        if anterior and estagio in anterior["estagios"] and anterior["estagios"][estagio]["parede"] > 0:
+            variacao = f"{100 * (m['parede'] / anterior['estagios'][estagio]['parede'] - 1):+.1f}%"
+        print(f"{estagio:<26}{m['parede']:>12.2f}{m['cpu']:>10.2f}{m['rss_mb']:>11.1f}{variacao:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o tempo e a memória do sumarizador sobre resultados sintéticos.")
+    parser.add_argument("--testes", type=int, default=10, help="Quantidade de testes (padrão: 10).")
+    parser.add_argument("--rodadas", type=int, default=5, help="Rodadas por teste (padrão: 5).")
+    parser.add_argument("--duracao", type=int, default=60, help="Duração de cada rodada, em segundos (padrão: 60).")
+    parser.add_argument("--nucleos", type=int, default=8, help="Quantidade de núcleos (padrão: 8).")
+    parser.add_argument("--protocolo", choices=("tcp", "udp", "misto"), default="misto", help="Protocolo dos testes (padrão: misto).")
+    parser.add_argument("--fluxos", type=int, default=1, help="Fluxos paralelos de cada teste (padrão: 1).")
+    parser.add_argument("--arvore", help="Diretório da árvore sintética (padrão: benchmark-<cenário> no diretório temporário).")
+    parser.add_argument("--estagios", nargs="+", choices=ESTAGIOS, default=list(ESTAGIOS), help="Estágios medidos (padrão: todos).")
+    parser.add_argument("--repeticoes", type=int, default=1, help="Repetições de cada estágio; é registrada a mediana (padrão: 1).")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Processos do sumarizador e da geração (padrão: 1).")
+    parser.add_argument("--resultados", default=RESULTADOS_PADRAO,
+                        help=f"Arquivo JSON Lines onde os resultados são acrescentados (padrão: {RESULTADOS_PADRAO}).")
+    args = parser.parse_args()
+
+    cenario = {"testes": args.testes, "rodadas": args.rodadas, "duracao": args.duracao, "nucleos": args.nucleos,
+               "protocolo": args.protocolo, "fluxos": args.fluxos, "vazao_gbps": 10.0, "mpstat_log": False, "semente": 0}
+    arvore = args.arvore or os.path.join(
+        os.environ.get("TMPDIR", "/tmp"),
+        f"benchmark-{args.testes}x{args.rodadas}x{args.duracao}x{args.nucleos}-{args.protocolo}-{args.fluxos}")
+
+    testes, geracao = prepare_tree(arvore, cenario, args.jobs)
+    estagios = {}
+    if geracao:
+        estagios["geracao"] = geracao
+    for estagio in args.estagios:
+        medicoes = []
+        for _ in range(max(1, args.repeticoes)):
+            medicoes.append(run_stage(estagio, arvore, testes, args.jobs))
+        estagios[estagio] = median_of(medicoes)
+        print(f"{estagio}: {estagios[estagio]['parede']:.2f} s", flush=True)
+
+    registro = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "versao": git_version(),
+        "host": platform.node(),
+        "bibliotecas": library_versions(),
+        "cenario": cenario,
+        "jobs": args.jobs,
+        "repeticoes": args.repeticoes,
+        "estagios": estagios,
+    }
+    anterior = previous_result(args.resultados, cenario, args.jobs)
+    with open(args.resultados, "a", encoding="utf-8") as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    print_results(registro, anterior)
+    print(f"\nResultados acrescentados a {args.resultados}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Renderização dos gráficos do sumarizador.
+
+Cada gráfico é descrito por um ChartSpec, que guarda apenas dados: o tamanho
+da figura, a sequência de chamadas aos eixos (bar, text, set_ylabel, ...) e os
+caminhos de saída. A renderização usa a API orientada a objetos do Matplotlib
+(Figure), sem o estado global do pyplot, e por isso pode ser executada tanto
+no próprio processo quanto em um conjunto de processos (--jobs N).
+
+Como o ChartSpec contém os próprios dados desenhados, o seu hash identifica o
+gráfico: se os CSV/INI de entrada e os parâmetros (-i, -m, -o, --inverter,
+-c) não mudaram, o hash é o mesmo. Esses hashes ficam registrados em um
+manifesto no diretório sumarizado-*, e gráficos cujo hash e arquivos de saída
+não mudaram desde a última execução não são redesenhados.
+
+O Matplotlib só é importado quando o primeiro gráfico é desenhado, de modo
+que o sumarizador com --sem-graficos (veja disable_charts) não o carrega.
+"""
+import hashlib
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from perfil import record
+
+# Saída reprodutível: o SVG não recebe data e os identificadores internos
+# usam sempre o mesmo sal, de modo que os modos serial e paralelo gerem
+# arquivos idênticos byte a byte.
+SVG_HASHSALT = "sumarizar-experimento"
+SVG_METADATA = {"Date": None}
+# Resolução das figuras (a padrão do Matplotlib): as séries temporais são
+# reduzidas à largura do gráfico em pixels antes do desenho (veja pixel_width)
+DPI = 100
+
+# Nome do manifesto gravado no diretório sumarizado-*
+MANIFESTO = "manifesto.json"
+
+
+@dataclass
+class ChartSpec:
+    """Especificação de um gráfico: chamadas aos eixos e arquivos de saída."""
+    png_path: str
+    svg_path: str
+    figsize: tuple = (8, 6)
+    calls: list = field(default_factory=list)
+    nrows: int = 1  # painéis empilhados, com o eixo x compartilhado
+
+    def call(self, method, *args, **kwargs):
+        """
+        Registra uma chamada a um método de matplotlib.axes.Axes. A chamada
+        especial "colorbar" desenha a barra de cores do último elemento
+        desenhado nos eixos (ex.: imshow).
+        """
+        self.calls.append((method, args, kwargs))
+
+    def call_at(self, painel, method, *args, **kwargs):
+        """Registra uma chamada aos eixos do painel de índice 'painel'."""
+        if painel == 0:
+            self.call(method, *args, **kwargs)
+        else:
+            self.calls.append((method, args, kwargs, painel))
+
+    def pixel_width(self):
+        """Largura da figura em pixels."""
+        return int(self.figsize[0] * DPI)
+
+    def fingerprint(self):
+        """Hash do conteúdo do gráfico (tamanho, chamadas e dados)."""
+        conteudo = (self.figsize, self.calls) if self.nrows == 1 else (self.figsize, self.nrows, self.calls)
+        return hashlib.sha256(pickle.dumps(conteudo, protocol=4)).hexdigest()
+
+
+def _chart_kind(spec):
+    """Tipo do gráfico, pelo fim do nome do arquivo (ex.: vazao_temporal)."""
+    return os.path.splitext(os.path.basename(spec.png_path))[0].rsplit("-", 1)[-1]
+
+
+def render_chart(spec):
+    """
+    Desenha o gráfico descrito em 'spec' e o salva em PNG e SVG. Retorna o
+    pid do processo e, para cada etapa (desenho, png e svg), o instante de
+    início (µs desde a época), o tempo de parede e o de CPU (µs), usados
+    por --perfil.
+    """
+    import matplotlib
+    from matplotlib.figure import Figure
+
+    matplotlib.rcParams["svg.hashsalt"] = SVG_HASHSALT
+    tempos = []
+
+    def marca(etapa, inicio, parede, cpu):
+        tempos.append((etapa, inicio, (time.perf_counter() - parede) * 1e6, (time.process_time() - cpu) * 1e6))
+        return time.time_ns() // 1000, time.perf_counter(), time.process_time()
+
+    atual = (time.time_ns() // 1000, time.perf_counter(), time.process_time())
+    fig = Figure(figsize=spec.figsize, dpi=DPI)
+    eixos = fig.subplots(spec.nrows, 1, sharex=True, squeeze=False)[:, 0]
+    ultimo = None
+    for method, args, kwargs, *painel in spec.calls:
+        eixo = eixos[painel[0] if painel else 0]
+        if method == "colorbar":
+            fig.colorbar(ultimo, ax=eixo, *args, **kwargs)
+        else:
+            ultimo = getattr(eixo, method)(*args, **kwargs)
+    fig.tight_layout()
+    atual = marca("desenho", *atual)
+    fig.savefig(spec.png_path)
+    atual = marca("png", *atual)
+    fig.savefig(spec.svg_path, metadata=SVG_METADATA)
+    marca("svg", *atual)
+    return os.getpid(), tempos
+
+
+def _file_stamp(path):
+    """Tamanho e data de modificação de um arquivo, ou None se não existir."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class ChartManifest:
+    """
+    Manifesto dos gráficos já gerados: para cada PNG, o hash do ChartSpec e o
+    tamanho/data dos arquivos PNG e SVG gravados. Um gráfico está atualizado
+    quando o hash coincide e os arquivos não foram alterados por outra
+    execução (por exemplo, uma sumarização com outro conjunto de testes).
+    """
+    VERSAO = 1
+
+    def __init__(self, path, carregar=True):
+        self.path = path
+        self.base_dir = os.path.dirname(path)
+        self.graficos = {}
+        if not carregar:
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                dados = json.load(f)
+            if dados.get("versao") == self.VERSAO:
+                self.graficos = dados.get("graficos", {})
+        except (OSError, ValueError):
+            pass
+
+    def _key(self, spec):
+        return os.path.relpath(spec.png_path, self.base_dir)
+
+    def is_current(self, spec, fingerprint):
+        entrada = self.graficos.get(self._key(spec))
+        return (
+            entrada is not None
+            and entrada.get("hash") == fingerprint
+            and entrada.get("png") == _file_stamp(spec.png_path)
+            and entrada.get("svg") == _file_stamp(spec.svg_path)
+        )
+
+    def record(self, spec, fingerprint):
+        self.graficos[self._key(spec)] = {
+            "hash": fingerprint,
+            "png": _file_stamp(spec.png_path),
+            "svg": _file_stamp(spec.svg_path),
+        }
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"versao": self.VERSAO, "graficos": self.graficos}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class ChartRenderer:
+    """
+    Executa os gráficos submetidos. Com jobs <= 1, cada gráfico é desenhado
+    imediatamente; caso contrário, é enviado a um ProcessPoolExecutor.
+    Se houver um manifesto, gráficos atualizados são ignorados. Com
+    ativo=False, os gráficos submetidos são descartados.
+    """
+    def __init__(self, jobs=1, manifest=None, ativo=True):
+        self.executor = ProcessPoolExecutor(max_workers=jobs) if ativo and jobs > 1 else None
+        self.manifest = manifest
+        self.ativo = ativo
+        self.futures = []
+        self.rendered = 0
+        self.skipped = 0
+
+    def submit(self, spec):
+        if not self.ativo:
+            return
+        fingerprint = None
+        if self.manifest is not None:
+            fingerprint = spec.fingerprint()
+            if self.manifest.is_current(spec, fingerprint):
+                self.skipped += 1
+                return
+        if self.executor is None:
+            self._done(spec, fingerprint, render_chart(spec))
+        else:
+            self.futures.append((spec, fingerprint, self.executor.submit(render_chart, spec)))
+
+    def _done(self, spec, fingerprint, tempos):
+        pid, etapas = tempos
+        for etapa, inicio, parede, cpu in etapas:
+            record(etapa, "grafico", inicio, parede, cpu, pid=pid, tid=0,
+                   arquivo=os.path.basename(spec.png_path), tipo=_chart_kind(spec))
+        self.rendered += 1
+        if self.manifest is not None:
+            self.manifest.record(spec, fingerprint)
+
+    def close(self):
+        """Aguarda os gráficos pendentes, grava o manifesto e propaga eventuais erros."""
+        try:
+            for spec, fingerprint, future in self.futures:
+                self._done(spec, fingerprint, future.result())
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+            self.futures = []
+            if self.manifest is not None:
+                self.manifest.save()
+
+
+_renderer = ChartRenderer()
+
+
+def set_jobs(jobs, manifest_path=None, refazer=False):
+    """
+    Define quantos processos serão usados para renderizar os gráficos e,
+    opcionalmente, o manifesto usado para evitar redesenhar gráficos. Com
+    refazer=True o manifesto existente é ignorado (mas regravado ao final).
+    """
+    global _renderer
+    _renderer.close()
+    manifest = ChartManifest(manifest_path, carregar=not refazer) if manifest_path else None
+    _renderer = ChartRenderer(jobs, manifest)
+
+
+def disable_charts():
+    """Descarta todos os gráficos submetidos daqui em diante (--sem-graficos)."""
+    global _renderer
+    _renderer.close()
+    _renderer = ChartRenderer(ativo=False)
+
+
+def submit_chart(spec):
+    _renderer.submit(spec)
+
+
+def wait_charts():
+    """Aguarda os gráficos pendentes e retorna (desenhados, reaproveitados)."""
+    _renderer.close()
+    return _renderer.rendered, _renderer.skipped
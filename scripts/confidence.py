@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Intervalos de confiança de 95% das médias calculadas pelo sumarizador.
+
+Métodos disponíveis (METODOS):
+  - t: distribuição t de Student com n - 1 graus de liberdade (padrão). Com
+    as 3 a 5 rodadas típicas, o quantil é de 2,78 a 4,30, e não 1,96;
+  - normal: aproximação normal, 1,96·s/√n;
+  - bootstrap: intervalo percentil (2,5% e 97,5%) das médias de
+    REAMOSTRAGENS_PADRAO reamostragens com reposição. Como o sumarizador
+    apresenta os intervalos como média ± meia largura, é usada a metade da
+    distância entre os dois percentis.
+
+As funções recebem as amostras no eixo 'axis' de um array com qualquer
+quantidade de métricas nos demais eixos (ex.: rodadas × núcleos), e todas as
+métricas são tratadas de uma só vez; NaN indica uma amostra ausente. No
+bootstrap, as médias de todas as reamostragens de todas as métricas saem de
+um único produto matricial (reamostragens × amostras) · (amostras × métricas),
+e a semente é fixa, de modo que os gráficos sejam reprodutíveis.
+
+Séries longas (as medições dentro de uma rodada e os passos dos gráficos
+temporais) usam o quantil t mesmo com o bootstrap (bootstrap=False): com
+dezenas ou centenas de amostras, os dois intervalos praticamente coincidem, e
+reamostrar cada uma delas dominaria o tempo da sumarização.
+"""
+import numpy as np
+
+METODOS = ("t", "normal", "bootstrap")
+METODO_PADRAO = "t"
+REAMOSTRAGENS_PADRAO = 10000
+SEMENTE = 0
+
+# Quantil bilateral de 95% (0,975) da t de Student para 1 a 30 graus de liberdade
+_QUANTIS_T = np.array([
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+])
+_Z = 1.959964
+
+_metodo = METODO_PADRAO
+_reamostragens = REAMOSTRAGENS_PADRAO
+
+
+def set_method(metodo, reamostragens=REAMOSTRAGENS_PADRAO):
+    """Define o método usado por half_width (veja METODOS)."""
+    global _metodo, _reamostragens
+    if metodo not in METODOS:
+        raise ValueError(f"método de intervalo de confiança desconhecido: {metodo}")
+    _metodo = metodo
+    _reamostragens = max(1, int(reamostragens))
+
+
+def get_method():
+    return _metodo
+
+
+def t_quantile(graus):
+    """
+    Quantil 0,975 da t de Student para 'graus' graus de liberdade (escalar
+    ou array). Acima de 30, usa a expansão de Cornish-Fisher em torno do
+    quantil normal, com erro menor que 1e-4.
+    """
+    g = np.asarray(graus, dtype=float)
+    tabela = _QUANTIS_T[np.clip(g, 1, 30).astype(np.int64) - 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = _Z
+        expansao = (z + (z**3 + z) / (4 * g) + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * g**2)
+                    + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * g**3))
+    q = np.where(g <= 30, tabela, expansao)
+    return float(q) if q.ndim == 0 else q
+
+
+def _bootstrap_half_width(valores, reamostragens):
+    """Meia largura do intervalo percentil de 95% de cada coluna de 'valores' (amostras × métricas)."""
+    n, m = valores.shape
+    ordenados = np.sort(valores, axis=0)  # NaN ao final de cada coluna
+    contagem = (~np.isnan(valores)).sum(axis=0)
+    sorteio = np.random.default_rng(SEMENTE).random((reamostragens, n))
+    meia_largura = np.zeros(m)
+    # Colunas com a mesma quantidade k de amostras presentes compartilham os
+    # pesos de cada reamostragem (quantas vezes cada amostra foi sorteada / k),
+    # e as médias reamostradas de todas elas saem de um único produto matricial
+    for k in np.unique(contagem[contagem > 1]):
+        colunas = np.flatnonzero(contagem == k)
+        indice = (sorteio[:, :k] * k).astype(np.int64)
+        pesos = (indice[:, :, None] == np.arange(k)).sum(axis=1) / k
+        medias = pesos @ ordenados[:k, colunas]
+        inferior, superior = np.percentile(medias, [2.5, 97.5], axis=0)
+        meia_largura[colunas] = (superior - inferior) / 2
+    return meia_largura
+
+
+def half_width(valores, axis=0, bootstrap=True):
+    """
+    Meia largura do IC de 95% da média de 'valores' ao longo de 'axis',
+    com o método definido em set_method. Métricas com menos de duas amostras
+    têm meia largura 0. Retorna um float se 'valores' for unidimensional.
+    """
+    v = np.moveaxis(np.asarray(valores, dtype=float), axis, 0)
+    forma = v.shape[1:]
+    v = v.reshape(v.shape[0], -1)
+    n = (~np.isnan(v)).sum(axis=0)
+    if _metodo == "bootstrap" and bootstrap and v.shape[0] > 1:
+        resultado = _bootstrap_half_width(v, _reamostragens)
+    else:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            media = np.nansum(v, axis=0) / n
+            desvio = np.sqrt(np.nansum((v - media) ** 2, axis=0) / (n - 1))
+            quantil = _Z if _metodo == "normal" else t_quantile(np.maximum(n - 1, 1))
+            resultado = np.where(n > 1, quantil * desvio / np.sqrt(n), 0.0)
+    resultado = resultado.reshape(forma)
+    return float(resultado) if resultado.ndim == 0 else resultado
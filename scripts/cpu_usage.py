@@ -1,41 +1,282 @@
-import psutil
+#!/usr/bin/env python3
+"""
+Amostrador de uso de CPU que lê /proc/stat diretamente.
+
+Durante a coleta, apenas os contadores acumulados de cada CPU (linha "cpu" e
+linhas "cpuN") são copiados para arrays pré-alocados e despejados em blocos,
+em binário, num arquivo temporário; nenhuma formatação é feita por amostra. Ao
+final, os percentuais (usr, nice, sys, iowait, irq, soft, steal e idle) são
+calculados de forma vetorizada a partir das diferenças entre amostras.
+
+Saídas:
+    --binario ARQ.npy  Todas as amostras, em um array estruturado com os campos
+                       'tempo' (s desde o início), 'epoch' e um campo por coluna
+                       com um valor por CPU (índice 0 = "all"; depois, os
+                       núcleos na ordem de /proc/stat).
+    --largo ARQ.csv    Uso de cada núcleo (CPU_N = 100 - idle) por janela
+                       (--janela, padrão 1 s), no formato do mpstat_to_csv.py,
+                       seguido do início e do fim da janela (inicio, fim), em
+                       segundos desde o início da coleta.
+    --csv ARQ.csv      Tabela longa por janela (horario, cpu, usr, nice, sys,
+                       iowait, irq, soft, steal, idle), como a do mpstat_to_csv.py.
+
+A coleta termina após --duracao segundos, quando o processo --pid encerra ou
+ao receber SIGINT/SIGTERM. Com --pid, o início é alinhado ao início do
+processo (somado de --omitir segundos), e não ao início deste script.
+
+Os contadores de /proc/stat têm resolução de 10 ms (USER_HZ = 100), o que
+limita a precisão de intervalos de amostragem muito curtos.
+"""
+import os
+import csv
 import time
+import signal
 import argparse
+import tempfile
+from datetime import datetime
 
-def monitor_cpu_cores(cores, duration):
-    """
-    Monitora o uso da CPU em núcleos específicos por um tempo definido.
+import numpy as np
+
+# Campos de cada linha "cpu" de /proc/stat, na ordem do kernel
+CAMPOS_PROC = ["user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal", "guest", "guest_nice"]
+COLUNAS = ["usr", "nice", "sys", "iowait", "irq", "soft", "steal", "idle"]
+
+AMOSTRAS_POR_BLOCO = 1024
+
+_parar = False
+
+
+def _sinal_parar(signum, frame):
+    global _parar
+    _parar = True
+
+
+class ProcStatReader:
+    """Leitura dos contadores de CPU de /proc/stat para um array pré-alocado."""
+    def __init__(self, path="/proc/stat"):
+        self.fd = os.open(path, os.O_RDONLY)
+        dados = self._read(1 << 16)
+        linhas = [l for l in dados.split(b"\n") if l.startswith(b"cpu")]
+        self.nomes = [l.split(None, 1)[0].decode() for l in linhas]
+        self.n = len(linhas)
+        self.k = min(len(CAMPOS_PROC), len(linhas[0].split()) - 1)
+        # Os contadores crescem, então há folga para mais dígitos
+        self.tamanho = 2 * sum(len(l) + 1 for l in linhas) + 4096
 
-    Args:
-        cores (list): Lista de índices dos núcleos para monitoramento.
-        duration (int): Tempo total de monitoramento em segundos.
+    def _read(self, tamanho):
+        return os.pread(self.fd, tamanho, 0)
+
+    def sample(self, destino):
+        """Copia os contadores atuais para 'destino' (array int64 n x 10)."""
+        dados = self._read(self.tamanho)
+        linhas = dados.split(b"\n", self.n)[:self.n]
+        campos = np.array(b" ".join(linhas).split()).reshape(self.n, -1)
+        destino[:, :self.k] = campos[:, 1:self.k + 1].astype(np.int64)
+
+    def close(self):
+        os.close(self.fd)
+
+
+def process_start(pid):
+    """Instante de início do processo, no relógio CLOCK_BOOTTIME (segundos)."""
+    with open(f"/proc/{pid}/stat", "rb") as f:
+        campos = f.read().rsplit(b")", 1)[1].split()
+    # starttime é o 22º campo; após o nome do processo, é o 20º
+    return int(campos[19]) / os.sysconf("SC_CLK_TCK")
+
+
+def process_alive(pid):
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            estado = f.read().rsplit(b")", 1)[1].split()[0]
+    except OSError:
+        return False
+    return estado not in (b"Z", b"X")
+
+
+def _sleep_until(instante):
+    """Dorme até 'instante' (CLOCK_BOOTTIME), interrompendo se for pedido para parar."""
+    while not _parar:
+        restante = instante - time.clock_gettime(time.CLOCK_BOOTTIME)
+        if restante <= 0:
+            return
+        time.sleep(min(restante, 0.5))
+
+
+def collect(leitor, intervalo, duracao=None, pid=None, omitir=0.0):
+    """
+    Coleta amostras a cada 'intervalo' segundos. Retorna (tempos, epoch0,
+    arquivo), onde 'arquivo' é um arquivo temporário com os contadores brutos
+    (int64, amostras x CPUs x 10).
     """
-    end_time = time.time() + duration
+    inicio = time.clock_gettime(time.CLOCK_BOOTTIME)
+    if pid is not None:
+        try:
+            inicio = process_start(pid)
+        except OSError:
+            pass
+    _sleep_until(inicio + omitir)
 
-    while time.time() < end_time:
-        # Obter o uso da CPU por núcleo (retorna porcentagens de uso de cada núcleo)
-        cpu_percentages = psutil.cpu_percent(interval=1, percpu=True)
+    bruto = tempfile.TemporaryFile()
+    bloco = np.zeros((AMOSTRAS_POR_BLOCO, leitor.n, len(CAMPOS_PROC)), dtype=np.int64)
+    tempos = np.empty(AMOSTRAS_POR_BLOCO, dtype=np.float64)
+    i = total = 0
 
-        # Filtrar apenas os núcleos informados
-        core_usages = [cpu_percentages[core] for core in cores]
+    t0 = time.clock_gettime(time.CLOCK_BOOTTIME)
+    epoch0 = time.time()
+    proximo = t0
+    while True:
+        leitor.sample(bloco[i])
+        agora = time.clock_gettime(time.CLOCK_BOOTTIME)
+        if total + i >= len(tempos):
+            tempos = np.resize(tempos, 2 * len(tempos))
+        tempos[total + i] = agora - t0
+        i += 1
+        if i == AMOSTRAS_POR_BLOCO:
+            bloco.tofile(bruto)
+            total += i
+            i = 0
 
-        # Formatar a saída
-        output = ", ".join([f"{usage:.2f}%" for usage in core_usages])
-        print(output)
+        if _parar or (duracao is not None and agora - t0 >= duracao):
+            break
+        if pid is not None and not process_alive(pid):
+            break
+        # Mantém a grade de amostragem; amostras atrasadas não se acumulam
+        proximo += intervalo
+        if proximo < agora:
+            proximo = agora
+        _sleep_until(proximo)
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Monitorar uso de CPU em núcleos específicos.")
-    parser.add_argument("cores", type=int, nargs="+", help="Núcleos a serem monitorados, separados por espaço.")
-    parser.add_argument("duration", type=int, help="Tempo limite em segundos para monitorar o uso de CPU.")
+    bloco[:i].tofile(bruto)
+    total += i
+    bruto.flush()
+    return tempos[:total], epoch0, bruto
+
+
+def percentages(c0, c1):
+    """Percentuais de cada coluna entre dois conjuntos de contadores (..., CPUs, 10)."""
+    d = (c1 - c0).astype(np.float64)
+    usr = d[..., 0] - d[..., 8]   # user inclui guest
+    nice = d[..., 1] - d[..., 9]  # nice inclui guest_nice
+    colunas = np.stack([usr, nice, d[..., 2], d[..., 4], d[..., 5], d[..., 6], d[..., 7], d[..., 3]], axis=-1)
+    total = d[..., :8].sum(axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct = np.where(total > 0, 100.0 * colunas / total, 0.0)
+    return np.clip(pct, 0.0, 100.0)
+
+
+def write_binary(path, contadores, tempos, epoch0, bloco=4096):
+    """Grava todas as amostras (percentuais por intervalo) em um .npy estruturado."""
+    n_cpus = contadores.shape[1]
+    dtype = [("tempo", "f8"), ("epoch", "f8")] + [(c, "f4", (n_cpus,)) for c in COLUNAS]
+    n = max(len(tempos) - 1, 0)
+    saida = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(n,))
+    for a in range(0, n, bloco):
+        b = min(a + bloco, n)
+        pct = percentages(contadores[a:b], contadores[a + 1:b + 1])
+        saida["tempo"][a:b] = tempos[a + 1:b + 1]
+        saida["epoch"][a:b] = epoch0 + tempos[a + 1:b + 1]
+        for j, c in enumerate(COLUNAS):
+            saida[c][a:b] = pct[..., j]
+    saida.flush()
+    del saida
+
+
+def window_indices(tempos, janela, intervalo):
+    """Índices das amostras mais próximas do fim de cada janela completa."""
+    if len(tempos) < 2:
+        return np.array([], dtype=np.int64)
+    alvos = np.arange(0.0, tempos[-1] + intervalo / 2, janela)
+    indices = np.searchsorted(tempos, alvos - intervalo / 2)
+    indices = indices[indices < len(tempos)]
+    return np.unique(indices)
+
+
+def write_windows(contadores, tempos, epoch0, nomes, janela, intervalo, nucleos=None, largo=None, longo=None):
+    """Grava as tabelas larga e/ou longa, com uma linha (ou bloco) por janela."""
+    indices = window_indices(tempos, janela, intervalo)
+    if len(indices) < 2:
+        return 0
+    amostras = np.asarray(contadores[indices])
+    pct = np.round(percentages(amostras[:-1], amostras[1:]), 2)
+    horarios = [datetime.fromtimestamp(epoch0 + t).strftime("%H:%M:%S") for t in tempos[indices[1:]]]
+
+    ids = [nome[3:] for nome in nomes]  # "cpu" -> "", "cpu3" -> "3"
+    selecionados = [j for j in range(1, len(nomes)) if nucleos is None or ids[j] in nucleos]
+
+    if largo is not None:
+        writer = csv.writer(largo, delimiter=',')
+        writer.writerow([f"CPU_{ids[j]}" for j in selecionados] + ["inicio", "fim"])
+        idle = COLUNAS.index("idle")
+        limites = np.round(tempos[indices], 3)
+        for linha, inicio, fim in zip(pct, limites[:-1], limites[1:]):
+            writer.writerow([round(100 - linha[j, idle], 2) for j in selecionados] + [inicio, fim])
+
+    if longo is not None:
+        writer = csv.writer(longo, delimiter=',')
+        writer.writerow(["horario", "cpu"] + COLUNAS)
+        for horario, linha in zip(horarios, pct):
+            for j in [0] + selecionados:
+                writer.writerow([horario, ids[j] or "all"] + linha[j].tolist())
+
+    return len(pct)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Amostra o uso de CPU a partir de /proc/stat.")
+    parser.add_argument("-i", "--intervalo", type=float, default=100,
+                        help="Intervalo entre amostras, em milissegundos (padrão: 100).")
+    parser.add_argument("-d", "--duracao", type=float,
+                        help="Duração da coleta, em segundos.")
+    parser.add_argument("-p", "--pid", type=int,
+                        help="Encerra a coleta quando este processo terminar e alinha o início ao início dele.")
+    parser.add_argument("-O", "--omitir", type=float, default=0,
+                        help="Segundos iniciais descartados (como a opção -O do iperf3).")
+    parser.add_argument("-j", "--janela", type=float, default=1.0,
+                        help="Duração, em segundos, de cada linha das saídas CSV (padrão: 1).")
+    parser.add_argument("-n", "--nucleos",
+                        help="Núcleos incluídos nas saídas CSV, separados por vírgula. Ex: 1,2")
+    parser.add_argument("--binario", metavar="ARQ", help="Arquivo .npy com todas as amostras.")
+    parser.add_argument("--largo", metavar="ARQ", help="CSV com uma coluna CPU_N (100 - idle) por núcleo.")
+    parser.add_argument("--csv", metavar="ARQ", help="CSV no formato longo (horario, cpu, usr, ..., idle).")
     args = parser.parse_args()
 
-    # Validar núcleos fornecidos
-    total_cores = psutil.cpu_count()
-    invalid_cores = [core for core in args.cores if core < 0 or core >= total_cores]
+    if args.duracao is None and args.pid is None:
+        parser.error("informe --duracao e/ou --pid")
+    if args.intervalo <= 0 or args.janela <= 0:
+        parser.error("--intervalo e --janela devem ser positivos")
+
+    leitor = ProcStatReader()
+    nucleos = set(args.nucleos.split(",")) if args.nucleos else None
+    if nucleos:
+        invalidos = sorted(nucleos - {nome[3:] for nome in leitor.nomes[1:]})
+        if invalidos:
+            parser.error(f"núcleos inválidos: {', '.join(invalidos)}")
+
+    signal.signal(signal.SIGINT, _sinal_parar)
+    signal.signal(signal.SIGTERM, _sinal_parar)
 
-    if invalid_cores:
-        print(f"Erro: Os seguintes núcleos não são válidos: {invalid_cores}")
-        print(f"Informe núcleos entre 0 e {total_cores - 1}.")
-        exit(1)
+    intervalo = args.intervalo / 1000
+    tempos, epoch0, bruto = collect(leitor, intervalo, args.duracao, args.pid, args.omitir)
+    leitor.close()
 
-    monitor_cpu_cores(args.cores, args.duration)
\ No newline at end of file
+    formato = (len(tempos), leitor.n, len(CAMPOS_PROC))
+    contadores = np.memmap(bruto, dtype=np.int64, mode="r", shape=formato) if len(tempos) else np.zeros(formato, dtype=np.int64)
+
+    if args.binario:
+        write_binary(args.binario, contadores, tempos, epoch0)
+    largo = open(args.largo, "w", newline="", encoding="utf-8") if args.largo else None
+    longo = open(args.csv, "w", newline="", encoding="utf-8") if args.csv else None
+    try:
+        janelas = write_windows(contadores, tempos, epoch0, leitor.nomes, args.janela, intervalo, nucleos, largo, longo)
+    finally:
+        for f in (largo, longo):
+            if f is not None:
+                f.close()
+    bruto.close()
+
+    print(f"Amostras coletadas: {len(tempos)}; janelas de {args.janela:g} s: {janelas}")
+
+
+if __name__ == "__main__":
+    main()
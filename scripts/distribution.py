@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Distribuição das amostras das rodadas (vazão, perda, jitter): mínimo,
+percentis (PERCENTIS), coeficiente de variação e os pontos da função de
+distribuição acumulada (CDF) usados nos gráficos.
+
+A média de uma rodada não distingue uma medição estável de uma com quedas
+curtas de vazão; o mínimo e os percentis baixos distinguem. As estatísticas
+de várias séries (as rodadas de um teste) são calculadas de uma só vez, sobre
+uma matriz (séries × amostras) ordenada linha a linha, com NaN no fim das
+séries mais curtas e no lugar das amostras ausentes. Os percentis usam a
+mesma interpolação linear de np.percentile, mas sem o laço por linha que
+np.nanpercentile faz quando há NaN.
+"""
+import numpy as np
+
+PERCENTIS = (1, 5, 50, 95, 99)
+# Estatísticas retornadas, na ordem das colunas do Markdown
+ESTATISTICAS = ("min", "p1", "p5", "p50", "p95", "p99", "cv")
+# Probabilidades (igualmente espaçadas) em que a CDF é desenhada
+PONTOS_CDF = 201
+
+
+def _sorted_matrix(series):
+    """
+    Matriz (séries × maior série) com cada série ordenada e NaN no fim, e a
+    quantidade de amostras válidas de cada série.
+    """
+    matriz = np.full((len(series), max((len(s) for s in series), default=0)), np.nan)
+    for i, s in enumerate(series):
+        matriz[i, :len(s)] = s
+    matriz.sort(axis=1)
+    return matriz, (~np.isnan(matriz)).sum(axis=1)
+
+
+def _quantiles(ordenada, contagem, probabilidades):
+    """
+    Quantis (interpolação linear) de cada linha de uma matriz de
+    _sorted_matrix, nas 'probabilidades' (0 a 1). Retorna (séries,
+    probabilidades), com NaN nas séries sem amostras.
+    """
+    probabilidades = np.asarray(probabilidades, dtype=float)
+    if ordenada.shape[1] == 0:
+        return np.full((len(ordenada), len(probabilidades)), np.nan)
+    ultimo = np.maximum(contagem - 1, 0)[:, None]
+    posicao = probabilidades[None, :] * ultimo
+    baixo = np.floor(posicao).astype(np.int64)
+    alto = np.minimum(baixo + 1, ultimo)
+    inferior = np.take_along_axis(ordenada, baixo, axis=1)
+    superior = np.take_along_axis(ordenada, alto, axis=1)
+    return inferior + (superior - inferior) * (posicao - baixo)
+
+
+def _stats(ordenada, contagem):
+    """Estatísticas (ESTATISTICAS) de cada linha de uma matriz de _sorted_matrix."""
+    percentis = _quantiles(ordenada, contagem, np.array(PERCENTIS) / 100)
+    estatisticas = {f"p{p}": percentis[:, i] for i, p in enumerate(PERCENTIS)}
+    estatisticas["min"] = ordenada[:, 0] if ordenada.shape[1] else np.full(len(ordenada), np.nan)
+    presente = ~np.isnan(ordenada)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media = np.where(presente, ordenada, 0.0).sum(axis=1) / contagem
+        quadrados = np.where(presente, (ordenada - media[:, None]) ** 2, 0.0).sum(axis=1)
+        desvio = np.sqrt(quadrados / (contagem - 1))
+        cv = np.where(media != 0, 100 * desvio / np.abs(media), np.nan)
+    estatisticas["cv"] = np.where(contagem > 1, cv, np.nan)
+    return {chave: estatisticas[chave] for chave in ESTATISTICAS}
+
+
+def distribution_stats(series):
+    """
+    Estatísticas de cada série de 'series' (lista de arrays de amostras):
+    {"min", "p1", "p5", "p50", "p95", "p99", "cv"}, cada uma um array com um
+    valor por série. O coeficiente de variação (desvio padrão amostral sobre
+    a média, em %) é NaN com menos de duas amostras ou média nula.
+    """
+    return _stats(*_sorted_matrix(series))
+
+
+def pooled_distribution(series, pontos=PONTOS_CDF):
+    """
+    Estatísticas de todas as amostras de 'series' juntas (como em
+    distribution_stats, mas com valores escalares) e a CDF empírica dessas
+    amostras em 'pontos' probabilidades igualmente espaçadas de 0 a 1,
+    (valores, probabilidades), de modo que o gráfico não cresce com a
+    quantidade de amostras.
+    """
+    amostras = np.concatenate([np.asarray(s, dtype=float) for s in series]) if series else np.zeros(0)
+    ordenada, contagem = _sorted_matrix([amostras])
+    estatisticas = {chave: float(valor[0]) for chave, valor in _stats(ordenada, contagem).items()}
+    probabilidades = np.linspace(0, 1, pontos)
+    return estatisticas, (_quantiles(ordenada, contagem, probabilidades)[0], probabilidades)
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Carregamento, em memória, dos dados de cada rodada de um teste.
+
+Os arquivos CSV de cada rodada (iperf3 do cliente, iperf3 do servidor e
+mpstat) são lidos uma única vez e mantidos em um objeto TestData, que é
+repassado a todas as funções de plotagem e de geração de tabelas.
+
+Na primeira leitura, as colunas numéricas de cada CSV são gravadas em um
+arquivo binário (.npy) no subdiretório .cache/ da rodada. Leituras
+seguintes usam essa cópia, mapeada em memória, enquanto o tamanho e a data de
+modificação do CSV de origem não mudarem.
+
+O pandas só é importado na primeira leitura de uma rodada.
+"""
+import os
+import re
+import json
+import hashlib
+import configparser
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from steady_state import read_steady_state
+
+# Colunas utilizadas pelo sumarizador e os respectivos tipos. Apenas elas
+# são carregadas; as demais (host, porta, protocolo...) são descartadas.
+COLUNAS_CLIENTE = {
+    "bytes_transferidos": "float64",
+    "bits_por_segundo": "float64",
+    "retransmissoes": "float32",
+    "%_pacotes_perdidos": "float32",
+    # Dados internos do TCP (ausentes em resultados convertidos por versões antigas)
+    "segundos": "float32",
+    "rtt": "float32",
+    "rttvar": "float32",
+    "snd_cwnd": "float32",
+    "snd_wnd": "float32",
+    # Início e fim de cada intervalo (s desde o início da medição)
+    "inicio": "float64",
+    "fim": "float64",
+}
+COLUNAS_SERVIDOR = {
+    "bits_por_segundo": "float64",
+    "jitter": "float32",
+    "porcentagem_pacotes_perdidos": "float32",
+    "inicio": "float64",
+    "fim": "float64",
+}
+COLUNAS_FLUXOS = {
+    "intervalo": "float32",
+    "fluxo": "float32",
+    "bits_por_segundo": "float64",
+    "bytes_transferidos": "float64",
+    "retransmissoes": "float32",
+    "snd_cwnd": "float32",
+    "rtt": "float32",
+}
+TIPO_CPU = "float32"
+COLUNAS_TEMPO = ["inicio", "fim"]
+
+# Cache binário das rodadas
+CACHE_DIR = ".cache"
+CACHE_VERSAO = 1
+
+
+# Tamanho máximo dos nomes de testes concatenados nos nomes de arquivos e
+# diretórios (o limite do sistema de arquivos costuma ser de 255 bytes)
+TAMANHO_MAXIMO_NOMES = 120
+
+
+def format_label(name):
+    return name.replace("_", " ").title().replace("Cpu", "CPU")
+
+
+def join_test_names(tests):
+    """
+    Nomes dos testes separados por '-', usados nos nomes dos gráficos
+    comparativos e do diretório sumarizado-*. Com muitos testes, o nome é
+    abreviado para <primeiro>-<último>-<n>_testes-<hash>, único para cada
+    lista de testes.
+    """
+    nomes = "-".join(tests)
+    if len(nomes.encode("utf-8")) <= TAMANHO_MAXIMO_NOMES:
+        return nomes
+    resumo = hashlib.sha1(nomes.encode("utf-8")).hexdigest()[:10]
+    return f"{tests[0][:40]}-{tests[-1][:40]}-{len(tests)}_testes-{resumo}"
+
+
+def get_round_dirs(test_dir):
+    """Retorna os diretórios de rodada (ex.: rodada_1, rodada_2, …) em ordem."""
+    rounds = [d for d in os.listdir(test_dir) if d.startswith("rodada_") and os.path.isdir(os.path.join(test_dir, d))]
+    return sorted(rounds)
+
+
+def get_test_display_name_from_conf(test_dir: str) -> str:
+    """
+    Tenta encontrar o nome amigável do teste no arquivo INI de configuração.
+    """
+    try:
+        test_name = os.path.basename(test_dir)
+        ini_path = os.path.join(test_dir, f"{test_name}-conf.ini")
+        if os.path.exists(ini_path):
+            cfg = configparser.ConfigParser()
+            # Mantém case-sensitivity das chaves
+            cfg.optionxform = str
+            cfg.read(ini_path, encoding="utf-8")
+            if cfg.has_section("Teste") and cfg.has_option("Teste", "Nome"):
+                nome = cfg.get("Teste", "Nome", fallback="").strip()
+                if nome:
+                    return nome
+    except Exception as e:
+        # Não interrompe o fluxo caso o INI esteja ausente/malformado
+        print(f"Aviso: falha ao ler '{test_name}-conf.ini': {e}")
+    return format_label(test_name)
+
+
+def get_pinned_cores_from_conf(test_dir: str) -> list:
+    """
+    Núcleos fixados com -A/--affinity nos comandos do cliente e do servidor
+    registrados no arquivo INI do teste. No cliente, '-A n,m' fixa o cliente
+    em n e o servidor em m. Retorna uma lista (possivelmente vazia) de strings.
+    """
+    test_name = os.path.basename(test_dir)
+    ini_path = os.path.join(test_dir, f"{test_name}-conf.ini")
+    nucleos = []
+    if not os.path.exists(ini_path):
+        return nucleos
+    cfg = configparser.ConfigParser()
+    cfg.optionxform = str
+    try:
+        cfg.read(ini_path, encoding="utf-8")
+    except configparser.Error as e:
+        print(f"Aviso: falha ao ler '{test_name}-conf.ini': {e}")
+        return nucleos
+    for opcao in ("ComandoCliente", "ComandoServidor"):
+        comando = cfg.get("Teste", opcao, fallback="")
+        for m in re.finditer(r'(?:-A|--affinity)[ =]*(\d+(?:,\d+)?)', comando):
+            for nucleo in m.group(1).split(","):
+                if nucleo not in nucleos:
+                    nucleos.append(nucleo)
+    return nucleos
+
+
+def get_cpu_topology_from_conf(test_dir: str) -> dict:
+    """
+    Núcleos de cada nó NUMA e de cada soquete, da seção [Topologia] do
+    arquivo INI do teste (chaves NoNUMA<n> e Soquete<n>, com listas de
+    núcleos separadas por vírgula, gravadas pela rotina executa-experimento).
+    Retorna {"no": {n: [núcleos]}, "soquete": {n: [núcleos]}}, com os
+    núcleos como strings, ou um dicionário vazio se a seção não existir.
+    """
+    test_name = os.path.basename(test_dir)
+    ini_path = os.path.join(test_dir, f"{test_name}-conf.ini")
+    if not os.path.exists(ini_path):
+        return {}
+    cfg = configparser.ConfigParser()
+    cfg.optionxform = str
+    try:
+        cfg.read(ini_path, encoding="utf-8")
+    except configparser.Error as e:
+        print(f"Aviso: falha ao ler '{test_name}-conf.ini': {e}")
+        return {}
+    if not cfg.has_section("Topologia"):
+        return {}
+    topologia = {"no": {}, "soquete": {}}
+    for chave, valor in cfg.items("Topologia"):
+        m = re.fullmatch(r'(NoNUMA|Soquete)(\d+)', chave)
+        if m:
+            nivel = "no" if m.group(1) == "NoNUMA" else "soquete"
+            topologia[nivel][m.group(2)] = [n.strip() for n in valor.split(",") if n.strip()]
+    return topologia
+
+
+def _cache_paths(path):
+    """Caminhos do arquivo .npy e da chave (.json) em cache para um CSV."""
+    diretorio, nome = os.path.split(path)
+    base = os.path.join(diretorio, CACHE_DIR, nome)
+    return base + ".npy", base + ".json"
+
+
+def _cache_key(path, colunas):
+    """Chave do cache: tamanho e data de modificação do CSV e colunas lidas."""
+    st = os.stat(path)
+    return {
+        "versao": CACHE_VERSAO,
+        "tamanho": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "colunas": colunas,
+    }
+
+
+def _load_cache(path, chave):
+    """
+    Retorna o DataFrame em cache para 'path', ou None se ausente/desatualizado.
+    O .npy é mapeado em memória (cópia na escrita, de modo que alterações no
+    DataFrame nunca chegam ao arquivo), e as colunas do DataFrame são vistas
+    do mapeamento, sem cópia: só as páginas efetivamente lidas ocupam memória.
+    """
+    import pandas as pd
+
+    npy_path, json_path = _cache_paths(path)
+    try:
+        with open(json_path, encoding="utf-8") as f:
+            if json.load(f) != chave:
+                return None
+        try:
+            registros = np.load(npy_path, mmap_mode="c")
+        except ValueError:
+            # Arquivos sem linhas não podem ser mapeados em memória
+            registros = np.load(npy_path)
+    except (OSError, ValueError):
+        return None
+    return pd.DataFrame({nome: registros[nome] for nome in registros.dtype.names}, copy=False)
+
+
+def _save_cache(path, chave, df):
+    """
+    Grava as colunas de 'df' como um array estruturado (.npy). Falhas de
+    escrita (ex.: resultados arquivados em mídia somente leitura) são ignoradas.
+    """
+    if len(df.columns) == 0:
+        return
+    npy_path, json_path = _cache_paths(path)
+    registros = np.empty(len(df), dtype=[(col, df[col].dtype) for col in df.columns])
+    for col in df.columns:
+        registros[col] = df[col].to_numpy()
+    try:
+        os.makedirs(os.path.dirname(npy_path), exist_ok=True)
+        # A chave é gravada por último e só depois que o .npy estiver completo
+        if os.path.exists(json_path):
+            os.remove(json_path)
+        np.save(npy_path, registros)
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(chave, f)
+    except OSError:
+        pass
+
+
+def _read_cached(path, colunas, parse):
+    """
+    Lê 'path' pelo cache quando possível; caso contrário, usa 'parse' e grava
+    o resultado no cache. Retorna None se o arquivo não existir ou estiver vazio.
+    """
+    if not os.path.exists(path):
+        return None
+    chave = _cache_key(path, colunas)
+    df = _load_cache(path, chave)
+    if df is not None:
+        return df
+    df = parse(path)
+    if df is not None:
+        _save_cache(path, chave, df)
+    return df
+
+
+def _parse_csv(path, colunas):
+    import pandas as pd
+
+    try:
+        df = pd.read_csv(path, usecols=lambda c: c in colunas)
+    except pd.errors.EmptyDataError:
+        return None
+    for col in df.columns:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype(colunas[col])
+    return df
+
+
+def _parse_mpstat_csv(path):
+    import pandas as pd
+
+    try:
+        df = pd.read_csv(path, usecols=lambda c: c.startswith("CPU") or c in COLUNAS_TEMPO)
+    except pd.errors.EmptyDataError:
+        return None
+    df = df.apply(pd.to_numeric, errors="coerce")
+    return df.astype({c: ("float64" if c in COLUNAS_TEMPO else TIPO_CPU) for c in df.columns})
+
+
+def _read_csv(path, colunas):
+    """
+    Lê somente as colunas conhecidas de um CSV, já nos tipos compactos.
+    Retorna None se o arquivo não existir ou estiver vazio.
+    """
+    return _read_cached(path, colunas, lambda p: _parse_csv(p, colunas))
+
+
+def _read_mpstat_csv(path):
+    """Lê o CSV do mpstat mantendo apenas as colunas de núcleos (CPU_N) e inicio/fim."""
+    return _read_cached(path, {"CPU*": TIPO_CPU, "inicio": "float64", "fim": "float64"}, _parse_mpstat_csv)
+
+
+@dataclass
+class RoundData:
+    """Dados de uma rodada (rodada_N) de um teste."""
+    name: str
+    number: int
+    path: str
+    client_file: str
+    server_file: str
+    mpstat_file: str
+    streams_file: str = None
+    client: "pd.DataFrame" = None
+    server: "pd.DataFrame" = None
+    mpstat: "pd.DataFrame" = None
+    mpstat_times: "pd.DataFrame" = None  # inicio/fim de cada linha do mpstat, se o CSV os tiver
+    streams: "pd.DataFrame" = None  # um registro por fluxo (-P) e intervalo, do lado do cliente
+    steady_state_file: str = None
+    steady_start: float = None  # início do regime permanente (s), se detectado na conversão
+
+
+@dataclass
+class TestData:
+    """Dados de todas as rodadas de um teste, carregados uma única vez."""
+    name: str
+    path: str
+    display_name: str
+    rounds: list = field(default_factory=list)
+    pinned_cores: list = field(default_factory=list)  # núcleos fixados com -A (veja get_pinned_cores_from_conf)
+    topology: dict = field(default_factory=dict)  # núcleos de cada nó NUMA e soquete (veja get_cpu_topology_from_conf)
+
+
+def load_round_data(test_dir, test_name, rodada):
+    rodada_path = os.path.join(test_dir, rodada)
+    prefixo = os.path.join(rodada_path, f"{rodada}-{test_name}")
+    dados = RoundData(
+        name=rodada,
+        number=int(re.search(r'rodada_(\d+)', rodada).group(1)),
+        path=rodada_path,
+        client_file=f"{prefixo}-iperf3_client.csv",
+        server_file=f"{prefixo}-iperf3_server.csv",
+        mpstat_file=f"{prefixo}-mpstat.csv",
+        streams_file=f"{prefixo}-iperf3_client_fluxos.csv",
+        steady_state_file=f"{prefixo}-regime.ini",
+    )
+    dados.client = _read_csv(dados.client_file, COLUNAS_CLIENTE)
+    dados.server = _read_csv(dados.server_file, COLUNAS_SERVIDOR)
+    mpstat = _read_mpstat_csv(dados.mpstat_file)
+    if mpstat is not None:
+        colunas_tempo = [c for c in COLUNAS_TEMPO if c in mpstat.columns]
+        if colunas_tempo:
+            dados.mpstat_times = mpstat[colunas_tempo]
+        dados.mpstat = mpstat.drop(columns=colunas_tempo)
+    dados.streams = _read_csv(dados.streams_file, COLUNAS_FLUXOS)
+    dados.steady_start = read_steady_state(dados.steady_state_file)
+    return dados
+
+
+def load_test_data(resultados_dir, test_name):
+    """
+    Lê do disco todas as rodadas de um teste e retorna um TestData.
+    Retorna None se o diretório do teste não existir.
+    """
+    test_dir = os.path.join(resultados_dir, test_name)
+    if not os.path.isdir(test_dir):
+        return None
+    return TestData(
+        name=test_name,
+        path=test_dir,
+        display_name=get_test_display_name_from_conf(test_dir),
+        rounds=[load_round_data(test_dir, test_name, rodada) for rodada in get_round_dirs(test_dir)],
+        pinned_cores=get_pinned_cores_from_conf(test_dir),
+        topology=get_cpu_topology_from_conf(test_dir),
+    )
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Exportação dos agregados do sumarizador em JSON e em CSV (formato longo).
+
+Os dois arquivos saem do mesmo modelo: cada teste é uma sequência de
+registros (Registro), um por valor, com o escopo (o teste inteiro, uma
+rodada ou um instante da série temporal), a métrica, a média, a meia largura
+do IC de 95% e a unidade. A vazão fica sempre em bps, sem a escala escolhida
+para os gráficos e o Markdown. No CSV, cada registro é uma linha com as
+colunas de CAMPOS; no JSON, os registros ficam agrupados por teste:
+
+    {"versao": 1, "metodo_ic": "t", ...,
+     "testes": [{"teste": "teste_1", "nome": "Teste 1",
+                 "registros": [{"escopo": "teste", "metrica": "vazao_servidor",
+                                "media": 9.8e9, "ic95": 1.2e7, "unidade": "bps"}, ...]}]}
+
+Campos vazios (rodada, núcleo, ...) são omitidos no JSON e ficam em branco
+no CSV, assim como valores indefinidos (NaN). Cada teste é gravado assim que
+é processado, de modo que a memória não cresce com a quantidade de testes, e
+os arquivos só substituem os da execução anterior quando estão completos.
+"""
+import os
+import csv
+import json
+import math
+from collections import namedtuple
+
+VERSAO_EXPORTACAO = 1
+
+ESCOPO_TESTE = "teste"
+ESCOPO_RODADA = "rodada"
+ESCOPO_TEMPO = "tempo"
+
+CAMPOS = ("teste", "nome", "escopo", "rodada", "tempo", "nucleo", "fluxo", "metrica", "media", "ic95", "unidade")
+
+Registro = namedtuple("Registro", "escopo metrica media ic95 unidade rodada tempo nucleo fluxo",
+                      defaults=(None, "", None, None, None, None))
+
+
+def _number(valor):
+    """float do valor, ou None se ausente ou indefinido."""
+    if valor is None:
+        return None
+    valor = float(valor)
+    return valor if math.isfinite(valor) else None
+
+
+class AggregateExport:
+    """
+    Grava os registros de cada teste em '<base>.json' e '<base>.csv'. Até
+    close(), os dados ficam em arquivos .tmp, que uma execução interrompida
+    deixa para trás e a seguinte sobrescreve.
+    """
+    def __init__(self, base, metadados=None):
+        self.json_path = base + ".json"
+        self.csv_path = base + ".csv"
+        self.testes = 0
+        self._json = open(self.json_path + ".tmp", "w", encoding="utf-8")
+        self._csv_arquivo = open(self.csv_path + ".tmp", "w", encoding="utf-8", newline="")
+        self._csv = csv.writer(self._csv_arquivo)
+        self._csv.writerow(CAMPOS)
+        cabecalho = json.dumps({"versao": VERSAO_EXPORTACAO, **(metadados or {})}, ensure_ascii=False)
+        self._json.write(cabecalho[:-1] + ', "testes": [')
+
+    def add_test(self, teste, nome, registros):
+        objetos = []
+        for r in registros:
+            media, ic95 = _number(r.media), _number(r.ic95)
+            tempo = _number(r.tempo)
+            self._csv.writerow((teste, nome, r.escopo, r.rodada, tempo, r.nucleo, r.fluxo, r.metrica, media, ic95, r.unidade))
+            objeto = {"escopo": r.escopo, "rodada": r.rodada, "tempo": tempo, "nucleo": r.nucleo, "fluxo": r.fluxo,
+                      "metrica": r.metrica, "media": media, "ic95": ic95, "unidade": r.unidade}
+            objetos.append({chave: valor for chave, valor in objeto.items()
+                            if valor is not None or chave in ("media", "ic95")})
+        self._json.write(("," if self.testes else "") + "\n")
+        json.dump({"teste": teste, "nome": nome, "registros": objetos}, self._json, ensure_ascii=False)
+        self.testes += 1
+
+    def close(self):
+        self._json.write("\n]}\n")
+        for arquivo in (self._json, self._csv_arquivo):
+            arquivo.close()
+        os.replace(self.json_path + ".tmp", self.json_path)
+        os.replace(self.csv_path + ".tmp", self.csv_path)
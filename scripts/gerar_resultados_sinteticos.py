@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Gera uma árvore de resultados sintéticos, no mesmo formato da gravada pela
+rotina executa-experimento, para medir o desempenho do sumarizador com
+quantidades arbitrárias de testes, rodadas, duração e núcleos.
+
+Para cada teste são gravados o <teste>-conf.ini (seções [Teste], [Ambiente]
+e [Topologia], com dois nós NUMA, um por soquete, cada um com metade dos
+núcleos) e o <teste>-experimento.log e, para cada rodada, os CSVs do
+cliente e do servidor do iperf3 (TCP ou UDP, com as colunas de
+iperf_json_to_csv.py), o CSV dos fluxos paralelos (com -P maior que 1) e o
+CSV do uso de CPU por núcleo (com as colunas de cpu_usage.py) e,
+opcionalmente, o log do mpstat.
+
+Os dados imitam os de um teste real: a vazão do TCP sobe durante o slow start
+e depois oscila em torno de um valor que muda um pouco entre testes e entre
+rodadas, com quedas curtas ocasionais; o UDP tem perdas esparsas e jitter; os
+núcleos fixados com -A ficam ocupados em proporção à vazão e os demais quase
+ociosos. Com a mesma semente, a árvore gerada é sempre a mesma.
+
+Uso:
+    gerar_resultados_sinteticos.py -d <diretório> [--testes N] [--rodadas N]
+        [--duracao S] [--nucleos N] [--protocolo tcp|udp|misto] [--fluxos N]
+        [--vazao GBPS] [--mpstat-log] [--semente N] [-j N]
+"""
+import os
+import sys
+import json
+import argparse
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+CABECALHO_CLIENTE = {
+    "TCP": "host_destino,porta_destino,protocolo,bytes_transferidos,bits_por_segundo,retransmissoes,segundos,rtt,rttvar,snd_cwnd,snd_wnd,inicio,fim",
+    "UDP": "host_destino,porta_destino,protocolo,bytes_transferidos,bits_por_segundo,inicio,fim",
+}
+CABECALHO_SERVIDOR = {
+    "TCP": "host_origem,porta_origem,total_bytes_transferidos,bits_por_segundo,inicio,fim",
+    "UDP": "host_origem,porta_origem,total_bytes_transferidos,bits_por_segundo,jitter,total_pacotes_perdidos,porcentagem_pacotes_perdidos,inicio,fim",
+}
+CABECALHO_FLUXOS = "intervalo,fluxo,socket,bytes_transferidos,bits_por_segundo,retransmissoes,snd_cwnd,rtt,rttvar,snd_wnd"
+
+HOST_SERVIDOR = "10.0.0.2"
+HOST_CLIENTE = "10.0.0.1"
+PORTA = 5201
+TAMANHO_DATAGRAMA = 1448
+INICIO = datetime(2025, 1, 6, 8, 0, 0)
+
+# Arquivo, na raiz da árvore, com os parâmetros da geração
+MARCADOR = "sintetico.json"
+
+
+def test_name(i):
+    return f"teste_{i + 1:03d}"
+
+
+def test_protocol(i, protocolo):
+    if protocolo == "misto":
+        return "TCP" if i % 2 == 0 else "UDP"
+    return protocolo.upper()
+
+
+def test_cores(i, nucleos):
+    """Núcleos do cliente e do servidor (-A cliente,servidor) do i-ésimo teste."""
+    cliente = (2 * i + 1) % nucleos
+    servidor = (2 * i + 2) % nucleos if nucleos > 1 else 0
+    return cliente, servidor
+
+
+def throughput_series(rng, duracao, vazao_bps, protocolo):
+    """Vazão (bps) de cada segundo da rodada."""
+    t = np.arange(duracao, dtype=float)
+    serie = vazao_bps * (1 + rng.normal(0, 0.01)) * (1 + rng.normal(0, 0.02, duracao))
+    if protocolo == "TCP":
+        # Slow start de 1 a 5 s
+        serie *= 1 - np.exp(-(t + 1) / rng.uniform(0.5, 2.0))
+    # Quedas curtas ocasionais
+    quedas = rng.random(duracao) < 0.002
+    serie[quedas] *= rng.uniform(0.2, 0.6, quedas.sum())
+    return np.clip(serie, 0, None), quedas
+
+
+def _save(caminho, cabecalho, fmt, colunas):
+    np.savetxt(caminho, np.column_stack(colunas), fmt=fmt, delimiter=",",
+               header=cabecalho, comments="")
+
+
+def write_round(args):
+    """Grava os arquivos de uma rodada. 'args' é uma tupla, para uso no ProcessPoolExecutor."""
+    test_dir, apelido, rodada, protocolo, duracao, nucleos, nucleos_fixados, fluxos, vazao_bps, mpstat_log, semente = args
+    rng = np.random.default_rng(semente)
+    rodada_dir = os.path.join(test_dir, f"rodada_{rodada}")
+    os.makedirs(rodada_dir, exist_ok=True)
+    prefixo = os.path.join(rodada_dir, f"rodada_{rodada}-{apelido}")
+    inicio = np.arange(duracao, dtype=float)
+    fim = inicio + 1.0
+
+    servidor, quedas = throughput_series(rng, duracao, vazao_bps, protocolo)
+    cliente = servidor * (1 + rng.normal(0, 0.002, duracao))
+    bytes_cliente = np.round(cliente / 8)
+    bytes_servidor = np.round(servidor / 8)
+
+    if protocolo == "TCP":
+        retransmissoes = rng.poisson(2 + 200 * quedas)
+        rtt = 50 * (1 + 0.1 * rng.random(duracao)) * (1 + 4 * quedas)
+        rttvar = rtt * rng.uniform(0.05, 0.2, duracao)
+        snd_cwnd = np.round(cliente * rtt * 1e-6 / 8 * 1.5)
+        snd_wnd = np.full(duracao, 3145728.0)
+        _save(f"{prefixo}-iperf3_client.csv", CABECALHO_CLIENTE["TCP"],
+              f"{HOST_SERVIDOR},{PORTA},TCP,%d,%.2f,%d,%.6f,%.1f,%.1f,%d,%d,%.6f,%.6f",
+              [bytes_cliente, cliente, retransmissoes, np.ones(duracao), rtt, rttvar, snd_cwnd, snd_wnd, inicio, fim])
+        _save(f"{prefixo}-iperf3_server.csv", CABECALHO_SERVIDOR["TCP"],
+              f"{HOST_CLIENTE},{PORTA + 1},%d,%.2f,%.6f,%.6f",
+              [bytes_servidor, servidor, inicio, fim])
+    else:
+        pacotes = np.maximum(bytes_cliente // TAMANHO_DATAGRAMA, 1)
+        perda = np.where(rng.random(duracao) < 0.05, rng.exponential(0.05, duracao), 0.0) + 30 * quedas
+        perdidos = np.round(pacotes * perda / 100)
+        jitter = rng.lognormal(np.log(0.005), 0.4, duracao)
+        _save(f"{prefixo}-iperf3_client.csv", CABECALHO_CLIENTE["UDP"],
+              f"{HOST_SERVIDOR},{PORTA},UDP,%d,%.2f,%.6f,%.6f",
+              [bytes_cliente, cliente, inicio, fim])
+        _save(f"{prefixo}-iperf3_server.csv", CABECALHO_SERVIDOR["UDP"],
+              f"{HOST_CLIENTE},{PORTA + 1},%d,%.2f,%.6f,%d,%.6f,%.6f,%.6f",
+              [bytes_servidor, servidor, jitter, perdidos, 100 * perdidos / pacotes, inicio, fim])
+
+    if fluxos > 1:
+        pesos = rng.dirichlet(np.full(fluxos, 20.0), duracao)
+        intervalo = np.repeat(np.arange(duracao), fluxos)
+        fluxo = np.tile(np.arange(fluxos), duracao)
+        bps = (cliente[:, None] * pesos).ravel()
+        retr = rng.poisson(2.0 / fluxos, duracao * fluxos) if protocolo == "TCP" else np.zeros(duracao * fluxos)
+        _save(f"{prefixo}-iperf3_client_fluxos.csv", CABECALHO_FLUXOS,
+              "%d,%d,%d,%d,%.2f,%d,%d,%.1f,%.1f,%d",
+              [intervalo, fluxo, fluxo + 5, np.round(bps / 8), bps, retr,
+               np.round(bps * 50e-6 / 8 * 1.5), np.full(len(bps), 50.0), np.full(len(bps), 5.0),
+               np.full(len(bps), 3145728.0)])
+
+    # Uso de CPU: ocioso, com interrupções esparsas, e os núcleos fixados proporcionais à vazão
+    uso = rng.gamma(1.0, 1.5, (duracao, nucleos))
+    uso[rng.random((duracao, nucleos)) < 0.01] += 20
+    carga = servidor / max(vazao_bps, 1)
+    for j, nucleo in enumerate(nucleos_fixados):
+        uso[:, nucleo] = 45 + 15 * j + 15 * carga + rng.normal(0, 3, duracao)
+    uso = np.round(np.clip(uso, 0, 100), 2)
+    _save(f"{prefixo}-mpstat.csv", ",".join([f"CPU_{i}" for i in range(nucleos)] + ["inicio", "fim"]),
+          ",".join(["%.2f"] * nucleos + ["%.3f", "%.3f"]), [uso, inicio, fim])
+
+    if mpstat_log:
+        write_mpstat_log(f"{prefixo}-mpstat.log", uso, rng)
+    return rodada
+
+
+def write_mpstat_log(caminho, uso, rng):
+    """Log no formato do 'mpstat -P ALL 1', sem as cores do terminal."""
+    duracao, nucleos = uso.shape
+    cabecalho = "CPU    %usr   %nice    %sys %iowait    %irq   %soft  %steal  %guest  %gnice   %idle"
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(f"Linux 6.8.0-sintetico (sintetico) \t{INICIO:%m/%d/%y} \t_x86_64_\t({nucleos} CPU)\n\n")
+        for s in range(duracao):
+            anterior = (INICIO + timedelta(seconds=s)).strftime("%H:%M:%S")
+            horario = (INICIO + timedelta(seconds=s + 1)).strftime("%H:%M:%S")
+            f.write(f"{anterior}     {cabecalho}\n")
+            linhas = np.concatenate([[uso[s].mean()], uso[s]])
+            sys_frac = rng.uniform(0.6, 0.9, len(linhas))
+            for j, ocupado in enumerate(linhas):
+                cpu = "all" if j == 0 else str(j - 1)
+                usr, sis = ocupado * (1 - sys_frac[j]), ocupado * sys_frac[j]
+                f.write(f"{horario}  {cpu:>5} {usr:7.2f} {0:7.2f} {sis:7.2f} {0:7.2f} {0:7.2f} "
+                        f"{0:7.2f} {0:7.2f} {0:7.2f} {0:7.2f} {100 - ocupado:7.2f}\n")
+            f.write("\n")
+
+
+def write_test_files(test_dir, apelido, i, protocolo, duracao, nucleos, fluxos, rodadas):
+    cliente, servidor = test_cores(i, nucleos)
+    opcoes = f"-t {duracao} -A {cliente},{servidor}"
+    if protocolo == "UDP":
+        opcoes += " -u -b 0"
+    if fluxos > 1:
+        opcoes += f" -P {fluxos}"
+    inicio = INICIO + timedelta(seconds=i * rodadas * (duracao + 10))
+    with open(os.path.join(test_dir, f"{apelido}-conf.ini"), "w", encoding="utf-8") as f:
+        f.write(f"[Teste]\nNome=Teste Sintético {i + 1}\nDescricao=Teste {protocolo} sintético\n"
+                f"ComandoCliente=iperf3 -c {HOST_SERVIDOR} {opcoes} -J\n"
+                f"ComandoServidor=iperf3 -s -1 -J\n; Precisao=\n; PreparoAntes=\n; PreparoDepois=\n"
+                f"[Ambiente]\nInicio={inicio:%Y-%m-%d %H:%M:%S}\nHost=sintetico\nKernel=6.8.0-sintetico\n"
+                f"CPU=CPU sintética com {nucleos} núcleos\n[Topologia]\n")
+        metades = np.array_split(np.arange(nucleos), 2 if nucleos > 1 else 1)
+        for chave in ("NoNUMA", "Soquete"):
+            for n, metade in enumerate(metades):
+                f.write(f"{chave}{n}={','.join(str(c) for c in metade)}\n")
+    with open(os.path.join(test_dir, f"{apelido}-experimento.log"), "w", encoding="utf-8") as f:
+        f.write(f"\nInício: {inicio:%Y-%m-%d %H:%M:%S}\n")
+        f.write(f"\nFim: {inicio + timedelta(seconds=rodadas * (duracao + 10)):%Y-%m-%d %H:%M:%S}\n")
+    return (cliente, servidor) if nucleos > 1 else (cliente,)
+
+
+def generate(destino, testes=3, rodadas=5, duracao=60, nucleos=8, protocolo="misto", fluxos=1,
+             vazao_gbps=10.0, mpstat_log=False, semente=0, jobs=1):
+    """Gera a árvore em 'destino' e retorna a lista com os nomes dos testes."""
+    parametros = {"testes": testes, "rodadas": rodadas, "duracao": duracao, "nucleos": nucleos,
+                  "protocolo": protocolo, "fluxos": fluxos, "vazao_gbps": vazao_gbps,
+                  "mpstat_log": mpstat_log, "semente": semente}
+    os.makedirs(destino, exist_ok=True)
+    efeitos = np.random.default_rng([semente, 0]).normal(0, 0.03, testes)
+    tarefas, nomes = [], []
+    for i in range(testes):
+        apelido = test_name(i)
+        nomes.append(apelido)
+        test_dir = os.path.join(destino, apelido)
+        os.makedirs(test_dir, exist_ok=True)
+        proto = test_protocol(i, protocolo)
+        fixados = write_test_files(test_dir, apelido, i, proto, duracao, nucleos, fluxos, rodadas)
+        vazao_bps = vazao_gbps * 1e9 * (1 + efeitos[i])
+        for rodada in range(1, rodadas + 1):
+            tarefas.append((test_dir, apelido, rodada, proto, duracao, nucleos, fixados, fluxos,
+                            vazao_bps, mpstat_log, [semente, i + 1, rodada]))
+
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(write_round, tarefas, chunksize=max(1, len(tarefas) // (4 * jobs))))
+    else:
+        for tarefa in tarefas:
+            write_round(tarefa)
+
+    with open(os.path.join(destino, MARCADOR), "w", encoding="utf-8") as f:
+        json.dump(parametros, f, indent=2)
+    return nomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera resultados sintéticos para medir o desempenho do sumarizador.")
+    parser.add_argument("-d", "--destino", required=True, help="Diretório de resultados a ser criado.")
+    parser.add_argument("--testes", type=int, default=3, help="Quantidade de testes (padrão: 3).")
+    parser.add_argument("--rodadas", type=int, default=5, help="Rodadas por teste (padrão: 5).")
+    parser.add_argument("--duracao", type=int, default=60, help="Duração de cada rodada, em segundos (padrão: 60).")
+    parser.add_argument("--nucleos", type=int, default=8, help="Quantidade de núcleos de CPU (padrão: 8).")
+    parser.add_argument("--protocolo", choices=("tcp", "udp", "misto"), default="misto",
+                        help="Protocolo dos testes; misto alterna TCP e UDP (padrão: misto).")
+    parser.add_argument("--fluxos", type=int, default=1, help="Fluxos paralelos (-P) de cada teste (padrão: 1).")
+    parser.add_argument("--vazao", type=float, default=10.0, help="Vazão nominal, em Gbps (padrão: 10).")
+    parser.add_argument("--mpstat-log", action="store_true", help="Também grava o log do mpstat de cada rodada.")
+    parser.add_argument("--semente", type=int, default=0, help="Semente do gerador aleatório (padrão: 0).")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Processos usados na geração (padrão: 1).")
+    args = parser.parse_args()
+
+    if min(args.testes, args.rodadas, args.duracao, args.nucleos, args.fluxos) < 1:
+        parser.error("--testes, --rodadas, --duracao, --nucleos e --fluxos devem ser positivos")
+    nomes = generate(args.destino, args.testes, args.rodadas, args.duracao, args.nucleos, args.protocolo,
+                     args.fluxos, args.vazao, args.mpstat_log, args.semente, args.jobs)
+    print(f"Gerados {len(nomes)} testes com {args.rodadas} rodadas cada em {args.destino}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
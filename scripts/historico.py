@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Histórico dos resultados em um banco SQLite, para acompanhar a evolução de
+cada teste entre experimentos.
+
+Subcomandos:
+    importar   percorre diretórios de resultados e grava, para cada teste
+               encontrado (diretório com subdiretórios rodada_N), os dados do
+               <teste>-conf.ini (Nome, Descricao, ComandoCliente,
+               ComandoServidor e a seção [Ambiente] com host, kernel e CPU),
+               as médias de cada rodada e as médias de cada teste com IC de 95%;
+    consultar  lista os testes importados, com filtros por nome, host e data;
+    tendencia  desenha a vazão, a perda e o uso de CPU de um ou mais testes
+               (pelo Nome do conf.ini) ao longo do tempo.
+
+A importação é incremental e idempotente: cada rodada guarda uma assinatura
+(tamanho e data de modificação dos seus CSV/INI), e só as rodadas novas ou
+alteradas são relidas. Rodadas removidas do disco também saem do banco.
+Importar o mesmo diretório duas vezes não muda o banco.
+
+Uso:
+    historico.py -b historico.db importar resultados/ arquivo/2024/
+    historico.py -b historico.db consultar --teste "Teste 1" --desde 2025-01-01
+    historico.py -b historico.db tendencia --teste "Teste 1" --teste "Teste 2" -o graficos/
+"""
+import os
+import re
+import csv
+import sys
+import json
+import sqlite3
+import argparse
+import configparser
+from datetime import datetime
+
+import numpy as np
+
+from charts import ChartSpec, submit_chart, wait_charts
+from confidence import half_width
+from experiment_data import format_label, get_round_dirs, load_round_data
+
+VERSAO_ESQUEMA = 1
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS testes (
+    id INTEGER PRIMARY KEY,
+    caminho TEXT NOT NULL UNIQUE,     -- diretório do teste (absoluto)
+    apelido TEXT NOT NULL,            -- nome do diretório do teste
+    nome TEXT NOT NULL,               -- Nome do conf.ini (ou o apelido formatado)
+    descricao TEXT,
+    comando_cliente TEXT,
+    comando_servidor TEXT,
+    host TEXT,
+    kernel TEXT,
+    cpu TEXT,
+    inicio TEXT,                      -- data do teste (ISO 8601)
+    assinatura TEXT,                  -- tamanho/data do conf.ini e do log
+    rodadas INTEGER,
+    vazao REAL, vazao_ic REAL,        -- bps, servidor (ou cliente)
+    perda REAL, perda_ic REAL,        -- % (UDP) ou retransmissões por medição (TCP)
+    cpu_uso REAL, cpu_uso_ic REAL,    -- soma do uso médio dos núcleos (%)
+    importado_em TEXT
+);
+CREATE INDEX IF NOT EXISTS testes_nome_inicio ON testes (nome, inicio);
+CREATE INDEX IF NOT EXISTS testes_apelido ON testes (apelido);
+CREATE INDEX IF NOT EXISTS testes_host ON testes (host);
+
+CREATE TABLE IF NOT EXISTS rodadas (
+    teste_id INTEGER NOT NULL REFERENCES testes (id) ON DELETE CASCADE,
+    numero INTEGER NOT NULL,
+    assinatura TEXT NOT NULL,
+    medicoes INTEGER,
+    vazao_cliente REAL,
+    vazao_servidor REAL,
+    perda REAL,
+    retransmissoes REAL,
+    jitter REAL,
+    cpu_uso REAL,
+    PRIMARY KEY (teste_id, numero)
+);
+
+CREATE TABLE IF NOT EXISTS rodadas_cpu (
+    teste_id INTEGER NOT NULL,
+    numero INTEGER NOT NULL,
+    nucleo TEXT NOT NULL,
+    uso REAL,
+    PRIMARY KEY (teste_id, numero, nucleo),
+    FOREIGN KEY (teste_id, numero) REFERENCES rodadas (teste_id, numero) ON DELETE CASCADE
+);
+"""
+
+# Arquivos de cada rodada que entram na assinatura
+SUFIXOS_RODADA = ("iperf3_client.csv", "iperf3_server.csv", "mpstat.csv", "regime.ini")
+
+
+def open_database(path):
+    """Abre (e cria, se preciso) o banco do histórico."""
+    conexao = sqlite3.connect(path)
+    conexao.execute("PRAGMA foreign_keys = ON")
+    conexao.execute("PRAGMA journal_mode = WAL")
+    versao = conexao.execute("PRAGMA user_version").fetchone()[0]
+    if versao not in (0, VERSAO_ESQUEMA):
+        raise ValueError(f"versão do banco não suportada: {versao}")
+    conexao.executescript(ESQUEMA)
+    conexao.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
+    return conexao
+
+
+def _signature(caminhos):
+    """Tamanho e data de modificação de cada arquivo existente, em JSON."""
+    assinatura = []
+    for caminho in caminhos:
+        try:
+            st = os.stat(caminho)
+        except OSError:
+            continue
+        assinatura.append([os.path.basename(caminho), st.st_size, st.st_mtime_ns])
+    return json.dumps(assinatura)
+
+
+def find_test_dirs(raizes):
+    """Diretórios de teste (com subdiretórios rodada_N) sob cada uma das 'raizes'."""
+    for raiz in raizes:
+        for atual, subdirs, _ in os.walk(raiz):
+            if any(d.startswith("rodada_") for d in subdirs):
+                yield os.path.abspath(atual)
+            # Não desce nas rodadas, nos diretórios sumarizados nem nos caches
+            subdirs[:] = sorted(d for d in subdirs
+                                if not d.startswith(("rodada_", "sumarizado-", ".")))
+
+
+def _test_date(test_dir, apelido, cfg):
+    """
+    Data do teste: Inicio da seção [Ambiente] do conf.ini, a primeira data
+    (Início/Fim) do <teste>-experimento.log ou, sem nenhuma delas, a data de
+    modificação mais antiga entre os arquivos das rodadas.
+    """
+    inicio = cfg.get("Ambiente", "Inicio", fallback="").strip()
+    if inicio:
+        return inicio.replace(" ", "T")
+    try:
+        with open(os.path.join(test_dir, f"{apelido}-experimento.log"), encoding="utf-8", errors="replace") as f:
+            m = re.search(r'(?:Início|Fim): (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', f.read())
+        if m:
+            return m.group(1).replace(" ", "T")
+    except OSError:
+        pass
+    datas = [os.path.getmtime(os.path.join(atual, a))
+             for atual, _, arquivos in os.walk(test_dir) for a in arquivos if a.endswith(".csv")]
+    return datetime.fromtimestamp(min(datas)).isoformat(timespec="seconds") if datas else None
+
+
+def _read_test_conf(test_dir, apelido):
+    cfg = configparser.ConfigParser(interpolation=None)
+    cfg.optionxform = str
+    try:
+        cfg.read(os.path.join(test_dir, f"{apelido}-conf.ini"), encoding="utf-8")
+    except configparser.Error as e:
+        print(f"Aviso: falha ao ler '{apelido}-conf.ini': {e}")
+    return cfg
+
+
+def _mean(df, coluna):
+    if df is None or coluna not in df.columns or len(df) == 0:
+        return None
+    valor = float(df[coluna].mean())
+    return valor if np.isfinite(valor) else None
+
+
+def summarize_round(r):
+    """Médias de uma rodada (RoundData): {coluna: valor} e {núcleo: uso}."""
+    nucleos = {}
+    if r.mpstat is not None and len(r.mpstat) > 0:
+        nucleos = {c: float(v) for c, v in r.mpstat.mean().items() if np.isfinite(v)}
+    return {
+        "medicoes": len(r.client) if r.client is not None else 0,
+        "vazao_cliente": _mean(r.client, "bits_por_segundo"),
+        "vazao_servidor": _mean(r.server, "bits_por_segundo"),
+        "perda": _mean(r.server, "porcentagem_pacotes_perdidos"),
+        "retransmissoes": _mean(r.client, "retransmissoes"),
+        "jitter": _mean(r.server, "jitter"),
+        "cpu_uso": sum(nucleos.values()) if nucleos else None,
+    }, nucleos
+
+
+def _update_test_aggregates(conexao, teste_id):
+    """Recalcula as médias do teste (com IC de 95%) a partir das suas rodadas."""
+    linhas = conexao.execute(
+        "SELECT COALESCE(vazao_servidor, vazao_cliente), COALESCE(perda, retransmissoes), cpu_uso "
+        "FROM rodadas WHERE teste_id = ?", (teste_id,)).fetchall()
+    valores = np.array(linhas, dtype=float).reshape(-1, 3)
+    n = (~np.isnan(valores)).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        medias = np.nansum(valores, axis=0) / n
+    erros = half_width(valores) if len(valores) else np.zeros(3)
+    agregados = [None if not np.isfinite(v) else float(v) for par in zip(medias, erros) for v in par]
+    conexao.execute(
+        "UPDATE testes SET rodadas = ?, vazao = ?, vazao_ic = ?, perda = ?, perda_ic = ?, "
+        "cpu_uso = ?, cpu_uso_ic = ? WHERE id = ?", (len(valores), *agregados, teste_id))
+
+
+def import_test(conexao, test_dir):
+    """
+    Importa um teste. Retorna a quantidade de rodadas (re)lidas do disco;
+    0 se nada mudou desde a última importação.
+    """
+    apelido = os.path.basename(test_dir)
+    assinatura_teste = _signature([os.path.join(test_dir, f"{apelido}-conf.ini"),
+                                   os.path.join(test_dir, f"{apelido}-experimento.log")])
+    linha = conexao.execute("SELECT id, assinatura FROM testes WHERE caminho = ?", (test_dir,)).fetchone()
+    teste_id, assinatura_anterior = linha if linha else (None, None)
+
+    if assinatura_teste != assinatura_anterior:
+        cfg = _read_test_conf(test_dir, apelido)
+        campos = {
+            "apelido": apelido,
+            "nome": cfg.get("Teste", "Nome", fallback="").strip() or format_label(apelido),
+            "descricao": cfg.get("Teste", "Descricao", fallback=None),
+            "comando_cliente": cfg.get("Teste", "ComandoCliente", fallback=None),
+            "comando_servidor": cfg.get("Teste", "ComandoServidor", fallback=None),
+            "host": cfg.get("Ambiente", "Host", fallback=None),
+            "kernel": cfg.get("Ambiente", "Kernel", fallback=None),
+            "cpu": cfg.get("Ambiente", "CPU", fallback=None),
+            "inicio": _test_date(test_dir, apelido, cfg),
+            "assinatura": assinatura_teste,
+            "importado_em": datetime.now().isoformat(timespec="seconds"),
+        }
+        if teste_id is None:
+            colunas = ", ".join(["caminho", *campos])
+            teste_id = conexao.execute(
+                f"INSERT INTO testes ({colunas}) VALUES ({', '.join('?' * (len(campos) + 1))})",
+                (test_dir, *campos.values())).lastrowid
+        else:
+            atribuicoes = ", ".join(f"{c} = ?" for c in campos)
+            conexao.execute(f"UPDATE testes SET {atribuicoes} WHERE id = ?", (*campos.values(), teste_id))
+
+    existentes = dict(conexao.execute("SELECT numero, assinatura FROM rodadas WHERE teste_id = ?", (teste_id,)))
+    no_disco = set()
+    lidas = 0
+    for rodada in get_round_dirs(test_dir):
+        m = re.fullmatch(r'rodada_(\d+)', rodada)
+        if not m:
+            continue
+        numero = int(m.group(1))
+        no_disco.add(numero)
+        prefixo = os.path.join(test_dir, rodada, f"{rodada}-{apelido}")
+        assinatura = _signature([f"{prefixo}-{sufixo}" for sufixo in SUFIXOS_RODADA])
+        if existentes.get(numero) == assinatura:
+            continue
+        medias, nucleos = summarize_round(load_round_data(test_dir, apelido, rodada))
+        conexao.execute("DELETE FROM rodadas WHERE teste_id = ? AND numero = ?", (teste_id, numero))
+        conexao.execute(
+            f"INSERT INTO rodadas (teste_id, numero, assinatura, {', '.join(medias)}) "
+            f"VALUES (?, ?, ?, {', '.join('?' * len(medias))})",
+            (teste_id, numero, assinatura, *medias.values()))
+        conexao.executemany("INSERT INTO rodadas_cpu (teste_id, numero, nucleo, uso) VALUES (?, ?, ?, ?)",
+                            [(teste_id, numero, nucleo, uso) for nucleo, uso in nucleos.items()])
+        lidas += 1
+
+    removidas = set(existentes) - no_disco
+    conexao.executemany("DELETE FROM rodadas WHERE teste_id = ? AND numero = ?",
+                        [(teste_id, numero) for numero in removidas])
+    if lidas or removidas or linha is None:
+        _update_test_aggregates(conexao, teste_id)
+    return lidas
+
+
+def import_results(conexao, raizes):
+    """Importa todos os testes sob 'raizes'. Retorna (testes, rodadas lidas)."""
+    testes = rodadas = 0
+    for test_dir in find_test_dirs(raizes):
+        with conexao:  # uma transação por teste
+            lidas = import_test(conexao, test_dir)
+        testes += 1
+        rodadas += lidas
+        if lidas:
+            print(f"  {test_dir}: {lidas} rodada(s) importada(s)")
+    return testes, rodadas
+
+
+def query_tests(conexao, nomes=None, host=None, desde=None, ate=None):
+    """Testes importados, em ordem de nome e data, com os filtros informados."""
+    condicoes, parametros = [], []
+    if nomes:
+        condicoes.append(f"(nome IN ({', '.join('?' * len(nomes))}) OR apelido IN ({', '.join('?' * len(nomes))}))")
+        parametros += list(nomes) * 2
+    if host:
+        condicoes.append("host = ?")
+        parametros.append(host)
+    if desde:
+        condicoes.append("inicio >= ?")
+        parametros.append(desde)
+    if ate:
+        condicoes.append("inicio <= ?")
+        parametros.append(ate + "T23:59:59" if len(ate) == 10 else ate)
+    onde = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    conexao.row_factory = sqlite3.Row
+    try:
+        return conexao.execute(f"SELECT * FROM testes {onde} ORDER BY nome, inicio", parametros).fetchall()
+    finally:
+        conexao.row_factory = None
+
+
+def _fmt(valor, fator=1.0, casas=2):
+    return "-" if valor is None else f"{valor / fator:.{casas}f}"
+
+
+def print_tests(testes, formato="tabela"):
+    colunas = ["Data", "Nome", "Host", "Kernel", "Rodadas", "Vazão (Gbps)", "Perda", "CPU (%)", "Caminho"]
+    linhas = [[
+        t["inicio"] or "-", t["nome"], t["host"] or "-", t["kernel"] or "-", str(t["rodadas"] or 0),
+        f"{_fmt(t['vazao'], 1e9, 4)} ± {_fmt(t['vazao_ic'], 1e9, 4)}",
+        f"{_fmt(t['perda'], 1, 4)} ± {_fmt(t['perda_ic'], 1, 4)}",
+        f"{_fmt(t['cpu_uso'])} ± {_fmt(t['cpu_uso_ic'])}",
+        t["caminho"],
+    ] for t in testes]
+    if formato == "csv":
+        escritor = csv.writer(sys.stdout)
+        escritor.writerow(colunas)
+        escritor.writerows(linhas)
+        return
+    larguras = [max(len(c), *(len(l[i]) for l in linhas)) if linhas else len(c) for i, c in enumerate(colunas)]
+    print("  ".join(c.ljust(w) for c, w in zip(colunas, larguras)))
+    for l in linhas:
+        print("  ".join(v.ljust(w) for v, w in zip(l, larguras)))
+
+
+def plot_tendencia(testes, nomes, png_path, svg_path):
+    """
+    Vazão, perda e uso de CPU (média e IC de 95% entre rodadas) de cada nome
+    de teste ao longo do tempo, em três painéis com o eixo de datas comum.
+    """
+    chart = ChartSpec(png_path, svg_path, figsize=(12, 9), nrows=3)
+    paineis = [("vazao", 1e9, "Vazão (Gbps)"), ("perda", 1.0, "Perda (%) / Retransmissões"), ("cpu_uso", 1.0, "Uso de CPU (%)")]
+    for nome in nomes:
+        serie = [t for t in testes if nome in (t["nome"], t["apelido"]) and t["inicio"]]
+        if not serie:
+            continue
+        datas = [datetime.fromisoformat(t["inicio"]) for t in serie]
+        for painel, (coluna, fator, _) in enumerate(paineis):
+            valores = [np.nan if t[coluna] is None else t[coluna] / fator for t in serie]
+            erros = [0.0 if t[f"{coluna}_ic"] is None else t[f"{coluna}_ic"] / fator for t in serie]
+            chart.call_at(painel, "errorbar", datas, valores, yerr=erros, marker="o", capsize=4,
+                          label=serie[0]["nome"] if painel == 0 else None)
+    for painel, (_, _, rotulo) in enumerate(paineis):
+        chart.call_at(painel, "set_ylabel", rotulo)
+        chart.call_at(painel, "grid", True, alpha=0.3)
+    chart.call_at(0, "set_title", "Histórico dos testes")
+    chart.call_at(0, "legend")
+    chart.call_at(2, "set_xlabel", "Data do teste")
+    submit_chart(chart)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Histórico dos resultados dos experimentos em um banco SQLite.")
+    parser.add_argument("-b", "--banco", default="historico.db", help="Arquivo do banco SQLite (padrão: historico.db).")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_importar = sub.add_parser("importar", help="Importa (incrementalmente) os testes de diretórios de resultados.")
+    p_importar.add_argument("diretorios", nargs="+", help="Diretórios de resultados (percorridos recursivamente).")
+
+    filtros = argparse.ArgumentParser(add_help=False)
+    filtros.add_argument("-t", "--teste", action="append", help="Nome do teste (Nome do conf.ini ou diretório). Pode ser repetido.")
+    filtros.add_argument("--host", help="Somente testes executados neste host.")
+    filtros.add_argument("--desde", help="Data inicial (AAAA-MM-DD).")
+    filtros.add_argument("--ate", help="Data final (AAAA-MM-DD).")
+
+    p_consultar = sub.add_parser("consultar", parents=[filtros], help="Lista os testes importados.")
+    p_consultar.add_argument("--formato", choices=("tabela", "csv"), default="tabela", help="Formato da saída (padrão: tabela).")
+
+    p_tendencia = sub.add_parser("tendencia", parents=[filtros], help="Gráfico da evolução dos testes ao longo do tempo.")
+    p_tendencia.add_argument("-o", "--saida", default=".", help="Diretório dos gráficos (padrão: diretório atual).")
+
+    args = parser.parse_args()
+    conexao = open_database(args.banco)
+    try:
+        if args.comando == "importar":
+            testes, rodadas = import_results(conexao, args.diretorios)
+            print(f"Testes verificados: {testes}; rodadas importadas: {rodadas}")
+            return 0
+
+        testes = query_tests(conexao, args.teste, args.host, args.desde, args.ate)
+        if args.comando == "consultar":
+            print_tests(testes, args.formato)
+            return 0
+
+        nomes = args.teste or sorted({t["nome"] for t in testes})
+        if not testes:
+            print("Nenhum teste encontrado com os filtros informados.", file=sys.stderr)
+            return 1
+        os.makedirs(args.saida, exist_ok=True)
+        prefixo = "-".join(re.sub(r'\W+', '_', n) for n in nomes)
+        png_path = os.path.join(args.saida, f"{prefixo}-historico.png")
+        plot_tendencia(testes, nomes, png_path, os.path.join(args.saida, f"{prefixo}-historico.svg"))
+        wait_charts()
+        print(f"Gráfico gerado: {png_path}")
+        return 0
+    finally:
+        conexao.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
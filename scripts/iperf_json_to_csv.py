@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Converte a saída JSON do iperf3 (-J ou --json-stream) em CSV, com uma única
+leitura do arquivo e memória limitada, independentemente da duração do teste.
+
+O arquivo é lido em blocos e os intervals[] são decodificados um a um. O
+papel (cliente/servidor) e o protocolo (TCP/UDP) são detectados pelo objeto
+'start', e as primeiras N medições (opção -O/--omit do iperf3) são
+descartadas durante a leitura. As colunas geradas são as mesmas do antigo
+iperf-json-to-csv; no cliente TCP, são acrescentadas a duração do intervalo
+(segundos) e os dados internos do TCP, obtidos dos fluxos do intervalo: rtt e
+rttvar (média entre os fluxos, em µs) e snd_cwnd e snd_wnd (soma dos fluxos,
+em bytes). Esses campos ficam vazios quando a versão do iperf3 não os informa.
+Todas as tabelas terminam com o início e o fim de cada intervalo (inicio,
+fim), em segundos desde o início da medição, usados para alinhar as rodadas e
+as amostras de CPU em uma grade de tempo comum.
+
+Uso:
+    iperf_json_to_csv.py <arquivo_json> [amostras_omitidas] [--fluxos arquivo_fluxos.csv] [--regime arquivo_regime.ini] > arquivo.csv
+    iperf_json_to_csv.py --lote <dir_resultados> [-O N] [-j N]
+
+Com --fluxos, é gravado também um CSV com os dados de cada fluxo paralelo
+(-P) em cada intervalo: bytes, bits por segundo e, no cliente TCP,
+retransmissões, snd_cwnd, rtt, rttvar e snd_wnd. Com --regime, é gravado o
+arquivo INI com o fim do aquecimento da rodada, detectado pela média e pela
+variância móveis da vazão (veja steady_state.py).
+
+No modo em lote, todos os arquivos *-iperf3_client.json e *-iperf3_server.json
+encontrados sob o diretório são convertidos para o .csv correspondente (e para
+o _fluxos.csv), em paralelo. A quantidade de medições omitidas de cada teste é lida do
+ComandoCliente do arquivo <teste>-conf.ini; se não houver, usa-se -O. O fim
+do aquecimento é detectado a partir do JSON do servidor e gravado no
+rodada_N-<teste>-regime.ini.
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import tempfile
+import configparser
+from concurrent.futures import ProcessPoolExecutor
+
+from steady_state import detect_warmup, write_steady_state
+
+CABECALHOS = {
+    ("servidor", "UDP"): "host_origem,porta_origem,total_bytes_transferidos,bits_por_segundo,jitter,total_pacotes_perdidos,porcentagem_pacotes_perdidos,inicio,fim",
+    ("servidor", "TCP"): "host_origem,porta_origem,total_bytes_transferidos,bits_por_segundo,inicio,fim",
+    ("cliente", "UDP"): "host_destino,porta_destino,protocolo,bytes_transferidos,bits_por_segundo,inicio,fim",
+    ("cliente", "TCP"): "host_destino,porta_destino,protocolo,bytes_transferidos,bits_por_segundo,retransmissoes,segundos,rtt,rttvar,snd_cwnd,snd_wnd,inicio,fim",
+}
+
+# Dados internos do TCP agregados entre os fluxos de cada intervalo
+AGREGADOS_TCP = [("rtt", "media"), ("rttvar", "media"), ("snd_cwnd", "soma"), ("snd_wnd", "soma")]
+
+# Dados de cada fluxo paralelo (-P) em cada intervalo (intervals[].streams[])
+CABECALHO_FLUXOS = "intervalo,fluxo,socket,bytes_transferidos,bits_por_segundo,retransmissoes,snd_cwnd,rtt,rttvar,snd_wnd"
+CAMPOS_FLUXOS = ["socket", "bytes", "bits_per_second", "retransmits", "snd_cwnd", "rtt", "rttvar", "snd_wnd"]
+
+SUFIXOS_JSON = ("-iperf3_client.json", "-iperf3_server.json")
+
+# Tamanho do bloco de leitura (e do buffer em memória das linhas pendentes)
+TAMANHO_BLOCO = 1 << 20
+
+_DECODER = json.JSONDecoder()
+_ESPACOS = re.compile(r"\s*")
+_JSON_STREAM = re.compile(r'\{\s*"event"\s*:')
+
+
+def format_value(value):
+    """Formata um valor JSON da mesma forma que a interpolação de strings do jq."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e17:
+        return str(int(value))
+    return str(value)
+
+
+class _StreamReader:
+    """
+    Leitura incremental de um arquivo de texto com um buffer limitado. Cada
+    valor JSON é decodificado assim que está completo no buffer, e o trecho
+    já consumido é descartado.
+    """
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Acrescenta mais texto ao buffer. Retorna False no fim do arquivo."""
+        if self.eof:
+            return False
+        if self.pos > TAMANHO_BLOCO:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        # Valores grandes fazem o bloco crescer geometricamente
+        dados = self.f.read(max(TAMANHO_BLOCO, len(self.buf) - self.pos))
+        if not dados:
+            self.eof = True
+            return False
+        self.buf += dados
+        return True
+
+    def skip_to(self, caractere):
+        """Descarta o texto até a próxima ocorrência de 'caractere'."""
+        while True:
+            i = self.buf.find(caractere, self.pos)
+            if i >= 0:
+                self.pos = i
+                return True
+            self.pos = len(self.buf)
+            if not self.fill():
+                return False
+
+    def peek(self, minimo=1):
+        """
+        Pula espaços em branco e retorna o próximo trecho (ao menos 'minimo'
+        caracteres, se houver) sem consumi-lo. Retorna '' no fim do arquivo.
+        """
+        while True:
+            self.pos = _ESPACOS.match(self.buf, self.pos).end()
+            if len(self.buf) - self.pos >= minimo or not self.fill():
+                return self.buf[self.pos:self.pos + minimo]
+
+    def expect(self, caractere):
+        if self.peek() != caractere:
+            raise ValueError(f"JSON inválido: esperado '{caractere}'")
+        self.pos += 1
+
+    def value(self):
+        """Decodifica o próximo valor JSON."""
+        self.peek()
+        while True:
+            try:
+                valor, fim = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # Um número no fim do buffer pode estar incompleto
+            if fim == len(self.buf) and self.fill():
+                continue
+            self.pos = fim
+            return valor
+
+
+def iter_events(f):
+    """
+    Percorre a saída do iperf3 e gera tuplas (evento, dados), com evento em
+    "start", "interval", "end" ou "error", sem carregar o arquivo inteiro.
+
+    Aceita tanto o documento único de -J/--json, cujos intervals[] são lidos
+    um a um, quanto o formato de uma linha por evento de --json-stream.
+    Qualquer texto anterior ao primeiro '{' é ignorado.
+    """
+    leitor = _StreamReader(f)
+    if not leitor.skip_to("{"):
+        raise ValueError("nenhum objeto JSON encontrado")
+
+    if _JSON_STREAM.match(leitor.peek(64)):
+        # --json-stream: {"event": "...", "data": {...}} por linha
+        while leitor.skip_to("{"):
+            objeto = leitor.value()
+            if isinstance(objeto, dict) and "event" in objeto:
+                yield objeto["event"], objeto.get("data")
+        return
+
+    leitor.expect("{")
+    while True:
+        c = leitor.peek()
+        if c == "}":
+            return
+        if c == ",":
+            leitor.pos += 1
+            continue
+        if c == "":
+            raise ValueError("JSON incompleto")
+        chave = leitor.value()
+        leitor.expect(":")
+        if chave != "intervals":
+            yield chave, leitor.value()
+            continue
+        leitor.expect("[")
+        while True:
+            c = leitor.peek()
+            if c == "]":
+                leitor.pos += 1
+                break
+            if c == ",":
+                leitor.pos += 1
+                continue
+            if c == "":
+                raise ValueError("JSON incompleto")
+            yield "interval", leitor.value()
+
+
+def detect_kind(start):
+    """Retorna (papel, protocolo) a partir do objeto 'start', ex.: ("cliente", "TCP")."""
+    papel = "servidor" if "accepted_connection" in start else "cliente"
+    protocolo = start.get("test_start", {}).get("protocol")
+    return papel, "UDP" if protocolo == "UDP" else "TCP"
+
+
+def interval_fields(papel, protocolo, intervalo):
+    """Campos de um intervalo que vêm depois de host, porta (e protocolo)."""
+    soma = intervalo.get("sum", {})
+    campos = [soma.get("bytes"), soma.get("bits_per_second")]
+    if papel == "servidor" and protocolo == "UDP":
+        campos += [soma.get("jitter_ms"), soma.get("lost_packets"), soma.get("lost_percent")]
+    elif papel == "cliente" and protocolo == "TCP":
+        campos += [soma.get("retransmits"), soma.get("seconds")]
+    campos = [format_value(c) for c in campos]
+    if papel == "cliente" and protocolo == "TCP":
+        campos += tcp_fields(intervalo.get("streams", []))
+    campos += [format_value(soma.get("start")), format_value(soma.get("end"))]
+    return ",".join(campos)
+
+
+def tcp_fields(streams):
+    """rtt, rttvar, snd_cwnd e snd_wnd do intervalo, agregados entre os fluxos."""
+    for campo, agregacao in AGREGADOS_TCP:
+        valores = [s[campo] for s in streams if s.get(campo) is not None]
+        if not valores:
+            yield ""
+        elif agregacao == "soma":
+            yield format_value(sum(valores))
+        else:
+            yield format_value(round(sum(valores) / len(valores), 3))
+
+
+def stream_lines(indice, intervalo):
+    """
+    Linhas CSV (uma por fluxo) de um intervalo. Campos que o iperf3 não
+    informa para o papel/protocolo (ex.: rtt no servidor) ficam vazios.
+    """
+    for fluxo, stream in enumerate(intervalo.get("streams", []), start=1):
+        campos = [stream.get(c) for c in CAMPOS_FLUXOS]
+        yield ",".join([str(indice), str(fluxo)] + ["" if c is None else format_value(c) for c in campos])
+
+
+def convert(json_path, out, omitidas=0, fluxos=None, regime=None):
+    """
+    Converte um arquivo JSON do iperf3, escrevendo o CSV em 'out' à medida
+    que os intervalos são lidos. No cliente TCP, a coluna de protocolo
+    depende do objeto 'end', que vem depois dos intervalos; por isso, as
+    linhas são guardadas em um arquivo temporário até que ele seja lido.
+    Se 'fluxos' for informado, nele é escrito o CSV por fluxo paralelo e,
+    se 'regime' for informado, o INI com o fim do aquecimento.
+    """
+    start = end = None
+    papel = protocolo = prefixo = None
+    pendentes = None
+    indice = 0
+    vazoes, inicios = [], []  # para a detecção do aquecimento
+    with open(json_path, encoding="utf-8", errors="replace") as f:
+        for evento, dados in iter_events(f):
+            if evento == "start" and start is None:
+                start = dados
+                papel, protocolo = detect_kind(start)
+                conexao = (start.get("connected") or [{}])[0]
+                prefixo = f"{format_value(conexao.get('remote_host'))},{format_value(conexao.get('remote_port'))}"
+                if papel == "cliente":
+                    prefixo += "," + format_value(start.get("test_start", {}).get("protocol"))
+                out.write(CABECALHOS[(papel, protocolo)] + "\n")
+                if fluxos is not None:
+                    fluxos.write(CABECALHO_FLUXOS + "\n")
+                if (papel, protocolo) == ("cliente", "TCP"):
+                    pendentes = tempfile.SpooledTemporaryFile(max_size=TAMANHO_BLOCO, mode="w+", encoding="utf-8")
+            elif evento == "interval":
+                if start is None:
+                    raise ValueError("intervalo encontrado antes do objeto 'start'")
+                if omitidas > 0:
+                    omitidas -= 1
+                    continue
+                linha = interval_fields(papel, protocolo, dados)
+                if pendentes is not None:
+                    pendentes.write(linha + "\n")
+                else:
+                    out.write(f"{prefixo},{linha}\n")
+                if fluxos is not None:
+                    for linha_fluxo in stream_lines(indice, dados):
+                        fluxos.write(linha_fluxo + "\n")
+                if regime is not None:
+                    soma = dados.get("sum", {})
+                    vazao, inicio = soma.get("bits_per_second"), soma.get("start")
+                    vazoes.append(float("nan") if vazao is None else vazao)
+                    inicios.append(float(indice) if inicio is None else inicio)
+                indice += 1
+            elif evento == "end":
+                end = dados
+                # Em --json-stream, eventos após o 'end' são de outro teste
+                break
+    if start is None:
+        raise ValueError("objeto 'start' não encontrado")
+    if pendentes is not None:
+        end = end or {}
+        prefixo += f"_{format_value(end.get('sender_tcp_congestion'))}_{format_value(end.get('receiver_tcp_congestion'))}"
+        pendentes.seek(0)
+        for linha in pendentes:
+            out.write(f"{prefixo},{linha}")
+        pendentes.close()
+    if regime is not None:
+        corte = detect_warmup(vazoes)
+        write_steady_state(regime, corte, inicios[corte] if corte else 0.0)
+
+
+def convert_file(json_path, omitidas=0):
+    """
+    Converte 'json_path' para o .csv de mesmo nome e para o _fluxos.csv com
+    os dados por fluxo. Para o JSON do servidor, grava também o
+    rodada_N-<teste>-regime.ini com o fim do aquecimento. Retorna o caminho
+    do .csv gerado.
+    """
+    base = json_path[:-len(".json")]
+    csv_path = base + ".csv"
+    fluxos_path = base + "_fluxos.csv"
+    regime_path = None
+    if base.endswith("-iperf3_server"):
+        regime_path = base[:-len("-iperf3_server")] + "-regime.ini"
+    temporarios = [csv_path + ".tmp", fluxos_path + ".tmp"] + ([regime_path + ".tmp"] if regime_path else [])
+    try:
+        with open(csv_path + ".tmp", "w", encoding="utf-8") as out, \
+             open(fluxos_path + ".tmp", "w", encoding="utf-8") as fluxos:
+            regime = open(regime_path + ".tmp", "w", encoding="utf-8") if regime_path else None
+            try:
+                convert(json_path, out, omitidas, fluxos, regime)
+            finally:
+                if regime is not None:
+                    regime.close()
+    except BaseException:
+        # Não deixa arquivos .tmp incompletos ao lado dos dados
+        for temporario in temporarios:
+            if os.path.exists(temporario):
+                os.unlink(temporario)
+        raise
+    os.replace(csv_path + ".tmp", csv_path)
+    os.replace(fluxos_path + ".tmp", fluxos_path)
+    if regime_path:
+        os.replace(regime_path + ".tmp", regime_path)
+    return csv_path
+
+
+def omitted_from_conf(test_dir):
+    """
+    Quantidade de medições omitidas (-O/--omit) no ComandoCliente do
+    arquivo <teste>-conf.ini, ou None se não houver.
+    """
+    ini_path = os.path.join(test_dir, f"{os.path.basename(test_dir)}-conf.ini")
+    if not os.path.exists(ini_path):
+        return None
+    cfg = configparser.ConfigParser(interpolation=None)
+    cfg.optionxform = str
+    try:
+        cfg.read(ini_path, encoding="utf-8")
+    except configparser.Error:
+        return None
+    comando = cfg.get("Teste", "ComandoCliente", fallback="")
+    m = re.search(r'(?:-O|--omit)[ ]*([0-9]+)', comando)
+    return int(m.group(1)) if m else None
+
+
+def find_round_files(resultados_dir, omitidas_padrao=0):
+    """Lista (arquivo_json, medições_omitidas) para todo o diretório de resultados."""
+    arquivos = []
+    omitidas_por_teste = {}
+    for raiz, dirs, nomes in os.walk(resultados_dir):
+        dirs.sort()
+        for nome in sorted(nomes):
+            if not nome.endswith(SUFIXOS_JSON):
+                continue
+            # Os arquivos ficam em <teste>/rodada_N/
+            test_dir = os.path.dirname(raiz)
+            if test_dir not in omitidas_por_teste:
+                omitidas = omitted_from_conf(test_dir)
+                omitidas_por_teste[test_dir] = omitidas_padrao if omitidas is None else omitidas
+            arquivos.append((os.path.join(raiz, nome), omitidas_por_teste[test_dir]))
+    return arquivos
+
+
+def convert_tree(resultados_dir, omitidas_padrao=0, jobs=None):
+    """Converte, em paralelo, todos os JSON do iperf3 sob 'resultados_dir'."""
+    arquivos = find_round_files(resultados_dir, omitidas_padrao)
+    falhas = 0
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [(path, executor.submit(convert_file, path, omitidas)) for path, omitidas in arquivos]
+        for path, future in futures:
+            try:
+                print(f"Convertido: {future.result()}")
+            except (OSError, ValueError) as e:
+                falhas += 1
+                print(f"Erro ao converter {path}: {e}", file=sys.stderr)
+    return falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Converte a saída JSON do iperf3 (-J) em CSV.")
+    parser.add_argument("arquivo_json", nargs="?", help="Arquivo JSON do iperf3. O CSV é escrito na saída padrão.")
+    parser.add_argument("amostras_omitidas", nargs="?", type=int, default=0,
+                        help="Quantidade de medições iniciais a descartar (opção -O do iperf3).")
+    parser.add_argument("--lote", metavar="DIR",
+                        help="Converte todos os arquivos JSON do iperf3 sob o diretório de resultados informado.")
+    parser.add_argument("-O", "--omitidas", type=int, default=0,
+                        help="No modo em lote, medições omitidas quando o <teste>-conf.ini não as informar.")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="No modo em lote, número de processos (padrão: número de CPUs).")
+    parser.add_argument("--fluxos", metavar="ARQ",
+                        help="Grava também o CSV com os dados de cada fluxo paralelo (-P) por intervalo.")
+    parser.add_argument("--regime", metavar="ARQ",
+                        help="Grava também o INI com o fim do aquecimento (início do regime permanente) detectado.")
+    args = parser.parse_args()
+
+    if args.lote:
+        if not os.path.isdir(args.lote):
+            print(f"\nDiretório não encontrado: {args.lote}\n", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(1 if convert_tree(args.lote, args.omitidas, args.jobs) else 0)
+
+    if not args.arquivo_json:
+        parser.print_usage(sys.stderr)
+        sys.exit(1)
+    if not os.path.isfile(args.arquivo_json):
+        print(f"\nArquivo JSON não encontrado: {args.arquivo_json}\n", file=sys.stderr)
+        sys.exit(1)
+    fluxos = open(args.fluxos, "w", encoding="utf-8") if args.fluxos else None
+    regime = open(args.regime, "w", encoding="utf-8") if args.regime else None
+    try:
+        convert(args.arquivo_json, sys.stdout, args.amostras_omitidas, fluxos, regime)
+    except ValueError as e:
+        print(f"Erro ao converter {args.arquivo_json}: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if fluxos is not None:
+            fluxos.close()
+        if regime is not None:
+            regime.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,33 @@
 #!/usr/bin/env python3
+"""
+Converte a saída do 'mpstat -P ALL' em CSV, linha a linha, de modo que pode
+consumir o mpstat enquanto ele ainda está em execução.
 
+Na saída padrão é escrita a tabela larga usada pelo sumarizador, com uma
+coluna CPU_N (100 - %idle) por núcleo e uma linha por medição, seguidas do
+início e do fim de cada medição (inicio, fim), em segundos desde o início do
+mpstat. Como o mpstat não informa quando começou, a primeira medição é
+considerada como tendo a duração de INTERVALO_INICIAL segundos. Com --longo,
+também é gravada uma tabela no formato longo, com uma linha por horário e CPU
+(incluindo a linha "all") e as colunas %usr, %nice, %sys, %iowait, %irq,
+%soft, %steal e %idle.
+
+Os horários no formato de 12 horas (AM/PM) são convertidos para 24 horas, e
+números com vírgula decimal (locales como pt_BR) são aceitos.
+"""
 import sys
 import csv
 import re
+import argparse
+
+# Horário no início da linha: "22:05:20" ou "10:05:20 PM"
+RE_LINHA = re.compile(r'^(\d{2}):(\d{2}):(\d{2})(?:\s+(AM|PM))?\s+(.*)$')
+
+COLUNAS_LONGO = ["usr", "nice", "sys", "iowait", "irq", "soft", "steal", "idle"]
+
+# Duração assumida da primeira medição (mpstat -P ALL 1)
+INTERVALO_INICIAL = 1.0
+
 
 def clean_input_line(line):
     # Remove caracteres de controle, sequências ANSI e espaços extras
@@ -10,62 +35,120 @@ def clean_input_line(line):
     cleaned_line = re.sub(r'[\r\n]', '', cleaned_line)  # Remove retornos de carro e novas linhas
     return cleaned_line.strip()  # Remove espaços em excesso nas extremidades
 
-def parse_mpstat(input_lines):
-    results = []
-    current_block = []
-    cpu_count = 0  # Contador de CPUs para criar o cabeçalho corretamente
 
+def parse_time(hora, minuto, segundo, periodo):
+    """Converte o horário do mpstat para HH:MM:SS (24 horas)."""
+    hora = int(hora)
+    if periodo == "PM" and hora != 12:
+        hora += 12
+    elif periodo == "AM" and hora == 12:
+        hora = 0
+    return f"{hora:02d}:{minuto}:{segundo}"
+
+
+def seconds_of_day(horario):
+    hora, minuto, segundo = horario.split(":")
+    return int(hora) * 3600 + int(minuto) * 60 + int(segundo)
+
+
+def parse_number(texto):
+    return float(texto.replace(",", "."))
+
+
+def iter_samples(input_lines):
+    """
+    Gera (horario, cpu, valores) para cada linha de CPU da saída do mpstat,
+    onde 'valores' associa o nome da coluna (sem '%') ao seu valor. A cada
+    cabeçalho, que inicia um novo bloco de medições, gera (horario, None, None).
+    """
+    colunas = None
     for line in input_lines:
-        line = clean_input_line(line)  # Limpa a linha antes de processar
+        m = RE_LINHA.match(clean_input_line(line))
+        if not m:
+            continue
+        horario = parse_time(*m.group(1, 2, 3, 4))
+        campos = m.group(5).split()
 
-        # Detecta início de um novo bloco por meio do cabeçalho
-        if re.match(r'^\d{2}:\d{2}:\d{2} (AM|PM)?\s+CPU\s+%usr', line):
-            if current_block:  # Se um bloco atual existe, salva antes de iniciar outro
-                results.append(current_block)
-                current_block = []
+        # Cabeçalho: define a ordem das colunas desta versão do mpstat
+        if campos and campos[0] == "CPU":
+            colunas = [c.lstrip("%") for c in campos[1:]]
+            yield horario, None, None
             continue
 
-        # Detecta linhas de CPUs individuais (exclui "all" e outras linhas irrelevantes)
-        if re.match(r'^\d{2}:\d{2}:\d{2} (AM|PM)?\s+\d+', line):  # CPUs específicas
-            parts = line.split()
-            if len(parts) > 11:  # Garante que há dados suficientes na linha
-                try:
-                    # Obtém o valor de %idle (último campo)
-                    idle_value = float(parts[-1].replace(",", "."))
-                    active_value = round(100 - idle_value, 2)  # Calcula 100 - %idle
-                    current_block.append(active_value)
+        if colunas is None or len(campos) != len(colunas) + 1:
+            continue
+        try:
+            valores = [parse_number(c) for c in campos[1:]]
+        except ValueError:
+            continue
+        yield horario, campos[0], dict(zip(colunas, valores))
 
-                    # Conta quantas CPUs existem (apenas na primeira iteração)
-                    if len(results) == 0:
-                        cpu_count += 1
-                except ValueError:
-                    continue
 
-    if current_block:  # Adiciona o último bloco se não foi salvo
-        results.append(current_block)
+def convert(input_lines, saida, longo=None):
+    """
+    Escreve a tabela larga em 'saida' e, se informado, a tabela longa em
+    'longo', à medida que os blocos são lidos. Retorna o número de medições.
+    """
+    writer = csv.writer(saida, delimiter=',')
+    longo_writer = None
+    if longo is not None:
+        longo_writer = csv.writer(longo, delimiter=',')
+        longo_writer.writerow(["horario", "cpu"] + COLUNAS_LONGO)
 
-    return results, cpu_count
+    cpu_count = None  # Definido pelo primeiro bloco
+    bloco = []
+    horario_bloco = None
+    base = anterior = None  # instantes, em segundos do dia, do início do mpstat e da medição anterior
+    medicoes = 0
 
-def write_csv(sums, cpu_count):
-    writer = csv.writer(sys.stdout, delimiter=',')
+    def fecha_bloco():
+        nonlocal cpu_count, medicoes, base, anterior
+        if longo is not None:
+            longo.flush()
+        if not bloco:
+            return
+        if cpu_count is None:
+            cpu_count = len(bloco)
+            writer.writerow([f"CPU_{i}" for i in range(cpu_count)] + ["inicio", "fim"])
+        instante = seconds_of_day(horario_bloco)
+        if base is None:
+            base = anterior = instante - INTERVALO_INICIAL
+        while instante < anterior:  # passagem da meia-noite
+            instante += 86400
+        writer.writerow(bloco + [anterior - base, instante - base])
+        anterior = instante
+        saida.flush()
+        medicoes += 1
+        bloco.clear()
+
+    for horario, cpu, valores in iter_samples(input_lines):
+        if cpu is None:
+            fecha_bloco()
+            continue
+        if longo_writer is not None:
+            longo_writer.writerow([horario, cpu] + [valores.get(c, "") for c in COLUNAS_LONGO])
+        # A tabela larga considera só os núcleos (exclui a linha "all")
+        if cpu.isdigit() and "idle" in valores:
+            bloco.append(round(100 - valores["idle"], 2))  # Calcula 100 - %idle
+            horario_bloco = horario
+    fecha_bloco()
 
-    # Escreve o cabeçalho
-    headers = [f"CPU_{i}" for i in range(cpu_count)]
-    writer.writerow(headers)
+    return medicoes
 
-    # Escreve os dados
-    for block in sums:
-        writer.writerow(block)
 
 if __name__ == "__main__":
-    # Lê a entrada padrão
-    input_lines = sys.stdin.read().splitlines()
+    parser = argparse.ArgumentParser(description="Converte a saída do mpstat (entrada padrão) em CSV (saída padrão).")
+    parser.add_argument("--longo", metavar="ARQUIVO",
+                        help="Grava também a tabela no formato longo (horario, cpu, usr, nice, sys, iowait, irq, soft, steal, idle).")
+    args = parser.parse_args()
 
-    # Faz o parse da saída do mpstat
-    cpu_sums, cpu_count = parse_mpstat(input_lines)
+    longo = open(args.longo, "w", newline="", encoding="utf-8") if args.longo else None
+    try:
+        # Lê a entrada padrão linha a linha
+        medicoes = convert(sys.stdin, sys.stdout, longo)
+    finally:
+        if longo is not None:
+            longo.close()
 
-    if cpu_sums:
-        # Escreve os resultados no formato CSV com cabeçalho
-        write_csv(cpu_sums, cpu_count)
-    else:
+    if not medicoes:
         print("Nenhum dado válido encontrado.", file=sys.stderr)
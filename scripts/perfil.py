@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Medição do tempo de cada estágio do sumarizador e da rotina
+executa-experimento (--perfil).
+
+Cada estágio gera um evento com o tempo de parede e o tempo de CPU, no
+formato de eventos completos ("ph": "X") do Chrome trace-event, que pode ser
+aberto no chrome://tracing ou no Perfetto (ui.perfetto.dev). Os instantes
+("ts") e as durações ("dur") são em microssegundos, e os instantes contam
+desde a época Unix, de modo que eventos de processos diferentes (os
+gráficos desenhados com --jobs e os comandos da rotina executa-experimento)
+fiquem na mesma linha do tempo. O tempo de CPU fica em args.cpu_ms.
+
+Sem set_profile(True), stage() não mede nada e tem custo desprezível.
+
+Também pode ser executado diretamente, para converter os eventos gravados
+pela rotina executa-experimento (um objeto JSON por linha) em um trace e
+exibir o resumo, opcionalmente juntando traces já gravados (o do sumarizador,
+por exemplo):
+    perfil.py <eventos.jsonl> [-o <trace.json>] [--incluir <trace.json> ...]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from contextlib import nullcontext
+
+_ativo = False
+_eventos = []
+_NULO = nullcontext()
+
+
+def set_profile(ativo):
+    """Ativa ou desativa a medição dos estágios (e descarta os eventos já medidos)."""
+    global _ativo
+    _ativo = bool(ativo)
+    _eventos.clear()
+
+
+def is_active():
+    return _ativo
+
+
+def now_us():
+    """Instante atual, em microssegundos desde a época Unix."""
+    return time.time_ns() // 1000
+
+
+def record(nome, categoria, inicio_us, duracao_us, cpu_us, pid=None, tid=None, **args):
+    """Registra um evento já medido (por exemplo, em outro processo)."""
+    if not _ativo:
+        return
+    _eventos.append({
+        "name": nome, "cat": categoria, "ph": "X",
+        "ts": int(inicio_us), "dur": max(int(duracao_us), 0),
+        "pid": pid if pid is not None else os.getpid(),
+        "tid": tid if tid is not None else threading.get_ident() % 100000,
+        "args": {"cpu_ms": round(cpu_us / 1000, 3), **args},
+    })
+
+
+class _Stage:
+    __slots__ = ("nome", "categoria", "args", "inicio", "parede", "cpu")
+
+    def __init__(self, nome, categoria, args):
+        self.nome, self.categoria, self.args = nome, categoria, args
+
+    def __enter__(self):
+        self.inicio = now_us()
+        self.parede = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        duracao = (time.perf_counter() - self.parede) * 1e6
+        cpu = (time.process_time() - self.cpu) * 1e6
+        record(self.nome, self.categoria, self.inicio, duracao, cpu, **self.args)
+        return False
+
+
+def stage(nome, categoria="estagio", **args):
+    """Contexto que mede um estágio: with stage("carga", teste=t): ..."""
+    return _Stage(nome, categoria, args) if _ativo else _NULO
+
+
+def events():
+    return list(_eventos)
+
+
+def write_trace(path, eventos=None):
+    """Grava os eventos no formato JSON do Chrome trace-event."""
+    eventos = _eventos if eventos is None else eventos
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": sorted(eventos, key=lambda e: e["ts"]), "displayTimeUnit": "ms"},
+                  f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def summarize(eventos=None):
+    """
+    Totais por categoria e nome: [(categoria, nome, chamadas, parede_s,
+    cpu_s)], em ordem decrescente de tempo de parede.
+    """
+    eventos = _eventos if eventos is None else eventos
+    totais = {}
+    for e in eventos:
+        chave = (e.get("cat", ""), e["name"])
+        chamadas, parede, cpu = totais.get(chave, (0, 0.0, 0.0))
+        totais[chave] = (chamadas + 1, parede + e["dur"] / 1e6, cpu + e.get("args", {}).get("cpu_ms", 0.0) / 1e3)
+    linhas = [(cat, nome, *valores) for (cat, nome), valores in totais.items()]
+    return sorted(linhas, key=lambda l: l[3], reverse=True)
+
+
+def print_summary(eventos=None, arquivo=sys.stdout):
+    """
+    Exibe a tabela de resumo. Os estágios podem ser aninhados (ex.: um
+    gráfico desenhado dentro do estágio do teste), de modo que a soma das
+    linhas pode passar do total.
+    """
+    eventos = _eventos if eventos is None else eventos
+    if not eventos:
+        return
+    inicio = min(e["ts"] for e in eventos)
+    fim = max(e["ts"] + e["dur"] for e in eventos)
+    total = max((fim - inicio) / 1e6, 1e-9)
+    print(f"\nPerfil de execução (total: {total:.2f} s):", file=arquivo)
+    print(f"{'Categoria':<12}{'Estágio':<36}{'Chamadas':>9}{'Parede (s)':>12}{'CPU (s)':>10}{'Média (ms)':>12}{'% total':>9}",
+          file=arquivo)
+    for cat, nome, chamadas, parede, cpu in summarize(eventos):
+        print(f"{cat:<12}{nome[:35]:<36}{chamadas:>9}{parede:>12.3f}{cpu:>10.3f}"
+              f"{1000 * parede / chamadas:>12.2f}{100 * parede / total:>8.1f}%", file=arquivo)
+
+
+def read_events(path):
+    """Lê eventos gravados um por linha (linhas inválidas são ignoradas)."""
+    eventos = []
+    with open(path, encoding="utf-8") as f:
+        for linha in f:
+            linha = linha.strip().rstrip(",")
+            if not linha:
+                continue
+            try:
+                eventos.append(json.loads(linha))
+            except ValueError:
+                print(f"Aviso: linha de perfil inválida ignorada: {linha[:80]}", file=sys.stderr)
+    return eventos
+
+
+def read_trace(path):
+    """Lê os eventos de um trace gravado por write_trace."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("traceEvents", [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Converte eventos de perfil (um JSON por linha) em um Chrome trace e exibe o resumo.")
+    parser.add_argument("eventos", help="Arquivo com um evento JSON por linha.")
+    parser.add_argument("-o", "--saida", help="Arquivo do trace (padrão: o nome dos eventos com a extensão .json).")
+    parser.add_argument("--incluir", action="append", default=[], metavar="TRACE",
+                        help="Trace JSON cujos eventos são juntados aos demais. Pode ser especificado múltiplas vezes.")
+    args = parser.parse_args()
+
+    eventos = read_events(args.eventos)
+    for path in args.incluir:
+        try:
+            eventos += read_trace(path)
+        except (OSError, ValueError) as e:
+            print(f"Aviso: trace {path} ignorado: {e}", file=sys.stderr)
+    saida = args.saida or os.path.splitext(args.eventos)[0] + ".json"
+    write_trace(saida, eventos)
+    print_summary(eventos)
+    print(f"\nTrace gravado em: {saida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
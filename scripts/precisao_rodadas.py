@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Verifica se as rodadas já executadas de um teste atingiram a precisão
+desejada para a vazão do servidor.
+
+A vazão média de cada rodada é lida dos CSVs convertidos (a do cliente é
+usada quando não houver a do servidor), e a precisão é a meia largura do
+intervalo de confiança de 95% entre as rodadas, relativa à média, calculada
+com o mesmo método do sumarizador (por padrão, a t de Student).
+
+Uso:
+    precisao_rodadas.py <dir_teste> <precisao> [--minimo N]
+
+A precisão pode ser informada em porcentagem, com ou sem o símbolo (1% e 1
+são equivalentes). Código de saída: 0 se a precisão foi atingida, 1 se ainda
+não foi e 2 em caso de erro.
+"""
+import os
+import sys
+import argparse
+
+import numpy as np
+
+from confidence import METODOS, METODO_PADRAO, half_width, set_method
+from experiment_data import load_test_data
+
+
+def parse_precision(texto):
+    """Converte '1%' ou '1' em 0.01."""
+    valor = float(texto.strip().rstrip("%").replace(",", "."))
+    if valor <= 0:
+        raise ValueError("a precisão deve ser positiva")
+    return valor / 100.0
+
+
+def round_throughputs(dados):
+    """Vazão média (bps) de cada rodada com dados, preferindo a do servidor."""
+    vazoes = []
+    for r in dados.rounds:
+        for df in (r.server, r.client):
+            if df is not None and "bits_por_segundo" in df.columns and len(df) > 0:
+                vazoes.append(float(df["bits_por_segundo"].mean()))
+                break
+    return vazoes
+
+
+def relative_half_width(valores):
+    """Meia largura do IC de 95% da média, relativa à média (inf se indefinida)."""
+    n = len(valores)
+    media = float(np.mean(valores)) if n else 0.0
+    if n < 2 or media <= 0:
+        return float("inf")
+    return half_width(valores) / media
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica se as rodadas de um teste atingiram a precisão desejada para a vazão do servidor.")
+    parser.add_argument("dir_teste", help="Diretório do teste (contém os diretórios rodada_N).")
+    parser.add_argument("precisao", help="Meia largura máxima do IC de 95%%, relativa à média. Ex.: 1%%")
+    parser.add_argument("--minimo", type=int, default=2,
+                        help="Quantidade mínima de rodadas antes de considerar a precisão atingida (padrão: 2).")
+    parser.add_argument("--metodo-ic", choices=METODOS, default=METODO_PADRAO,
+                        help="Método do intervalo de confiança: t de Student (padrão), normal ou bootstrap.")
+    args = parser.parse_args()
+    set_method(args.metodo_ic)
+
+    try:
+        alvo = parse_precision(args.precisao)
+    except ValueError as e:
+        print(f"Erro: precisão inválida '{args.precisao}': {e}", file=sys.stderr)
+        return 2
+
+    dir_teste = os.path.abspath(args.dir_teste)
+    dados = load_test_data(os.path.dirname(dir_teste), os.path.basename(dir_teste))
+    if dados is None:
+        print(f"Erro: diretório do teste {dir_teste} não encontrado.", file=sys.stderr)
+        return 2
+
+    vazoes = round_throughputs(dados)
+    precisao = relative_half_width(vazoes)
+    atingida = len(vazoes) >= max(args.minimo, 2) and precisao <= alvo
+    texto_precisao = f"{100 * precisao:.2f}%" if np.isfinite(precisao) else "indefinida"
+    media = np.mean(vazoes) / 1e9 if vazoes else 0.0
+    print(f"Rodadas: {len(vazoes)}; vazão média: {media:.4f} Gbps; "
+          f"precisão: {texto_precisao} (alvo: {100 * alvo:g}%)")
+    return 0 if atingida else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
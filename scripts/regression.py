@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Detecção de regressões de desempenho em relação a uma referência.
+
+Cada teste é comparado a uma referência: outro teste do mesmo experimento
+(-r/--referencia do sumarizador) ou o teste de mesmo nome de uma linha de base
+gravada por uma sumarização anterior (--linha-base), por exemplo antes de uma
+atualização do kernel ou do driver. As amostras são as médias de cada rodada,
+e há regressão em uma métrica quando a piora passa do limite configurado e,
+se as duas amostras tiverem ao menos duas rodadas, é significativa pelo
+teste t de Welch (p < ALFA):
+  - vazão: queda relativa à referência, em %;
+  - perda: aumento absoluto, em pontos percentuais (UDP) ou em
+    retransmissões por medição (TCP);
+  - cpu: aumento relativo à referência, em %.
+
+O veredito é gravado em JSON (veja verdict_to_json) e o sumarizador termina
+com o código de saída CODIGO_REGRESSAO se alguma métrica regrediu.
+"""
+import json
+
+import numpy as np
+
+from significance import ALFA, welch
+
+CODIGO_REGRESSAO = 3
+VERSAO_LINHA_BASE = 1
+
+# Limites padrão de piora: queda da vazão (%), aumento da perda (absoluto) e aumento da CPU (%)
+LIMITES_PADRAO = {"vazao": 5.0, "perda": 1.0, "cpu": 10.0}
+
+STATUS_OK = "ok"
+STATUS_REGRESSAO = "regressao"
+STATUS_SEM_DADOS = "sem_dados"
+
+
+def _change(metrica, media_teste, media_ref):
+    """Piora do teste em relação à referência, na unidade do limite da métrica."""
+    if metrica == "perda":
+        return media_teste - media_ref
+    if media_ref == 0:
+        return np.nan
+    variacao = 100.0 * (media_teste - media_ref) / abs(media_ref)
+    return -variacao if metrica == "vazao" else variacao
+
+
+def compare_metric(metrica, rodadas_teste, rodadas_ref, limite):
+    """
+    Compara as médias por rodada de uma métrica do teste com as da
+    referência. Retorna o veredito da métrica (dicionário serializável).
+    """
+    amostras = [np.asarray(v, dtype=float) for v in (rodadas_teste, rodadas_ref)]
+    amostras = [v[~np.isnan(v)] for v in amostras]
+    n = np.array([len(v) for v in amostras])
+    veredito = {"limite": limite, "rodadas": n.tolist()}
+    if (n == 0).any():
+        veredito["status"] = STATUS_SEM_DADOS
+        return veredito
+
+    media = np.array([v.mean() for v in amostras])
+    variancia = np.array([v.var(ddof=1) if len(v) > 1 else np.nan for v in amostras])
+    piora = _change(metrica, media[0], media[1])
+    _, _, p, _ = welch(media, variancia, n)
+    p_welch = float(p[0, 1])
+    significativa = bool(p_welch < ALFA) if np.isfinite(p_welch) else True
+    regressao = bool(np.isfinite(piora) and piora > limite and significativa)
+    veredito.update({
+        "teste": float(media[0]),
+        "referencia": float(media[1]),
+        "piora": float(piora),
+        "p_welch": p_welch,
+        "status": STATUS_REGRESSAO if regressao else STATUS_OK,
+    })
+    return veredito
+
+
+def compare_to_reference(medias_teste, medias_ref, limites=LIMITES_PADRAO):
+    """Veredito de cada métrica de 'limites' para um teste."""
+    return {
+        metrica: compare_metric(metrica, medias_teste.get(metrica, []), medias_ref.get(metrica, []), limite)
+        for metrica, limite in limites.items()
+    }
+
+
+def has_regression(vereditos):
+    """True se alguma métrica de algum teste regrediu ({teste: {métrica: veredito}})."""
+    return any(v["status"] == STATUS_REGRESSAO for metricas in vereditos.values() for v in metricas.values())
+
+
+def _json_safe(valor):
+    """Troca NaN e infinitos por None, já que o JSON não os representa."""
+    if isinstance(valor, dict):
+        return {k: _json_safe(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_json_safe(v) for v in valor]
+    if isinstance(valor, float) and not np.isfinite(valor):
+        return None
+    return valor
+
+
+def verdict_to_json(arquivo, vereditos, referencia, limites=LIMITES_PADRAO):
+    """
+    Grava o veredito em 'arquivo' (aberto para escrita):
+    {"regressao": bool, "referencia": {...}, "limites": {...},
+     "testes": {teste: {métrica: {"status", "teste", "referencia", "piora",
+                                  "limite", "p_welch", "rodadas"}}}}
+    """
+    json.dump(_json_safe({
+        "regressao": has_regression(vereditos),
+        "referencia": referencia,
+        "limites": limites,
+        "alfa": ALFA,
+        "testes": vereditos,
+    }), arquivo, indent=2, ensure_ascii=False)
+    arquivo.write("\n")
+
+
+def save_baseline(arquivo, medias_rodadas):
+    """Grava as médias por rodada de cada teste ({teste: {métrica: array}}) como linha de base."""
+    json.dump(_json_safe({
+        "versao": VERSAO_LINHA_BASE,
+        "testes": {t: {m: np.asarray(v, dtype=float).tolist() for m, v in medias.items()}
+                   for t, medias in medias_rodadas.items()},
+    }), arquivo, indent=2, ensure_ascii=False)
+    arquivo.write("\n")
+
+
+def load_baseline(arquivo):
+    """Lê uma linha de base gravada por save_baseline ({teste: {métrica: array}})."""
+    dados = json.load(arquivo)
+    if dados.get("versao") != VERSAO_LINHA_BASE:
+        raise ValueError(f"versão da linha de base não suportada: {dados.get('versao')}")
+    return {t: {m: np.array([np.nan if x is None else x for x in v], dtype=float) for m, v in medias.items()}
+            for t, medias in dados["testes"].items()}
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Comparações pareadas entre testes, a partir das médias de cada rodada.
+
+Para cada par de testes (i, j) são calculados, de uma só vez para todos os
+pares (matrizes N × N, sem laços em Python sobre os pares):
+  - o teste t de Welch (variâncias diferentes) e o tamanho de efeito g de
+    Hedges (d de Cohen com a correção para amostras pequenas);
+  - o teste de Mann-Whitney, com o p-valor exato da estatística U (a
+    distribuição de U sob a hipótese nula depende só dos tamanhos das
+    amostras e é calculada uma vez para cada combinação de tamanhos), e a
+    correlação bisserial de postos como tamanho de efeito. Empates contam
+    meio ponto em U, e o p-valor é arredondado para o lado conservador;
+  - os p-valores corrigidos para comparações múltiplas entre os N·(N-1)/2
+    pares, por Holm (padrão) ou Benjamini-Hochberg.
+
+Como o SciPy não é uma dependência do projeto, a distribuição t é obtida da
+função beta incompleta regularizada, avaliada por fração continuada
+diretamente sobre as matrizes do NumPy.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+CORRECOES = ("holm", "bh")
+CORRECAO_PADRAO = "holm"
+ALFA = 0.05
+
+# Coeficientes da aproximação de Lanczos (g = 7) para o log da função gama
+_LANCZOS = np.array([
+    0.99999999999980993, 676.5203681218851, -1259.1392167224028,
+    771.32342877765313, -176.61502916214059, 12.507343278686905,
+    -0.13857109526572012, 9.9843695780195716e-6, 1.5056327351493116e-7,
+])
+_ITERACOES_BETA = 200
+
+
+@dataclass
+class ComparacaoPareada:
+    """Matrizes N × N com a comparação de cada teste (linha) com cada outro (coluna)."""
+    media: np.ndarray         # média das rodadas de cada teste (N,)
+    rodadas: np.ndarray       # rodadas com dados em cada teste (N,)
+    diferenca: np.ndarray     # média da linha - média da coluna
+    p_welch: np.ndarray       # p-valores corrigidos (NaN na diagonal e sem rodadas suficientes)
+    p_mann_whitney: np.ndarray
+    hedges_g: np.ndarray
+    bisserial: np.ndarray     # P(linha > coluna) - P(linha < coluna)
+
+
+def _lgamma(x):
+    """Logaritmo da função gama para x > 0 (aproximação de Lanczos)."""
+    x = np.asarray(x, dtype=float) + 1.0  # lgamma(x) = lgamma(x + 1) - log(x)
+    z = x - 1.0
+    soma = _LANCZOS[0] + sum(c / (z + i) for i, c in enumerate(_LANCZOS[1:], start=1))
+    t = z + 7.5
+    return 0.5 * np.log(2 * np.pi) + (z + 0.5) * np.log(t) - t + np.log(soma) - np.log(x - 1.0)
+
+
+def _beta_fraction(a, b, x):
+    """Fração continuada da beta incompleta (método de Lentz), elemento a elemento."""
+    minimo = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c = np.ones_like(x)
+    d = 1.0 - qab * x / qap
+    d = 1.0 / np.where(np.abs(d) < minimo, minimo, d)
+    h = d
+    for m in range(1, _ITERACOES_BETA + 1):
+        m2 = 2 * m
+        for aa in (m * (b - m) * x / ((qam + m2) * (a + m2)),
+                   -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))):
+            d = 1.0 + aa * d
+            d = 1.0 / np.where(np.abs(d) < minimo, minimo, d)
+            c = 1.0 + aa / c
+            c = np.where(np.abs(c) < minimo, minimo, c)
+            h = h * d * c
+    return h
+
+
+def _betainc(a, b, x):
+    """Função beta incompleta regularizada I_x(a, b), elemento a elemento."""
+    a, b, x = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (a, b, x)))
+    interno = (x > 0) & (x < 1)
+    xs = np.where(interno, x, 0.5)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frente = np.exp(_lgamma(a + b) - _lgamma(a) - _lgamma(b) + a * np.log(xs) + b * np.log1p(-xs))
+        direta = xs < (a + 1) / (a + b + 2)
+        valor = np.where(direta,
+                         frente * _beta_fraction(a, b, xs) / a,
+                         1.0 - frente * _beta_fraction(b, a, 1.0 - xs) / b)
+    return np.where(x <= 0, 0.0, np.where(x >= 1, 1.0, valor))
+
+
+def t_two_sided_p(t, graus):
+    """P(|T| >= |t|) para a t de Student com 'graus' graus de liberdade."""
+    t = np.asarray(t, dtype=float)
+    graus = np.asarray(graus, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _betainc(graus / 2, 0.5, graus / (graus + t * t))
+
+
+@lru_cache(maxsize=None)
+def _u_cdf(n1, n2):
+    """
+    Distribuição acumulada exata de U para amostras de tamanhos n1 e n2 sem
+    empates. As contagens são os coeficientes do binomial gaussiano
+    [n1 + n2, n1]_q = Π (1 - q^(n2+i)) / (1 - q^i), i = 1..n1.
+    """
+    tamanho = n1 * n2 + 1
+    c = np.zeros(tamanho)
+    c[0] = 1.0
+    for i in range(1, n1 + 1):
+        deslocamento = n2 + i
+        if deslocamento < tamanho:
+            c[deslocamento:] -= c[:tamanho - deslocamento].copy()
+        # Divisão por (1 - q^i): soma acumulada com passo i
+        for resto in range(i):
+            c[resto::i] = np.cumsum(c[resto::i])
+    return np.cumsum(c) / c.sum()
+
+
+def welch(media, variancia, n):
+    """
+    Teste t de Welch e g de Hedges entre todos os pares. Recebe vetores (N,)
+    e retorna (t, graus, p, g) em matrizes N × N, com NaN onde algum dos
+    testes tem menos de duas rodadas.
+    """
+    mi, mj = media[:, None], media[None, :]
+    vi, vj = variancia[:, None], variancia[None, :]
+    ni, nj = n[:, None].astype(float), n[None, :].astype(float)
+    validos = (ni > 1) & (nj > 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ei, ej = vi / ni, vj / nj
+        erro = np.sqrt(ei + ej)
+        diferenca = mi - mj
+        t = diferenca / erro
+        graus = (ei + ej) ** 2 / (ei ** 2 / (ni - 1) + ej ** 2 / (nj - 1))
+        p = t_two_sided_p(t, graus)
+        # Sem variação em nenhum dos dois testes: p = 1 se as médias forem iguais, 0 se não
+        p = np.where(erro == 0, np.where(diferenca == 0, 1.0, 0.0), p)
+        desvio_combinado = np.sqrt(((ni - 1) * vi + (nj - 1) * vj) / (ni + nj - 2))
+        g = diferenca / desvio_combinado * (1 - 3 / (4 * (ni + nj) - 9))
+        g = np.where(desvio_combinado == 0, 0.0, g)
+    nan = np.full_like(t, np.nan)
+    return tuple(np.where(validos, m, nan) for m in (t, graus, p, g))
+
+
+def mann_whitney(amostras):
+    """
+    Teste de Mann-Whitney entre todos os pares de linhas de 'amostras'
+    (N × rodadas, NaN onde faltar a rodada). Retorna (U, p, bisserial) em
+    matrizes N × N, onde U conta os pares de rodadas em que a linha supera a
+    coluna (empates valem 1/2).
+    """
+    a = amostras[:, None, :, None]
+    b = amostras[None, :, None, :]
+    presentes = ~np.isnan(a) & ~np.isnan(b)
+    u = (np.where(presentes, (a > b) + 0.5 * (a == b), 0.0)).sum(axis=(2, 3))
+    n = (~np.isnan(amostras)).sum(axis=1)
+    ni, nj = np.broadcast_arrays(n[:, None], n[None, :])
+    p = np.full(u.shape, np.nan)
+    for n1, n2 in set(zip(ni.ravel().tolist(), nj.ravel().tolist())):
+        if n1 < 2 or n2 < 2:
+            continue
+        pares = (ni == n1) & (nj == n2)
+        cdf = _u_cdf(n1, n2)
+        abaixo = cdf[np.floor(u[pares]).astype(np.int64)]
+        acima = 1.0 - np.concatenate([[0.0], cdf])[np.ceil(u[pares]).astype(np.int64)]
+        p[pares] = np.minimum(1.0, 2 * np.minimum(abaixo, acima))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bisserial = np.where(np.isnan(p), np.nan, 2 * u / (ni * nj) - 1)
+    return u, p, bisserial
+
+
+def adjust_pvalues(p, correcao=CORRECAO_PADRAO):
+    """
+    Corrige, por Holm ou Benjamini-Hochberg, os p-valores da matriz
+    simétrica 'p' considerando cada par uma única vez (triângulo superior).
+    """
+    if correcao not in CORRECOES:
+        raise ValueError(f"correção desconhecida: {correcao}")
+    linhas, colunas = np.triu_indices(p.shape[0], k=1)
+    valores = p[linhas, colunas]
+    validos = ~np.isnan(valores)
+    brutos = valores[validos]
+    m = len(brutos)
+    ajustados = np.full(p.shape, np.nan)
+    if m == 0:
+        return ajustados
+    ordem = np.argsort(brutos)
+    ordenados = brutos[ordem]
+    if correcao == "holm":
+        corrigidos = np.maximum.accumulate(ordenados * (m - np.arange(m)))
+    else:
+        corrigidos = np.minimum.accumulate((ordenados * m / np.arange(1, m + 1))[::-1])[::-1]
+    corrigidos = np.minimum(corrigidos, 1.0)
+    resultado = np.empty(m)
+    resultado[ordem] = corrigidos
+    valores[validos] = resultado
+    ajustados[linhas, colunas] = valores
+    ajustados[colunas, linhas] = valores
+    return ajustados
+
+
+def compare_tests(amostras, correcao=CORRECAO_PADRAO):
+    """
+    Compara todos os pares de testes. 'amostras' é uma matriz N × rodadas
+    com a média de cada rodada de cada teste (NaN onde faltar a rodada).
+    """
+    amostras = np.asarray(amostras, dtype=float)
+    n = (~np.isnan(amostras)).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        media = np.nansum(amostras, axis=1) / n
+        variancia = np.nansum((amostras - media[:, None]) ** 2, axis=1) / (n - 1)
+    _, _, p_welch, g = welch(media, variancia, n)
+    _, p_mw, bisserial = mann_whitney(amostras)
+    return ComparacaoPareada(
+        media=media,
+        rodadas=n,
+        diferenca=media[:, None] - media[None, :],
+        p_welch=adjust_pvalues(p_welch, correcao),
+        p_mann_whitney=adjust_pvalues(p_mw, correcao),
+        hedges_g=g,
+        bisserial=bisserial,
+    )
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Detecção do fim do aquecimento (regime transitório) de cada rodada.
+
+No início de uma rodada, a vazão ainda não atingiu o regime permanente (por
+exemplo, durante o slow start do TCP em caminhos de RTT longo), e a duração
+desse trecho muda de rodada para rodada. Em vez de descartar uma quantidade
+fixa de medições (-O do iperf3), o corte é detectado pela média e pela
+variância móveis da vazão: a segunda metade da rodada é a referência do
+regime permanente, e o aquecimento termina logo após a última janela, dentre
+as que começam na primeira metade, cuja média se afasta da referência ou cuja
+variação é muito maior que a dela.
+
+O corte é gravado pelo iperf_json_to_csv.py (--regime) no arquivo
+rodada_N-<teste>-regime.ini, em medições e em segundos desde o início da
+medição. Com --regime-permanente, o sumarizador descarta as amostras de vazão,
+perda, CPU e fluxos anteriores ao corte.
+"""
+import configparser
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from timeseries import sample_times
+
+# Medições em cada janela móvel
+JANELA_PADRAO = 5
+# Afastamento máximo da média da janela em relação à referência (fração da média)
+TOLERANCIA_PADRAO = 0.05
+
+SECAO = "Regime"
+METODO = "media_e_variancia_movel"
+
+
+def detect_warmup(valores, janela=JANELA_PADRAO, tolerancia=TOLERANCIA_PADRAO):
+    """
+    Quantidade de medições iniciais de 'valores' que pertencem ao aquecimento
+    (0 se a série já começa em regime). Em séries curtas, a janela é reduzida
+    a um quarto da série; com menos de 8 medições, nada é descartado.
+    """
+    v = np.asarray(valores, dtype=float)
+    n = len(v)
+    janela = min(janela, n // 4)
+    if janela < 2:
+        return 0
+    referencia = v[n // 2:]
+    if np.isnan(referencia).all():
+        return 0
+    media_ref = float(np.nanmean(referencia))
+    desvio_ref = float(np.nanstd(referencia))
+    if media_ref == 0:
+        return 0
+
+    # Janelas que começam na primeira metade da série
+    janelas = sliding_window_view(v[:n // 2 + janela - 1], janela)
+    medias = janelas.mean(axis=1)
+    desvios = janelas.std(axis=1)
+    limite_media = max(tolerancia * abs(media_ref), 3 * desvio_ref / np.sqrt(janela))
+    limite_desvio = 2 * desvio_ref + tolerancia * abs(media_ref)
+    fora = (np.abs(medias - media_ref) > limite_media) | (desvios > limite_desvio)
+    if not fora.any():
+        return 0
+
+    # A última janela fora do regime ainda pode conter o fim da rampa: o
+    # corte avança enquanto as medições, uma a uma, estiverem fora da faixa
+    corte = int(np.flatnonzero(fora)[-1]) + 1
+    limite_medicao = max(tolerancia * abs(media_ref), 3 * desvio_ref)
+    while corte < n // 2 and abs(v[corte] - media_ref) > limite_medicao:
+        corte += 1
+    return corte
+
+
+def detect_round_warmup(r, janela=JANELA_PADRAO, tolerancia=TOLERANCIA_PADRAO):
+    """
+    Detecta o aquecimento de uma rodada (RoundData) pela vazão do servidor
+    ou, se não houver, pela do cliente. Retorna (medições, segundos) ou None
+    se a rodada não tiver dados de vazão.
+    """
+    for df in (r.server, r.client):
+        if df is not None and "bits_por_segundo" in df.columns and len(df) > 0:
+            corte = detect_warmup(df["bits_por_segundo"].to_numpy(dtype=float), janela, tolerancia)
+            inicio, _ = sample_times(df)
+            return corte, float(inicio[corte]) if corte else 0.0
+    return None
+
+
+def write_steady_state(arquivo, corte, inicio_regime, janela=JANELA_PADRAO, tolerancia=TOLERANCIA_PADRAO):
+    """Grava o corte de uma rodada no arquivo INI aberto em 'arquivo'."""
+    cfg = configparser.ConfigParser(interpolation=None)
+    cfg.optionxform = str
+    cfg[SECAO] = {
+        "Metodo": METODO,
+        "Janela": str(janela),
+        "Tolerancia": f"{tolerancia:g}",
+        "MedicoesAquecimento": str(corte),
+        "InicioRegime": f"{inicio_regime:g}",
+    }
+    cfg.write(arquivo)
+
+
+def read_steady_state(ini_path):
+    """
+    Início do regime permanente (s) gravado em 'ini_path', ou None se o
+    arquivo não existir ou não tiver o corte.
+    """
+    cfg = configparser.ConfigParser(interpolation=None)
+    try:
+        if not cfg.read(ini_path, encoding="utf-8"):
+            return None
+        return cfg.getfloat(SECAO, "InicioRegime", fallback=None)
+    except (configparser.Error, ValueError):
+        return None
+
+
+def _steady_rows(df, inicio_regime):
+    """Máscara das linhas de 'df' cujo ponto médio está no regime permanente."""
+    inicio, fim = sample_times(df)
+    return (inicio + fim) / 2 >= inicio_regime
+
+
+def drop_warmup(r, inicio_regime):
+    """
+    Remove, em todas as séries da rodada (RoundData), as amostras anteriores
+    a 'inicio_regime' segundos. As linhas dos fluxos são associadas às do
+    cliente pelo índice do intervalo, que é renumerado para continuar
+    indicando a linha correspondente do cliente.
+    """
+    if not inicio_regime:
+        return
+    if r.client is not None:
+        manter = _steady_rows(r.client, inicio_regime)
+        descartados = int((~manter).sum())
+        r.client = r.client[manter].reset_index(drop=True)
+        if r.streams is not None and "intervalo" in r.streams.columns:
+            manter_fluxos = r.streams["intervalo"].to_numpy() >= descartados
+            r.streams = r.streams[manter_fluxos].reset_index(drop=True)
+            r.streams["intervalo"] -= descartados
+    if r.server is not None:
+        r.server = r.server[_steady_rows(r.server, inicio_regime)].reset_index(drop=True)
+    if r.mpstat is not None:
+        tempos = r.mpstat_times if r.mpstat_times is not None else r.mpstat
+        manter = _steady_rows(tempos, inicio_regime)
+        r.mpstat = r.mpstat[manter].reset_index(drop=True)
+        if r.mpstat_times is not None:
+            r.mpstat_times = r.mpstat_times[manter].reset_index(drop=True)
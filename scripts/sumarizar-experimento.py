@@ -1,23 +1,27 @@
 #!/usr/bin/env python3
+import io
 import os
+import sys
 import argparse
-import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 import re
-import configparser
+
+from charts import MANIFESTO, ChartSpec, disable_charts, set_jobs, submit_chart, wait_charts
+from timeseries import downsample_minmax, envelope, join_series, resample_rounds, sample_times
+from steady_state import detect_round_warmup, drop_warmup
+from distribution import ESTATISTICAS, distribution_stats, pooled_distribution
+from confidence import METODOS, METODO_PADRAO, REAMOSTRAGENS_PADRAO, half_width, set_method
+from significance import ALFA, CORRECOES, CORRECAO_PADRAO, compare_tests
+from regression import (CODIGO_REGRESSAO, LIMITES_PADRAO, STATUS_SEM_DADOS, compare_to_reference,
+                        has_regression, load_baseline, save_baseline, verdict_to_json)
+from export import ESCOPO_RODADA, ESCOPO_TEMPO, ESCOPO_TESTE, AggregateExport, Registro
+from perfil import print_summary, set_profile, stage, write_trace
+from experiment_data import (format_label, get_cpu_topology_from_conf, get_test_display_name_from_conf, join_test_names,
+                             load_test_data)
 
 ##############################
 # FUNÇÕES AUXILIARES
 ##############################
-def format_label(name):
-    return name.replace("_", " ").title().replace("Cpu", "CPU")
-
-def get_round_dirs(test_dir):
-    """Retorna os diretórios de rodada (ex.: rodada_1, rodada_2, …) em ordem."""
-    rounds = [d for d in os.listdir(test_dir) if d.startswith("rodada_") and os.path.isdir(os.path.join(test_dir, d))]
-    return sorted(rounds)
-
 def format_throughput(value):
     """
     Recebe um valor em Mbps e retorna uma string formatada:
@@ -52,51 +56,26 @@ def format_value(v_bps, fator):
 def _safe(v):
         return 0.0 if v is None or (isinstance(v, float) and np.isnan(v)) else float(v)
 
-def get_test_display_name_from_conf(test_dir: str) -> str:
-    """
-    Tenta encontrar o nome amigável do teste no arquivo INI de configuração.
-    """
-    try:
-        test_name = os.path.basename(test_dir)
-        ini_path = os.path.join(test_dir, f"{test_name}-conf.ini")
-        if os.path.exists(ini_path):
-            cfg = configparser.ConfigParser()
-            # Mantém case-sensitivity das chaves
-            cfg.optionxform = str
-            cfg.read(ini_path, encoding="utf-8")
-            if cfg.has_section("Teste") and cfg.has_option("Teste", "Nome"):
-                nome = cfg.get("Teste", "Nome", fallback="").strip()
-                if nome:
-                    return nome
-    except Exception as e:
-        # Não interrompe o fluxo caso o INI esteja ausente/malformado
-        print(f"Aviso: falha ao ler '{test_name}-conf.ini': {e}")
-    return format_label(test_name)
-
 ########################
 # FUNÇÕES DE PLOTAGEM  #
 ########################
-def plot_cpu_usage_for_round(test_dir, test_name, mostrar_intervalo_confianca=False):
-    rounds = get_round_dirs(test_dir)
+def plot_cpu_usage_for_round(dados, mostrar_intervalo_confianca=False):
     overall_cpu_values = {}  # acumula os valores de cada núcleo em cada rodada
-    test_display_name = get_test_display_name_from_conf(test_dir)
+    test_name = dados.name
+    test_display_name = dados.display_name
 
     count = 0
-    for rodada in rounds:
-        rodada_path = os.path.join(test_dir, rodada)
-        mpstat_file = os.path.join(rodada_path, f"{rodada}-{test_name}-mpstat.csv")
-        if not os.path.exists(mpstat_file):
-            print(f"Aviso: {mpstat_file} não encontrado.")
+    for r in dados.rounds:
+        rodada, rodada_path = r.name, r.path
+        if r.mpstat is None:
+            print(f"Aviso: {r.mpstat_file} não encontrado.")
             continue
 
-        df = pd.read_csv(mpstat_file)
+        df = r.mpstat
         cpu_usage_mean, cpu_usage_err = {}, {}
-        n = len(df)
-        for col in df.columns:
-            m = df[col].mean()
-            std = df[col].std(ddof=1)
-            err = 1.96 * std / np.sqrt(n) if n > 1 else 0.0
-            cpu_usage_mean[col] = float(m)
+        erros = half_width(df.to_numpy(dtype=float), bootstrap=False)
+        for col, err in zip(df.columns, erros):
+            cpu_usage_mean[col] = float(df[col].mean())
             cpu_usage_err[col]  = float(err)
 
         cores_from_header = list(cpu_usage_mean.keys())
@@ -110,26 +89,26 @@ def plot_cpu_usage_for_round(test_dir, test_name, mostrar_intervalo_confianca=Fa
         top = (y_max * 1.08) if y_max > 0 else 1.0            # mantém 8% de folga no topo
         label_offset = 0.005 * top                            # distância do valor até o topo da barra
 
-        plt.figure(figsize=(8,6))
-        bars = plt.bar(cores, valores, yerr=err_values if mostrar_intervalo_confianca else 0, capsize=5 if mostrar_intervalo_confianca else 0)
-
-        for i, bar in enumerate(bars):
-            e = err_values[i] if i < len(err_values) else 0.0
-            y = bar.get_height() + (e if mostrar_intervalo_confianca else 0) + label_offset
-            plt.text(bar.get_x() + bar.get_width()/2, y, f"{bar.get_height():.2f}",
-                     ha='center', va='bottom')
-
-        plt.ylabel("Uso médio de CPU (%)")
-        plt.xlabel("Núcleo")
-        plt.title(f"Uso de CPU - {format_label(rodada)} - {test_display_name}")
-        plt.ylim(bottom=0, top=top)
-
         png_path = os.path.join(rodada_path, f"{rodada}-{test_name}-uso_de_cpu_barra.png")
         svg_path = os.path.join(rodada_path, f"{rodada}-{test_name}-uso_de_cpu_barra.svg")
-        plt.tight_layout()
-        plt.savefig(png_path)
-        plt.savefig(svg_path)
-        plt.close()
+        chart = ChartSpec(png_path, svg_path, figsize=(8,6))
+        denso = _dense(cores_from_header)
+        chart.call("bar", cores, valores, yerr=err_values if mostrar_intervalo_confianca else 0, capsize=5 if mostrar_intervalo_confianca and not denso else 0,
+                   **({"rasterized": True} if denso else {}))
+
+        if denso:
+            _core_ticks(chart, cores_from_header, eixo="x")
+        else:
+            for i, v in enumerate(valores):
+                e = err_values[i] if i < len(err_values) else 0.0
+                y = v + (e if mostrar_intervalo_confianca else 0) + label_offset
+                chart.call("text", i, y, f"{v:.2f}", ha='center', va='bottom')
+
+        chart.call("set_ylabel", "Uso médio de CPU (%)")
+        chart.call("set_xlabel", "Núcleo")
+        chart.call("set_title", f"Uso de CPU - {format_label(rodada)} - {test_display_name}")
+        chart.call("set_ylim", bottom=0, top=top)
+        submit_chart(chart)
 
         for core, value in cpu_usage_mean.items():
             overall_cpu_values.setdefault(core, []).append(value)
@@ -137,14 +116,20 @@ def plot_cpu_usage_for_round(test_dir, test_name, mostrar_intervalo_confianca=Fa
 
     return overall_cpu_values, count
 
-def plot_cpu_usage_for_test(overall_cpu_values, test_dir, test_name, mostrar_intervalo_confianca=False):
+def plot_cpu_usage_for_test(overall_cpu_values, dados, mostrar_intervalo_confianca=False):
     overall_cpu = {}
     overall_cpu_err = {}
-    test_display_name = get_test_display_name_from_conf(test_dir)
-
-    for core, values in overall_cpu_values.items():
-        overall_cpu[core] = np.mean(values)
-        overall_cpu_err[core] = 1.96 * np.std(values, ddof=1) / np.sqrt(len(values)) if len(values) > 1 else 0.0
+    test_dir, test_name = dados.path, dados.name
+    test_display_name = dados.display_name
+
+    # IC de todos os núcleos de uma só vez (rodadas × núcleos, NaN onde faltar a rodada)
+    if overall_cpu_values:
+        matriz = np.full((max(len(v) for v in overall_cpu_values.values()), len(overall_cpu_values)), np.nan)
+        for j, values in enumerate(overall_cpu_values.values()):
+            matriz[:len(values), j] = values
+        for (core, values), err in zip(overall_cpu_values.items(), half_width(matriz)):
+            overall_cpu[core] = np.mean(values)
+            overall_cpu_err[core] = float(err)
 
     cores_from_header = list(overall_cpu.keys())
     cores = [re.search(r'\d+', c).group() for c in cores_from_header]
@@ -157,64 +142,60 @@ def plot_cpu_usage_for_test(overall_cpu_values, test_dir, test_name, mostrar_int
     top = (y_max * 1.08) if y_max > 0 else 1.0   # 8% de folga no topo
     label_offset = 0.005 * top                   # distância do valor até o topo da barra
 
-    plt.figure(figsize=(8,6))
-    bars = plt.bar(cores, valores, yerr=err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0)
-
-    # Rótulos acima das barras
-    for i, bar in enumerate(bars):
-        e = _safe(err_values[i]) if i < len(err_values) else 0.0
-        y = bar.get_height() + (e if mostrar_intervalo_confianca else 0) + label_offset
-        plt.text(bar.get_x() + bar.get_width()/2, y, f"{bar.get_height():.2f}",
-                 ha='center', va='bottom')
-
-    plt.ylabel("Uso médio de CPU (%)")
-    plt.xlabel("Núcleo")
-    plt.title(f"{test_display_name} - Uso de CPU (Média das Rodadas)")
-    plt.ylim(bottom=0, top=top)
-
     png_path = os.path.join(test_dir, f"{test_name}-uso_de_cpu_barra.png")
     svg_path = os.path.join(test_dir, f"{test_name}-uso_de_cpu_barra.svg")
-    plt.tight_layout()
-    plt.savefig(png_path)
-    plt.savefig(svg_path)
-    plt.close()
+    chart = ChartSpec(png_path, svg_path, figsize=(8,6))
+    denso = _dense(cores_from_header)
+    chart.call("bar", cores, valores, yerr=err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca and not denso else 0,
+               **({"rasterized": True} if denso else {}))
+
+    # Rótulos acima das barras (ou só alguns núcleos no eixo, com muitos núcleos)
+    if denso:
+        _core_ticks(chart, cores_from_header, eixo="x")
+    else:
+        for i, v in enumerate(valores):
+            e = _safe(err_values[i]) if i < len(err_values) else 0.0
+            y = v + (e if mostrar_intervalo_confianca else 0) + label_offset
+            chart.call("text", i, y, f"{v:.2f}", ha='center', va='bottom')
+
+    chart.call("set_ylabel", "Uso médio de CPU (%)")
+    chart.call("set_xlabel", "Núcleo")
+    chart.call("set_title", f"{test_display_name} - Uso de CPU (Média das Rodadas)")
+    chart.call("set_ylim", bottom=0, top=top)
+    submit_chart(chart)
 
     overall_cpu_agg = {core: (overall_cpu[core], overall_cpu_err[core]) for core in overall_cpu}
     return overall_cpu_agg
 
-def plot_vazao_barra_for_test(test_dir, test_name, mostrar_intervalo_confianca=False):
-    rounds = get_round_dirs(test_dir)
+def plot_vazao_barra_for_test(dados, mostrar_intervalo_confianca=False):
     cliente_list = []
     servidor_list = []
     count = 0
-    test_display_name = get_test_display_name_from_conf(test_dir)
+    test_dir, test_name = dados.path, dados.name
+    test_display_name = dados.display_name
 
-    for rodada in rounds:
-        rodada_path = os.path.join(test_dir, rodada)
-        client_file = os.path.join(rodada_path, f"{rodada}-{test_name}-iperf3_client.csv")
-        server_file = os.path.join(rodada_path, f"{rodada}-{test_name}-iperf3_server.csv")
-        if not os.path.exists(client_file) or not os.path.exists(server_file):
+    for r in dados.rounds:
+        rodada, rodada_path = r.name, r.path
+        if r.client is None or r.server is None:
             print(f"Aviso: Arquivos de vazão não encontrados em {rodada_path}.")
             continue
 
-        df_client = pd.read_csv(client_file)
-        df_server = pd.read_csv(server_file)
+        df_client = r.client
+        df_server = r.server
 
         col_client = 'bits_por_segundo' if 'bits_por_segundo' in df_client.columns else None
         col_server = 'bits_por_segundo' if 'bits_por_segundo' in df_server.columns else None
 
         # Cálculos em bps
         if col_client and len(df_client) > 0:
-            n_client = len(df_client)
             mean_client_bps = float(df_client[col_client].mean())
-            err_client_bps  = float(1.96 * df_client[col_client].std(ddof=1) / np.sqrt(n_client)) if n_client > 1 else 0.0
+            err_client_bps  = half_width(df_client[col_client].to_numpy(dtype=float), bootstrap=False)
         else:
             mean_client_bps = err_client_bps = 0.0
 
         if col_server and len(df_server) > 0:
-            n_server = len(df_server)
             mean_server_bps = float(df_server[col_server].mean())
-            err_server_bps  = float(1.96 * df_server[col_server].std(ddof=1) / np.sqrt(n_server)) if n_server > 1 else 0.0
+            err_server_bps  = half_width(df_server[col_server].to_numpy(dtype=float), bootstrap=False)
         else:
             mean_server_bps = err_server_bps = 0.0
 
@@ -238,26 +219,22 @@ def plot_vazao_barra_for_test(test_dir, test_name, mostrar_intervalo_confianca=F
 
         x = np.arange(len(labels))
         width = 0.3
-        plt.figure(figsize=(8,6))
-        bars = plt.bar(x, valores_norm, width, yerr=erros_norm if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0)
-        plt.ylim(bottom=0, top=top)
-
-        # Rótulos acima das barras + erro (na mesma unidade do eixo)
-        for bar, raw_bps, e in zip(bars, valores_bps, erros_norm):
-            y = bar.get_height() + (_safe(e) if mostrar_intervalo_confianca else 0) + label_offset
-            plt.text(bar.get_x() + bar.get_width()/2, y, f"{format_value(raw_bps, fator):.2f}",
-                     ha='center', va='bottom')
-
-        plt.ylabel(f"Vazão Média ({unidade})")
-        plt.xlabel("Origem")
-        plt.title(f"Vazão - {format_label(rodada)} - {test_display_name}")
-        plt.xticks(x, labels)
         png_path = os.path.join(rodada_path, f"{rodada}-{test_name}-vazao_barra.png")
         svg_path = os.path.join(rodada_path, f"{rodada}-{test_name}-vazao_barra.svg")
-        plt.tight_layout()
-        plt.savefig(png_path)
-        plt.savefig(svg_path)
-        plt.close()
+        chart = ChartSpec(png_path, svg_path, figsize=(8,6))
+        chart.call("bar", x, valores_norm, width, yerr=erros_norm if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0)
+        chart.call("set_ylim", bottom=0, top=top)
+
+        # Rótulos acima das barras + erro (na mesma unidade do eixo)
+        for xi, v, raw_bps, e in zip(x, valores_norm, valores_bps, erros_norm):
+            y = v + (_safe(e) if mostrar_intervalo_confianca else 0) + label_offset
+            chart.call("text", xi, y, f"{format_value(raw_bps, fator):.2f}", ha='center', va='bottom')
+
+        chart.call("set_ylabel", f"Vazão Média ({unidade})")
+        chart.call("set_xlabel", "Origem")
+        chart.call("set_title", f"Vazão - {format_label(rodada)} - {test_display_name}")
+        chart.call("set_xticks", x, labels)
+        submit_chart(chart)
 
         # Salva os valores em bps para o gráfico agregado
         cliente_list.append((mean_client_bps, err_client_bps))
@@ -271,8 +248,7 @@ def plot_vazao_barra_for_test(test_dir, test_name, mostrar_intervalo_confianca=F
         media_cliente_bps  = float(np.mean(cliente_means_bps)) if cliente_means_bps else 0.0
         media_servidor_bps = float(np.mean(servidor_means_bps)) if servidor_means_bps else 0.0
 
-        err_cliente_bps  = float(1.96 * np.std(cliente_means_bps,  ddof=1) / np.sqrt(len(cliente_means_bps)))  if len(cliente_means_bps)  > 1 else 0.0
-        err_servidor_bps = float(1.96 * np.std(servidor_means_bps, ddof=1) / np.sqrt(len(servidor_means_bps))) if len(servidor_means_bps) > 1 else 0.0
+        err_cliente_bps, err_servidor_bps = (float(e) for e in half_width(np.column_stack([cliente_means_bps, servidor_means_bps])))
 
         # Escala do gráfico agregado
         valores_bps = [media_cliente_bps, media_servidor_bps]
@@ -292,25 +268,21 @@ def plot_vazao_barra_for_test(test_dir, test_name, mostrar_intervalo_confianca=F
         labels = ['Cliente', 'Servidor']
         x = np.arange(len(labels))
         width = 0.3
-        plt.figure(figsize=(8,6))
-        bars = plt.bar(x, valores_norm, width, yerr=erros_norm if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0)
-        plt.ylim(bottom=0, top=top)
-
-        for bar, raw_bps, e in zip(bars, valores_bps, erros_norm):
-            y = bar.get_height() + (_safe(e) if mostrar_intervalo_confianca else 0) + label_offset
-            plt.text(bar.get_x() + bar.get_width()/2, y, f"{format_value(raw_bps, fator):.2f}",
-                     ha='center', va='bottom')
-
-        plt.ylabel(f"Vazão Média ({unidade})")
-        plt.xlabel("Origem")
-        plt.title(f"{test_display_name} - Vazão (Média das Rodadas)")
-        plt.xticks(x, labels)
         png_path = os.path.join(test_dir, f"{test_name}-vazao_barra.png")
         svg_path = os.path.join(test_dir, f"{test_name}-vazao_barra.svg")
-        plt.tight_layout()
-        plt.savefig(png_path)
-        plt.savefig(svg_path)
-        plt.close()
+        chart = ChartSpec(png_path, svg_path, figsize=(8,6))
+        chart.call("bar", x, valores_norm, width, yerr=erros_norm if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0)
+        chart.call("set_ylim", bottom=0, top=top)
+
+        for xi, v, raw_bps, e in zip(x, valores_norm, valores_bps, erros_norm):
+            y = v + (_safe(e) if mostrar_intervalo_confianca else 0) + label_offset
+            chart.call("text", xi, y, f"{format_value(raw_bps, fator):.2f}", ha='center', va='bottom')
+
+        chart.call("set_ylabel", f"Vazão Média ({unidade})")
+        chart.call("set_xlabel", "Origem")
+        chart.call("set_title", f"{test_display_name} - Vazão (Média das Rodadas)")
+        chart.call("set_xticks", x, labels)
+        submit_chart(chart)
 
         # Retorno dos valores médios e erros em bps, e também formatados
         return ((media_cliente_bps, err_cliente_bps),
@@ -319,47 +291,39 @@ def plot_vazao_barra_for_test(test_dir, test_name, mostrar_intervalo_confianca=F
     else:
         return ((0, 0), (0, 0), (0, 0))
 
-def plot_perda_barra_for_test(test_dir, test_name, mostrar_intervalo_confianca=False):
-    rounds = get_round_dirs(test_dir)
+def plot_perda_barra_for_test(dados, mostrar_intervalo_confianca=False):
     perda_list = []
     count = 0
-    test_display_name = get_test_display_name_from_conf(test_dir)
+    test_dir, test_name = dados.path, dados.name
+    test_display_name = dados.display_name
 
-    for rodada in rounds:
-        rodada_path = os.path.join(test_dir, rodada)
-        server_file = os.path.join(rodada_path, f"{rodada}-{test_name}-iperf3_server.csv")
-        client_file = os.path.join(rodada_path, f"{rodada}-{test_name}-iperf3_client.csv")
+    for r in dados.rounds:
+        rodada, rodada_path = r.name, r.path
 
         m = 0.0
         err = 0.0
 
         # Primeiro tenta UDP no servidor: "porcentagem_pacotes_perdidos"
-        if os.path.exists(server_file):
-            df_srv = pd.read_csv(server_file)
+        if r.server is not None:
+            df_srv = r.server
             if "porcentagem_pacotes_perdidos" in df_srv.columns:
-                n = len(df_srv)
                 m = float(df_srv["porcentagem_pacotes_perdidos"].mean())
-                std = float(df_srv["porcentagem_pacotes_perdidos"].std(ddof=1))
-                err = 1.96 * std / np.sqrt(n) if n > 1 and not np.isnan(std) else 0.0
+                err = half_width(df_srv["porcentagem_pacotes_perdidos"].to_numpy(dtype=float), bootstrap=False)
             # Se não, tenta TCP no cliente: "retransmissoes"
-            elif os.path.exists(client_file):
-                df_cli = pd.read_csv(client_file)
+            elif r.client is not None:
+                df_cli = r.client
                 if "retransmissoes" in df_cli.columns:
-                    n = len(df_cli)
                     m = float(df_cli["retransmissoes"].mean())
-                    std = float(df_cli["retransmissoes"].std(ddof=1))
-                    err = 1.96 * std / np.sqrt(n) if n > 1 and not np.isnan(std) else 0.0
+                    err = half_width(df_cli["retransmissoes"].to_numpy(dtype=float), bootstrap=False)
                 else:
                     m = 0.0
                     err = 0.0
         # Se não tem server_file, tenta só no cliente
-        elif os.path.exists(client_file):
-            df_cli = pd.read_csv(client_file)
+        elif r.client is not None:
+            df_cli = r.client
             if "retransmissoes" in df_cli.columns:
-                n = len(df_cli)
                 m = float(df_cli["retransmissoes"].mean())
-                std = float(df_cli["retransmissoes"].std(ddof=1))
-                err = 1.96 * std / np.sqrt(n) if n > 1 and not np.isnan(std) else 0.0
+                err = half_width(df_cli["retransmissoes"].to_numpy(dtype=float), bootstrap=False)
             else:
                 m = 0.0
                 err = 0.0
@@ -367,26 +331,23 @@ def plot_perda_barra_for_test(test_dir, test_name, mostrar_intervalo_confianca=F
             print(f"Aviso: Nenhum arquivo iperf3 encontrado para {rodada}.")
             continue
 
-        plt.figure(figsize=(6,5))
-        plt.bar(["Perda"], [m], yerr=[err] if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0)
+        png_path = os.path.join(rodada_path, f"{rodada}-{test_name}-perda_barra.png")
+        svg_path = os.path.join(rodada_path, f"{rodada}-{test_name}-perda_barra.svg")
+        chart = ChartSpec(png_path, svg_path, figsize=(6,5))
+        chart.call("bar", ["Perda"], [m], yerr=[err] if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0)
 
         # Ajusta o topo para que caiba o rótulo
         y_max = _safe(m) + _safe(err)
         top = (y_max * 1.08) if y_max > 0 else 1.0
         label_offset = 0.005 * top
-        plt.ylim(bottom=0, top=top)
+        chart.call("set_ylim", bottom=0, top=top)
 
         # Rótulo acima da barra + erro
-        plt.text(0, m + (_safe(err) if mostrar_intervalo_confianca else 0) + label_offset, f"{m:.4f}", ha='center', va='bottom')
+        chart.call("text", 0, m + (_safe(err) if mostrar_intervalo_confianca else 0) + label_offset, f"{m:.4f}", ha='center', va='bottom')
 
-        plt.ylabel("Perda (%)" if m < 1e2 else "Retransmissões")
-        plt.title(f"Perda - {format_label(rodada)} - {test_display_name}")
-        png_path = os.path.join(rodada_path, f"{rodada}-{test_name}-perda_barra.png")
-        svg_path = os.path.join(rodada_path, f"{rodada}-{test_name}-perda_barra.svg")
-        plt.tight_layout()
-        plt.savefig(png_path)
-        plt.savefig(svg_path)
-        plt.close()
+        chart.call("set_ylabel", "Perda (%)" if m < 1e2 else "Retransmissões")
+        chart.call("set_title", f"Perda - {format_label(rodada)} - {test_display_name}")
+        submit_chart(chart)
         
         perda_list.append((m, err))
         count += 1
@@ -394,234 +355,278 @@ def plot_perda_barra_for_test(test_dir, test_name, mostrar_intervalo_confianca=F
     if count > 0:
         perda_means = [val for val, _ in perda_list]
         media_perda = float(np.mean(perda_means))
-        err_perda = float(1.96 * np.std(perda_means, ddof=1) / np.sqrt(len(perda_means))) if len(perda_means) > 1 else 0.0
+        err_perda = half_width(perda_means)
 
-        plt.figure(figsize=(6,5))
-        plt.bar(["Perda"], [media_perda], yerr=[err_perda] if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0)
+        png_path = os.path.join(test_dir, f"{test_name}-perda_barra.png")
+        svg_path = os.path.join(test_dir, f"{test_name}-perda_barra.svg")
+        chart = ChartSpec(png_path, svg_path, figsize=(6,5))
+        chart.call("bar", ["Perda"], [media_perda], yerr=[err_perda] if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0)
 
         # Ajuste para que o topo se ajuste à barra e o valor de amplitude no topo dela
         y_max = _safe(media_perda) + _safe(err_perda)
         top = (y_max * 1.08) if y_max > 0 else 1.0
         label_offset = 0.005 * top
-        plt.ylim(bottom=0, top=top)
+        chart.call("set_ylim", bottom=0, top=top)
 
-        plt.text(0, media_perda + (_safe(err_perda) if mostrar_intervalo_confianca else 0) + label_offset, f"{media_perda:.4f}",
-                 ha='center', va='bottom')
+        chart.call("text", 0, media_perda + (_safe(err_perda) if mostrar_intervalo_confianca else 0) + label_offset, f"{media_perda:.4f}",
+                   ha='center', va='bottom')
 
-        plt.ylabel("Perda (%)" if media_perda < 1e2 else "Retransmissões")
-        plt.title(f"{test_display_name} - Perda (Média das Rodadas)")
-        png_path = os.path.join(test_dir, f"{test_name}-perda_barra.png")
-        svg_path = os.path.join(test_dir, f"{test_name}-perda_barra.svg")
-        plt.tight_layout()
-        plt.savefig(png_path)
-        plt.savefig(svg_path)
-        plt.close()
+        chart.call("set_ylabel", "Perda (%)" if media_perda < 1e2 else "Retransmissões")
+        chart.call("set_title", f"{test_display_name} - Perda (Média das Rodadas)")
+        submit_chart(chart)
         return (media_perda, err_perda)
     else:
         return (0,0)
 
-def plot_cpu_temporal_for_test(test_dir, test_name):
-    rounds = get_round_dirs(test_dir)
-    dfs = []
-    test_display_name = get_test_display_name_from_conf(test_dir)
+def _mpstat_times(r):
+    """Início e fim de cada linha do mpstat da rodada (veja sample_times)."""
+    return sample_times(r.mpstat_times if r.mpstat_times is not None else r.mpstat)
 
-    for rodada in rounds:
-        rodada_path = os.path.join(test_dir, rodada)
-        mpstat_file = os.path.join(rodada_path, f"{rodada}-{test_name}-mpstat.csv")
-        if not os.path.exists(mpstat_file):
-            print(f"Aviso: {mpstat_file} não encontrado.")
+# Acima desta quantidade de núcleos, o uso de CPU deixa de ter uma linha ou uma
+# barra rotulada por núcleo: cada núcleo vira uma linha de um mapa de calor
+# (núcleo × tempo, rodada ou teste), e os gráficos de linhas e de barras
+# agregam os núcleos por nó NUMA (ou soquete) registrado no <teste>-conf.ini
+LIMITE_NUCLEOS = 16
+COLUNAS_MAPA = 1000  # máximo de colunas de tempo de um mapa de calor (médias de amostras consecutivas)
+ROTULOS_NUCLEOS = 16  # máximo de rótulos de núcleo em um eixo
+
+def _dense(colunas):
+    return len(colunas) > LIMITE_NUCLEOS
+
+def cpu_groups(topologia, colunas):
+    """
+    Agrupa as colunas de CPU (CPU_N) pelo nó NUMA ou, se houver um único nó,
+    pelo soquete (veja get_cpu_topology_from_conf). Retorna (nível,
+    {rótulo: índices das colunas}), ou None sem ao menos dois grupos.
+    """
+    for chave, nivel in (("no", "Nó NUMA"), ("soquete", "Soquete")):
+        grupos = {}
+        for numero, nucleos in (topologia or {}).get(chave, {}).items():
+            conjunto = set(nucleos)
+            indices = [j for j, col in enumerate(colunas) if _core_number(col) in conjunto]
+            if indices:
+                grupos[f"{nivel} {numero}"] = indices
+        if len(grupos) > 1:
+            return nivel, grupos
+    return None
+
+def _mean_columns(matriz, indices):
+    """Média, linha a linha, das colunas 'indices' de 'matriz', ignorando NaN."""
+    m = matriz[:, indices]
+    presente = ~np.isnan(m)
+    with np.errstate(invalid="ignore"):
+        return np.where(presente, m, 0.0).sum(axis=1) / presente.sum(axis=1)
+
+def cpu_group_series(matriz, colunas, topologia):
+    """
+    Séries de 'matriz' (amostras × núcleos) agregadas para os hosts com
+    muitos núcleos: a média dos núcleos de cada nó NUMA (ou soquete) ou, sem
+    a topologia, de todos os núcleos. Retorna [(rótulo, série)].
+    """
+    grupos = cpu_groups(topologia, colunas)
+    if grupos is None:
+        return [("Média dos núcleos", _mean_columns(matriz, list(range(len(colunas)))))]
+    return [(rotulo, _mean_columns(matriz, indices)) for rotulo, indices in grupos[1].items()]
+
+def _bin_columns(matriz, maximo=COLUNAS_MAPA):
+    """Reduz as colunas de 'matriz' a no máximo 'maximo', pela média (sem NaN) de colunas consecutivas."""
+    n = matriz.shape[1]
+    if n <= maximo:
+        return matriz
+    inicios = np.linspace(0, n, maximo, endpoint=False).astype(int)
+    presente = ~np.isnan(matriz)
+    soma = np.add.reduceat(np.where(presente, matriz, 0.0), inicios, axis=1)
+    contagem = np.add.reduceat(presente.astype(float), inicios, axis=1)
+    with np.errstate(invalid="ignore"):
+        return soma / contagem
+
+def _core_ticks(chart, colunas, eixo="y", posicoes=None):
+    """No máximo ROTULOS_NUCLEOS rótulos de núcleo, espaçados, no eixo 'eixo'."""
+    passo = -(-len(colunas) // ROTULOS_NUCLEOS)
+    posicoes = np.arange(len(colunas)) if posicoes is None else np.asarray(posicoes)
+    chart.call(f"set_{eixo}ticks", posicoes[::passo], [_core_number(c) for c in colunas[::passo]])
+
+def _cpu_heatmap(chart, matriz, colunas, **kwargs):
+    """
+    Mapa de calor do uso de CPU, um núcleo por linha. A imagem é rasterizada,
+    de modo que o tamanho do SVG e o tempo de renderização não crescem com a
+    quantidade de núcleos e de amostras.
+    """
+    chart.call("imshow", matriz, aspect="auto", origin="lower", interpolation="nearest",
+               cmap="viridis", vmin=0, vmax=100, rasterized=True, **kwargs)
+    chart.call("colorbar", label="Uso de CPU (%)")
+    _core_ticks(chart, colunas)
+    chart.call("set_ylabel", "Núcleo")
+
+def plot_cpu_mapa_temporal(png_base, matriz, colunas, inicio, fim, titulo):
+    """Mapa de calor núcleo × tempo de 'matriz' (amostras × núcleos), de 'inicio' a 'fim' (s)."""
+    chart = ChartSpec(png_base + ".png", png_base + ".svg", figsize=(10,6))
+    _cpu_heatmap(chart, _bin_columns(matriz.T), colunas, extent=(inicio, fim, -0.5, len(colunas) - 0.5))
+    chart.call("set_xlabel", "Tempo (s)")
+    chart.call("set_title", titulo)
+    submit_chart(chart)
+
+def _plot_temporal(chart, tempo, valores, painel=0, **kwargs):
+    """Desenha uma série temporal reduzida à largura do gráfico (veja downsample_minmax)."""
+    chart.call_at(painel, "plot", *downsample_minmax(tempo, valores, chart.pixel_width()), **kwargs)
+
+def _plot_media_temporal(chart, tempo, media, meia_largura, mostrar_intervalo_confianca=False, painel=0, **kwargs):
+    """Desenha a média entre rodadas e, opcionalmente, a faixa do IC de 95%."""
+    _plot_temporal(chart, tempo, media, painel, **kwargs)
+    if mostrar_intervalo_confianca:
+        chart.call_at(painel, "fill_between", *envelope(tempo, media - meia_largura, media + meia_largura, chart.pixel_width()),
+                      alpha=0.2)
+
+def plot_cpu_temporal_for_test(dados, mostrar_intervalo_confianca=False):
+    series = []
+    colunas = None
+    test_dir, test_name = dados.path, dados.name
+    test_display_name = dados.display_name
+
+    for r in dados.rounds:
+        rodada, rodada_path = r.name, r.path
+        if r.mpstat is None:
+            print(f"Aviso: {r.mpstat_file} não encontrado.")
             continue
-        df = pd.read_csv(mpstat_file)
-        df['tempo'] = range(len(df))
-        dfs.append(df)
-        plt.figure(figsize=(8,6))
-        for col in df.columns:
-            if col == 'tempo':
-                continue
-            plt.plot(df['tempo'], df[col], label=format_label(col))
-        plt.ylabel("Uso de CPU (%)")
-        plt.xlabel("Tempo (s)")
-        plt.title(f"CPU Temporal - {format_label(rodada)} - {test_display_name}")
-        plt.legend()
-        plt.ylim(bottom=0)
+        df = r.mpstat
+        inicio, fim = _mpstat_times(r)
+        if colunas is None:
+            colunas = list(df.columns)
+        matriz = df.reindex(columns=colunas).to_numpy(dtype=float)
+        series.append((inicio, fim, matriz))
         png_path = os.path.join(rodada_path, f"{rodada}-{test_name}-CPU_temporal.png")
         svg_path = os.path.join(rodada_path, f"{rodada}-{test_name}-CPU_temporal.svg")
-        plt.tight_layout()
-        plt.savefig(png_path)
-        plt.savefig(svg_path)
-        plt.close()
-    if dfs:
-        min_len = min(len(df) for df in dfs)
-        df_med = dfs[0].iloc[:min_len].copy()
-        for col in df_med.columns:
-            if col == 'tempo':
-                continue
-            values_list = [pd.to_numeric(df[col].iloc[:min_len], errors='coerce').fillna(0).values.astype(float)
-                           for df in dfs if col in df.columns]
-            if values_list:
-                df_med[col] = np.mean(values_list, axis=0)
-        plt.figure(figsize=(8,6))
-        for col in df_med.columns:
-            if col == 'tempo':
-                continue
-            plt.plot(df_med['tempo'], df_med[col], label=format_label(col))
-        plt.ylabel("Uso de CPU (%)")
-        plt.xlabel("Tempo (s)")
-        plt.title(f"{test_display_name} - CPU Temporal (Média das Rodadas)")
-        plt.legend()
-        plt.ylim(bottom=0)
+        chart = ChartSpec(png_path, svg_path, figsize=(8,6))
+        if _dense(colunas):
+            for rotulo, valores in cpu_group_series(matriz, colunas, dados.topology):
+                _plot_temporal(chart, inicio, valores, label=rotulo)
+            plot_cpu_mapa_temporal(os.path.join(rodada_path, f"{rodada}-{test_name}-CPU_temporal_mapa"), matriz, colunas,
+                                   float(inicio[0]), float(fim[-1]), f"CPU por Núcleo - {format_label(rodada)} - {test_display_name}")
+        else:
+            for col in df.columns:
+                _plot_temporal(chart, inicio, df[col].to_numpy(), label=format_label(col))
+        chart.call("set_ylabel", "Uso de CPU (%)")
+        chart.call("set_xlabel", "Tempo (s)")
+        chart.call("set_title", f"CPU Temporal - {format_label(rodada)} - {test_display_name}")
+        chart.call("legend")
+        chart.call("set_ylim", bottom=0)
+        submit_chart(chart)
+    if series:
+        # Média das rodadas na grade de tempo comum, sem truncar as mais longas
+        serie = resample_rounds(series)
         png_path = os.path.join(test_dir, f"{test_name}-CPU_temporal.png")
         svg_path = os.path.join(test_dir, f"{test_name}-CPU_temporal.svg")
-        plt.tight_layout()
-        plt.savefig(png_path)
-        plt.savefig(svg_path)
-        plt.close()
-
-def plot_vazao_temporal_for_test(test_dir, test_name):
-    rounds = get_round_dirs(test_dir)
-    dfs_client = []
-    dfs_server = []
-    test_display_name = get_test_display_name_from_conf(test_dir)
-
-    for rodada in rounds:
-        rodada_path = os.path.join(test_dir, rodada)
-        client_file = os.path.join(rodada_path, f"{rodada}-{test_name}-iperf3_client.csv")
-        server_file = os.path.join(rodada_path, f"{rodada}-{test_name}-iperf3_server.csv")
-        if not os.path.exists(client_file) or not os.path.exists(server_file):
-            print(f"Aviso: Arquivos de vazão não encontrados em {rodada_path}.")
+        chart = ChartSpec(png_path, svg_path, figsize=(8,6))
+        if _dense(colunas):
+            for rotulo, valores in cpu_group_series(serie.media, colunas, dados.topology):
+                _plot_temporal(chart, serie.tempo, valores, label=rotulo)
+            passo = float(serie.tempo[1] - serie.tempo[0]) if len(serie.tempo) > 1 else 1.0
+            plot_cpu_mapa_temporal(os.path.join(test_dir, f"{test_name}-CPU_temporal_mapa"), serie.media, colunas,
+                                   float(serie.tempo[0]), float(serie.tempo[-1]) + passo,
+                                   f"{test_display_name} - CPU por Núcleo (Média das Rodadas)")
+        else:
+            for j, col in enumerate(colunas):
+                _plot_media_temporal(chart, serie.tempo, serie.media[:, j], serie.meia_largura[:, j],
+                                     mostrar_intervalo_confianca, label=format_label(col))
+        chart.call("set_ylabel", "Uso de CPU (%)")
+        chart.call("set_xlabel", "Tempo (s)")
+        chart.call("set_title", f"{test_display_name} - CPU Temporal (Média das Rodadas)")
+        chart.call("legend")
+        chart.call("set_ylim", bottom=0)
+        submit_chart(chart)
+
+def plot_vazao_temporal_for_test(dados, mostrar_intervalo_confianca=False):
+    series_client = []
+    series_server = []
+    test_dir, test_name = dados.path, dados.name
+    test_display_name = dados.display_name
+
+    for r in dados.rounds:
+        if r.client is None or r.server is None:
+            print(f"Aviso: Arquivos de vazão não encontrados em {r.path}.")
             continue
-        df_client = pd.read_csv(client_file)
-        df_server = pd.read_csv(server_file)
-        df_client['tempo'] = range(len(df_client))
-        df_server['tempo'] = range(len(df_server))
-        dfs_client.append(df_client)
-        dfs_server.append(df_server)
-    if not (dfs_client and dfs_server):
+        if 'bits_por_segundo' in r.client.columns:
+            series_client.append((*sample_times(r.client), r.client['bits_por_segundo'].to_numpy(dtype=float)))
+        if 'bits_por_segundo' in r.server.columns:
+            series_server.append((*sample_times(r.server), r.server['bits_por_segundo'].to_numpy(dtype=float)))
+    if not (series_client or series_server):
         print(f"Aviso: Não foi possível criar o gráfico temporal para {test_display_name} por falta de dados.")
         return
 
-    # Calcula o menor comprimento comum
-    common_length = min(min(len(df) for df in dfs_client), min(len(df) for df in dfs_server))
-    df_med_client = dfs_client[0].iloc[:common_length].copy()
-    df_med_server = dfs_server[0].iloc[:common_length].copy()
-
-    # Faz média das séries temporais para o cliente
-    if 'bits_por_segundo' in df_med_client.columns:
-        values_list_client = [
-            pd.to_numeric(df['bits_por_segundo'].iloc[:common_length], errors='coerce').fillna(0).values.astype(float)
-            for df in dfs_client if 'bits_por_segundo' in df.columns
-        ]
-        if values_list_client:
-            df_med_client['bits_por_segundo'] = np.mean(values_list_client, axis=0)
-
-    # Faz média das séries temporais para o servidor
-    if 'bits_por_segundo' in df_med_server.columns:
-        values_list_server = [
-            pd.to_numeric(df['bits_por_segundo'].iloc[:common_length], errors='coerce').fillna(0).values.astype(float)
-            for df in dfs_server if 'bits_por_segundo' in df.columns
-        ]
-        if values_list_server:
-            df_med_server['bits_por_segundo'] = np.mean(values_list_server, axis=0)
-
-    # Plotagem
-    plt.figure(figsize=(8,6))
-    plotted_any = False
-    if 'bits_por_segundo' in df_med_client.columns:
-        plt.plot(df_med_client['tempo'], df_med_client['bits_por_segundo']/1e6, label="Cliente")
-        plotted_any = True
-    if 'bits_por_segundo' in df_med_server.columns:
-        plt.plot(df_med_server['tempo'], df_med_server['bits_por_segundo']/1e6, label="Servidor")
-        plotted_any = True
-    if not plotted_any:
-        print(f"Nenhuma coluna 'bits_por_segundo' encontrada nos arquivos para {test_name}.")
-        return
-    plt.ylabel("Vazão (Mbps)")
-    plt.xlabel("Tempo (s)")
-    plt.title(f"{test_display_name} - Vazão Temporal")
-    plt.legend()
-    plt.ylim(bottom=0)
+    # Plotagem da média das rodadas, reamostradas na grade de tempo comum
     png_path = os.path.join(test_dir, f"{test_name}-vazao_temporal.png")
     svg_path = os.path.join(test_dir, f"{test_name}-vazao_temporal.svg")
-    plt.tight_layout()
-    plt.savefig(png_path)
-    plt.savefig(svg_path)
-    plt.close()
-
-def plot_perda_temporal_for_test(test_dir, test_name):
-    rounds = get_round_dirs(test_dir)
-    dfs = []
-    test_display_name = get_test_display_name_from_conf(test_dir)
-
-    for rodada in rounds:
-        rodada_path = os.path.join(test_dir, rodada)
-        client_file = os.path.join(rodada_path, f"{rodada}-{test_name}-iperf3_client.csv")
-        if not os.path.exists(client_file):
-            print(f"Aviso: {client_file} não encontrado.")
+    chart = ChartSpec(png_path, svg_path, figsize=(8,6))
+    for series, label in ((series_client, "Cliente"), (series_server, "Servidor")):
+        if series:
+            serie = resample_rounds(series)
+            _plot_media_temporal(chart, serie.tempo, serie.media / 1e6, serie.meia_largura / 1e6,
+                                 mostrar_intervalo_confianca, label=label)
+    chart.call("set_ylabel", "Vazão (Mbps)")
+    chart.call("set_xlabel", "Tempo (s)")
+    chart.call("set_title", f"{test_display_name} - Vazão Temporal")
+    chart.call("legend")
+    chart.call("set_ylim", bottom=0)
+    submit_chart(chart)
+
+def plot_perda_temporal_for_test(dados, mostrar_intervalo_confianca=False):
+    series = []
+    col = '%_pacotes_perdidos'
+    test_dir, test_name = dados.path, dados.name
+    test_display_name = dados.display_name
+
+    for r in dados.rounds:
+        rodada, rodada_path = r.name, r.path
+        if r.client is None:
+            print(f"Aviso: {r.client_file} não encontrado.")
             continue
-        df = pd.read_csv(client_file)
-        col = '%_pacotes_perdidos' if '%_pacotes_perdidos' in df.columns else None
-        if col is None:
+        df = r.client
+        if col not in df.columns:
             continue
-        df['tempo'] = range(len(df))
-        dfs.append(df)
-        plt.figure(figsize=(8,6))
-        plt.plot(df['tempo'], df[col], label="Perda (%)")
-        plt.ylabel("Perda (%)")
-        plt.xlabel("Tempo (s)")
-        plt.title(f"Perda Temporal - {format_label(rodada)} - {test_display_name}")
-        plt.legend()
-        plt.ylim(bottom=0)
+        inicio, fim = sample_times(df)
+        series.append((inicio, fim, df[col].to_numpy(dtype=float)))
         png_path = os.path.join(rodada_path, f"{rodada}-{test_name}-perda_temporal.png")
         svg_path = os.path.join(rodada_path, f"{rodada}-{test_name}-perda_temporal.svg")
-        plt.tight_layout()
-        plt.savefig(png_path)
-        plt.savefig(svg_path)
-        plt.close()
-    if dfs:
-        common_length = min(len(df) for df in dfs)
-        df_med = dfs[0].iloc[:common_length].copy()
-        col = '%_pacotes_perdidos'
-        values_list = [pd.to_numeric(df[col].iloc[:common_length], errors='coerce').fillna(0).values.astype(float)
-                       for df in dfs if col in df.columns]
-        if values_list:
-            df_med[col] = np.mean(values_list, axis=0)
-        plt.figure(figsize=(8,6))
-        plt.plot(df_med['tempo'], df_med[col], label="Perda (%)")
-        plt.ylabel("Perda (%)")
-        plt.xlabel("Tempo (s)")
-        plt.title(f"{test_display_name} - Perda Temporal (Média das Rodadas)")
-        plt.legend()
-        plt.ylim(bottom=0)
+        chart = ChartSpec(png_path, svg_path, figsize=(8,6))
+        _plot_temporal(chart, inicio, df[col].to_numpy(), label="Perda (%)")
+        chart.call("set_ylabel", "Perda (%)")
+        chart.call("set_xlabel", "Tempo (s)")
+        chart.call("set_title", f"Perda Temporal - {format_label(rodada)} - {test_display_name}")
+        chart.call("legend")
+        chart.call("set_ylim", bottom=0)
+        submit_chart(chart)
+    if series:
+        serie = resample_rounds(series)
         png_path = os.path.join(test_dir, f"{test_name}-perda_temporal.png")
         svg_path = os.path.join(test_dir, f"{test_name}-perda_temporal.svg")
-        plt.tight_layout()
-        plt.savefig(png_path)
-        plt.savefig(svg_path)
-        plt.close()
-
-def plot_cpu_comparativo_por_rodada(test_dir, test_name, mostrar_intervalo_confianca=False):
-    rounds = get_round_dirs(test_dir)
+        chart = ChartSpec(png_path, svg_path, figsize=(8,6))
+        _plot_media_temporal(chart, serie.tempo, serie.media, serie.meia_largura,
+                             mostrar_intervalo_confianca, label="Perda (%)")
+        chart.call("set_ylabel", "Perda (%)")
+        chart.call("set_xlabel", "Tempo (s)")
+        chart.call("set_title", f"{test_display_name} - Perda Temporal (Média das Rodadas)")
+        chart.call("legend")
+        chart.call("set_ylim", bottom=0)
+        submit_chart(chart)
+
+def plot_cpu_comparativo_por_rodada(dados, mostrar_intervalo_confianca=False):
     data = {}
     errors = {}
-    test_display_name = get_test_display_name_from_conf(test_dir)
+    test_dir, test_name = dados.path, dados.name
+    test_display_name = dados.display_name
 
-    for rodada in rounds:
-        rodada_path = os.path.join(test_dir, rodada)
-        mpstat_file = os.path.join(rodada_path, f"{rodada}-{test_name}-mpstat.csv")
-        if not os.path.exists(mpstat_file):
+    for r in dados.rounds:
+        if r.mpstat is None:
             continue
-        df = pd.read_csv(mpstat_file)
+        df = r.mpstat
         cpu_dict = {}
         err_dict = {}
-        n = len(df)
-        for col in df.columns:
-            m = float(pd.to_numeric(df[col], errors='coerce').mean())
-            std = float(pd.to_numeric(df[col], errors='coerce').std(ddof=1))
-            err = 1.96 * std / np.sqrt(n) if n > 1 and not np.isnan(std) else 0.0
-            cpu_dict[col] = m
-            err_dict[col] = err
-        data[rodada] = cpu_dict
-        errors[rodada] = err_dict
+        erros = half_width(df.to_numpy(dtype=float), bootstrap=False)
+        for col, err in zip(df.columns, erros):
+            cpu_dict[col] = float(df[col].mean())
+            err_dict[col] = float(err)
+        data[r.name] = cpu_dict
+        errors[r.name] = err_dict
 
     if not data:
         return
@@ -629,13 +634,30 @@ def plot_cpu_comparativo_por_rodada(test_dir, test_name, mostrar_intervalo_confi
     cores_from_header = list(next(iter(data.values())).keys())
     cores = [re.search(r'\d+', c).group() for c in cores_from_header]
 
+    if _dense(cores_from_header):
+        # Mapa de calor núcleo × rodada em vez de uma barra por núcleo e rodada
+        rodadas = list(data)
+        matriz = np.array([[data[rodada].get(core, np.nan) for rodada in rodadas] for core in cores_from_header])
+        png_path = os.path.join(test_dir, f"{test_name}-uso_de_cpu_mapa_por_rodada.png")
+        svg_path = os.path.join(test_dir, f"{test_name}-uso_de_cpu_mapa_por_rodada.svg")
+        chart = ChartSpec(png_path, svg_path, figsize=(10,6))
+        _cpu_heatmap(chart, matriz, cores_from_header)
+        chart.call("set_xticks", np.arange(len(rodadas)), [format_label(rodada) for rodada in rodadas],
+                   rotation=90 if len(rodadas) > 10 else 0)
+        chart.call("set_xlabel", "Rodada")
+        chart.call("set_title", f"{test_display_name} - Uso médio de CPU por núcleo e rodada")
+        submit_chart(chart)
+        return
+
     x = np.arange(len(cores_from_header))
     width = 0.8 / len(data)
-    plt.figure(figsize=(10,6))
+    png_path = os.path.join(test_dir, f"{test_name}-uso_de_cpu_barra_por_rodada.png")
+    svg_path = os.path.join(test_dir, f"{test_name}-uso_de_cpu_barra_por_rodada.svg")
+    chart = ChartSpec(png_path, svg_path, figsize=(10,6))
 
     # acompanhar topo global e guardar barras/erros para rotular depois
     y_max_total = 0.0
-    all_bars_and_errs = []  # [(bars, err_values)]
+    all_bars_and_errs = []  # [(posições, valores, err_values)]
 
     for i, rodada in enumerate(sorted(data.keys())):
         round_number = re.search(r'rodada_(\d+)', rodada).group(1)
@@ -650,52 +672,50 @@ def plot_cpu_comparativo_por_rodada(test_dir, test_name, mostrar_intervalo_confi
                               for v, e in zip(values, err_values))
             y_max_total = max(y_max_total, y_max_local)
 
-        bars = plt.bar(x + i*width, values, width, yerr=err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label=f"Rodada {round_number}")
-        all_bars_and_errs.append((bars, err_values))
+        chart.call("bar", x + i*width, values, width, yerr=err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label=f"Rodada {round_number}")
+        all_bars_and_errs.append((x + i*width, values, err_values))
 
     # Ajuste para que o topo se ajuste à barra e o valor de amplitude no topo dela
     top = (y_max_total * 1.08) if y_max_total > 0 else 1.0   # 8% de folga no topo
     label_offset = 0.005 * top                               # distância do valor até o topo da barra
-    plt.ylim(bottom=0, top=top)
+    chart.call("set_ylim", bottom=0, top=top)
 
     # Rótulos acima das barras
-    for bars, err_values in all_bars_and_errs:
-        for i, bar in enumerate(bars):
+    for xs, values, err_values in all_bars_and_errs:
+        for i, (xi, v) in enumerate(zip(xs, values)):
             e = err_values[i] if i < len(err_values) else 0.0
             e = 0.0 if (e is None or (isinstance(e, float) and np.isnan(e))) else float(e)
-            y = bar.get_height() + (e if mostrar_intervalo_confianca else 0) + label_offset
-            plt.text(bar.get_x()+bar.get_width()/2, y, f"{bar.get_height():.2f}",
-                     ha='center', va='bottom')
+            y = v + (e if mostrar_intervalo_confianca else 0) + label_offset
+            chart.call("text", xi, y, f"{v:.2f}", ha='center', va='bottom')
 
-    plt.ylabel("Uso médio de CPU (%)")
-    plt.xlabel("Núcleo")
-    plt.title(f"{test_display_name} - Comparativo do uso de CPU por rodada")
-    plt.xticks(x + width*(len(data)-1)/2, [format_label(c) for c in cores])
-    plt.legend()
-
-    png_path = os.path.join(test_dir, f"{test_name}-uso_de_cpu_barra_por_rodada.png")
-    svg_path = os.path.join(test_dir, f"{test_name}-uso_de_cpu_barra_por_rodada.svg")
-    plt.tight_layout()
-    plt.savefig(png_path)
-    plt.savefig(svg_path)
-    plt.close()
+    chart.call("set_ylabel", "Uso médio de CPU (%)")
+    chart.call("set_xlabel", "Núcleo")
+    chart.call("set_title", f"{test_display_name} - Comparativo do uso de CPU por rodada")
+    chart.call("set_xticks", x + width*(len(data)-1)/2, [format_label(c) for c in cores])
+    chart.call("legend")
+    submit_chart(chart)
 
 def plot_cpu_comparativo_por_teste(resultados_dir, tests, cpu_aggregate, mostrar_intervalo_confianca=False):
     if not cpu_aggregate:
         return
-    prefix = "-".join(sorted(tests))
+    prefix = join_test_names(sorted(tests))
     test_keys = sorted([test for test in tests if test in cpu_aggregate])
     cores = list(next(iter(cpu_aggregate.values())).keys())
+    if _dense(cores):
+        plot_cpu_grupos_por_teste(resultados_dir, prefix, test_keys, cpu_aggregate)
+        return
     n_tests = len(test_keys)
     n_cores = len(cores)
     x = np.arange(n_tests)
     width = 0.8 / n_cores
 
-    plt.figure(figsize=(10,6))
+    png_path = os.path.join(resultados_dir, f"{prefix}-uso_de_cpu_por_teste_barra_comparativo.png")
+    svg_path = os.path.join(resultados_dir, f"{prefix}-uso_de_cpu_por_teste_barra_comparativo.svg")
+    chart = ChartSpec(png_path, svg_path, figsize=(10,6))
 
     # Encontrar o maior valor de topo para ajustar o eixo y
     y_max_total = 0.0
-    all_bars_and_errs = []  # [(bars, err_values)]
+    all_bars_and_errs = []  # [(posições, valores, err_values)]
 
     for j, core in enumerate(cores):
         values = []
@@ -708,8 +728,8 @@ def plot_cpu_comparativo_por_teste(resultados_dir, tests, cpu_aggregate, mostrar
             err_values.append(e)
 
         offset = (j - (n_cores - 1)/2) * width
-        bars = plt.bar(x + offset, values, width, yerr=err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label=format_label(core))
-        all_bars_and_errs.append((bars, err_values))
+        chart.call("bar", x + offset, values, width, yerr=err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label=format_label(core))
+        all_bars_and_errs.append((x + offset, values, err_values))
 
         if values:
             y_max_local = max(v + (e if not np.isnan(e) else 0.0) for v, e in zip(values, err_values))
@@ -718,42 +738,84 @@ def plot_cpu_comparativo_por_teste(resultados_dir, tests, cpu_aggregate, mostrar
     # Ajuste para que o topo se ajuste à barra e o valor de amplitude no topo dela
     top = (y_max_total * 1.08) if y_max_total > 0 else 1.0   # 8% de folga no topo
     label_offset = 0.005 * top                               # distância do valor até o topo da barra
-    plt.ylim(bottom=0, top=top)
+    chart.call("set_ylim", bottom=0, top=top)
 
     # Rótulos acima das barras
-    for bars, err_values in all_bars_and_errs:
-        for i, bar in enumerate(bars):
+    for xs, values, err_values in all_bars_and_errs:
+        for i, (xi, v) in enumerate(zip(xs, values)):
             e = err_values[i] if i < len(err_values) and err_values[i] is not None else 0.0
             e = 0.0 if np.isnan(e) else float(e)
-            y = bar.get_height() + (e if mostrar_intervalo_confianca else 0) + label_offset
-            plt.text(bar.get_x() + bar.get_width()/2, y, f"{bar.get_height():.2f}",
-                     ha='center', va='bottom')
+            y = v + (e if mostrar_intervalo_confianca else 0) + label_offset
+            chart.call("text", xi, y, f"{v:.2f}", ha='center', va='bottom')
 
-    plt.ylabel("Uso médio de CPU (%)")
-    plt.xlabel("Teste")
-    plt.title("Uso de CPU por teste")
-    plt.xticks(x, [get_test_display_name_from_conf(os.path.join(os.path.dirname(resultados_dir), test)) for test in test_keys])
-    plt.legend(title="Núcleo")
+    chart.call("set_ylabel", "Uso médio de CPU (%)")
+    chart.call("set_xlabel", "Teste")
+    chart.call("set_title", "Uso de CPU por teste")
+    chart.call("set_xticks", x, [get_test_display_name_from_conf(os.path.join(os.path.dirname(resultados_dir), test)) for test in test_keys])
+    chart.call("legend", title="Núcleo")
+    submit_chart(chart)
 
+def plot_cpu_grupos_por_teste(resultados_dir, prefix, test_keys, cpu_aggregate):
+    """
+    Uso de CPU por teste em hosts com muitos núcleos: uma barra por nó NUMA
+    (ou soquete), com a média dos núcleos do grupo, ou, sem a topologia no
+    <teste>-conf.ini, a média de todos os núcleos.
+    """
+    valores = {}  # rótulo do grupo -> {teste: média}
+    for test in test_keys:
+        colunas = list(cpu_aggregate[test])
+        medias = np.array([[cpu_aggregate[test][col][0] for col in colunas]], dtype=float)
+        topologia = get_cpu_topology_from_conf(os.path.join(os.path.dirname(resultados_dir), test))
+        for rotulo, serie in cpu_group_series(medias, colunas, topologia):
+            valores.setdefault(rotulo, {})[test] = float(serie[0])
+
+    x = np.arange(len(test_keys))
+    width = 0.8 / len(valores)
     png_path = os.path.join(resultados_dir, f"{prefix}-uso_de_cpu_por_teste_barra_comparativo.png")
     svg_path = os.path.join(resultados_dir, f"{prefix}-uso_de_cpu_por_teste_barra_comparativo.svg")
-    plt.tight_layout()
-    plt.savefig(png_path)
-    plt.savefig(svg_path)
-    plt.close()
+    chart = ChartSpec(png_path, svg_path, figsize=(10,6))
+    for j, (rotulo, por_teste) in enumerate(valores.items()):
+        offset = (j - (len(valores) - 1)/2) * width
+        chart.call("bar", x + offset, [por_teste.get(test, np.nan) for test in test_keys], width, label=rotulo)
+    chart.call("set_ylabel", "Uso médio de CPU (%)")
+    chart.call("set_xlabel", "Teste")
+    chart.call("set_title", "Uso de CPU por teste (média dos núcleos)")
+    chart.call("set_xticks", x, [get_test_display_name_from_conf(os.path.join(os.path.dirname(resultados_dir), test)) for test in test_keys])
+    chart.call("set_ylim", bottom=0)
+    chart.call("legend")
+    submit_chart(chart)
 
 def plot_cpu_comparativo_por_nucleo(resultados_dir, tests, cpu_aggregate, mostrar_intervalo_confianca=False):
     if not cpu_aggregate:
         return
-    prefix = "-".join(sorted(tests))
+    prefix = join_test_names(sorted(tests))
     first = next(iter(cpu_aggregate.values()))
 
     cores_from_header = list(first.keys())
     cores = [re.search(r'\d+', c).group() for c in cores_from_header]
 
+    if _dense(cores_from_header):
+        # Mapa de calor núcleo × teste em vez de uma barra por núcleo e teste
+        test_keys = [test for test in sorted(tests) if test in cpu_aggregate]
+        matriz = np.array([[cpu_aggregate[test].get(core, (np.nan, 0))[0] for test in test_keys] for core in cores_from_header],
+                          dtype=float)
+        png_path = os.path.join(resultados_dir, f"{prefix}-uso_de_cpu_mapa_comparativo.png")
+        svg_path = os.path.join(resultados_dir, f"{prefix}-uso_de_cpu_mapa_comparativo.svg")
+        chart = ChartSpec(png_path, svg_path, figsize=(10,6))
+        _cpu_heatmap(chart, matriz, cores_from_header)
+        chart.call("set_xticks", np.arange(len(test_keys)),
+                   [get_test_display_name_from_conf(os.path.join(os.path.dirname(resultados_dir), test)) for test in test_keys],
+                   rotation=90 if len(test_keys) > 6 else 0)
+        chart.call("set_xlabel", "Teste")
+        chart.call("set_title", "Uso médio de CPU de cada teste por Núcleo")
+        submit_chart(chart)
+        return
+
     x = np.arange(len(cores_from_header))
     width = 0.8 / len(tests)
-    plt.figure(figsize=(10,6))
+    png_path = os.path.join(resultados_dir, f"{prefix}-uso_de_cpu_por_nucleo_barra_comparativo.png")
+    svg_path = os.path.join(resultados_dir, f"{prefix}-uso_de_cpu_por_nucleo_barra_comparativo.svg")
+    chart = ChartSpec(png_path, svg_path, figsize=(10,6))
 
     y_max_total = 0.0
     all_bars_and_errs = []
@@ -771,64 +833,53 @@ def plot_cpu_comparativo_por_nucleo(resultados_dir, tests, cpu_aggregate, mostra
         y_max_local = max((v + e) for v, e in zip(values, err_values)) if values else 0.0
         y_max_total = max(y_max_total, y_max_local)
 
-        bars = plt.bar(x + i*width, values, width, yerr=err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label=test_display_name)
-        all_bars_and_errs.append((bars, err_values))
+        chart.call("bar", x + i*width, values, width, yerr=err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label=test_display_name)
+        all_bars_and_errs.append((x + i*width, values, err_values))
 
     top = (y_max_total * 1.08) if y_max_total > 0 else 1.0
     label_offset = 0.005 * top   # distância do valor até o topo da barra
 
-    for bars, err_values in all_bars_and_errs:
-        for i, bar in enumerate(bars):
+    for xs, values, err_values in all_bars_and_errs:
+        for i, (xi, v) in enumerate(zip(xs, values)):
             e = err_values[i] if i < len(err_values) else 0.0
-            y = bar.get_height() + (e if mostrar_intervalo_confianca else 0) + label_offset
-            plt.text(bar.get_x()+bar.get_width()/2, y, f"{bar.get_height():.2f}",
-                     ha='center', va='bottom')
-
-    plt.ylabel("Uso médio de CPU (%)")
-    plt.xlabel("Núcleo")
-    plt.title("Uso de CPU de cada teste por Núcleo")
-    plt.xticks(x + width*(len(tests)-1)/2, [format_label(core) for core in cores])
-    plt.legend()
-    plt.ylim(bottom=0, top=top)
-
-    png_path = os.path.join(resultados_dir, f"{prefix}-uso_de_cpu_por_nucleo_barra_comparativo.png")
-    svg_path = os.path.join(resultados_dir, f"{prefix}-uso_de_cpu_por_nucleo_barra_comparativo.svg")
-    plt.tight_layout()
-    plt.savefig(png_path)
-    plt.savefig(svg_path)
-    plt.close()
-
-def plot_perda_comparativo_por_rodada(test_dir, test_name, mostrar_intervalo_confianca=False):
-    rounds = get_round_dirs(test_dir)
+            y = v + (e if mostrar_intervalo_confianca else 0) + label_offset
+            chart.call("text", xi, y, f"{v:.2f}", ha='center', va='bottom')
+
+    chart.call("set_ylabel", "Uso médio de CPU (%)")
+    chart.call("set_xlabel", "Núcleo")
+    chart.call("set_title", "Uso de CPU de cada teste por Núcleo")
+    chart.call("set_xticks", x + width*(len(tests)-1)/2, [format_label(core) for core in cores])
+    chart.call("legend")
+    chart.call("set_ylim", bottom=0, top=top)
+    submit_chart(chart)
+
+def plot_perda_comparativo_por_rodada(dados, mostrar_intervalo_confianca=False):
     data = {}
     errors = {}
     labels_map = {}  # rodada -> label
-    test_display_name = get_test_display_name_from_conf(test_dir)
+    test_dir, test_name = dados.path, dados.name
+    test_display_name = dados.display_name
 
-    for rodada in rounds:
-        rodada_path = os.path.join(test_dir, rodada)
-        server_file = os.path.join(rodada_path, f"{rodada}-{test_name}-iperf3_server.csv")
-        client_file = os.path.join(rodada_path, f"{rodada}-{test_name}-iperf3_client.csv")
+    for r in dados.rounds:
+        rodada = r.name
 
         # UDP servidor: porcentagem_pacotes_perdidos
-        if os.path.exists(server_file):
-            df_srv = pd.read_csv(server_file)
+        if r.server is not None:
+            df_srv = r.server
             if "porcentagem_pacotes_perdidos" in df_srv.columns:
-                n = len(df_srv)
                 m = df_srv["porcentagem_pacotes_perdidos"].mean()
-                err = 1.96 * df_srv["porcentagem_pacotes_perdidos"].std(ddof=1) / np.sqrt(n) if n > 1 else 0.0
+                err = half_width(df_srv["porcentagem_pacotes_perdidos"].to_numpy(dtype=float), bootstrap=False)
                 data[rodada] = float(m)
                 errors[rodada] = float(err)
                 labels_map[rodada] = "Perda (%)"
                 continue  # Achou, passa pra próxima rodada
 
         # TCP cliente: retransmissoes
-        if os.path.exists(client_file):
-            df_cli = pd.read_csv(client_file)
+        if r.client is not None:
+            df_cli = r.client
             if "retransmissoes" in df_cli.columns:
-                n = len(df_cli)
                 m = df_cli["retransmissoes"].mean()
-                err = 1.96 * df_cli["retransmissoes"].std(ddof=1) / np.sqrt(n) if n > 1 else 0.0
+                err = half_width(df_cli["retransmissoes"].to_numpy(dtype=float), bootstrap=False)
                 data[rodada] = float(m)
                 errors[rodada] = float(err)
                 labels_map[rodada] = "Retransmissões"
@@ -859,35 +910,32 @@ def plot_perda_comparativo_por_rodada(test_dir, test_name, mostrar_intervalo_con
     top = (y_max * 1.08) if y_max > 0 else 1.0     # 8% de folga no topo
     label_offset = 0.005 * top                     # distância do valor até o topo da barra
 
-    plt.figure(figsize=(8,6))
-    bars = plt.bar(x, values, width=0.5, yerr=err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0)
+    png_path = os.path.join(test_dir, f"{test_name}-perda_barra_comparativo.png")
+    svg_path = os.path.join(test_dir, f"{test_name}-perda_barra_comparativo.svg")
+    chart = ChartSpec(png_path, svg_path, figsize=(8,6))
+    chart.call("bar", x, values, width=0.5, yerr=err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0)
 
     # Rótulos acima das barras
-    for i, bar in enumerate(bars):
+    for i, (xi, v) in enumerate(zip(x, values)):
         e = _safe(err_values[i]) if i < len(err_values) else 0.0
-        y = bar.get_height() + (e if mostrar_intervalo_confianca else 0) + label_offset
-        plt.text(
-            bar.get_x() + bar.get_width()/2,
+        y = v + (e if mostrar_intervalo_confianca else 0) + label_offset
+        chart.call(
+            "text",
+            xi,
             y,
-            f"{bar.get_height():.4f}",
+            f"{v:.4f}",
             ha='center', va='bottom', fontsize=9
         )
 
-    plt.ylabel(ylabel)
-    plt.xlabel("Rodada")
-    plt.title(f"{test_display_name} - {title_tipo} por rodada")
-    plt.xticks(x, rounds_sorted_numbers)
-    plt.ylim(bottom=0, top=top)
-
-    png_path = os.path.join(test_dir, f"{test_name}-perda_barra_comparativo.png")
-    svg_path = os.path.join(test_dir, f"{test_name}-perda_barra_comparativo.svg")
-    plt.tight_layout()
-    plt.savefig(png_path)
-    plt.savefig(svg_path)
-    plt.close()
+    chart.call("set_ylabel", ylabel)
+    chart.call("set_xlabel", "Rodada")
+    chart.call("set_title", f"{test_display_name} - {title_tipo} por rodada")
+    chart.call("set_xticks", x, rounds_sorted_numbers)
+    chart.call("set_ylim", bottom=0, top=top)
+    submit_chart(chart)
 
 def plot_perda_comparativo_por_teste(resultados_dir, tests, perda_aggregate, mostrar_intervalo_confianca=False):
-    prefix = "-".join(sorted(tests))
+    prefix = join_test_names(sorted(tests))
     tests_sorted = sorted(perda_aggregate.keys())
     x = np.arange(len(tests_sorted))
 
@@ -899,60 +947,51 @@ def plot_perda_comparativo_por_teste(resultados_dir, tests, perda_aggregate, mos
     top = (y_max * 1.08) if y_max > 0 else 1.0   # 8% de folga no topo
     label_offset = 0.005 * top                   # distância do valor até o topo da barra
 
-    plt.figure(figsize=(8,6))
-    bars = plt.bar(x, values, width=0.5, yerr=err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0)
+    png_path = os.path.join(resultados_dir, f"{prefix}-perda_barra_comparativo.png")
+    svg_path = os.path.join(resultados_dir, f"{prefix}-perda_barra_comparativo.svg")
+    chart = ChartSpec(png_path, svg_path, figsize=(8,6))
+    chart.call("bar", x, values, width=0.5, yerr=err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0)
 
     # Rótulos acima das barras
-    for i, bar in enumerate(bars):
+    for i, (xi, v) in enumerate(zip(x, values)):
         e = _safe(err_values[i]) if i < len(err_values) else 0.0
-        y = bar.get_height() + (e if mostrar_intervalo_confianca else 0) + label_offset
-        plt.text(bar.get_x()+bar.get_width()/2, y, f"{bar.get_height():.4f}",
-                 ha='center', va='bottom')
-
-    plt.ylabel("Perda (%)")
-    plt.xlabel("Teste")
-    plt.title("Perda Comparativo por Teste")
-    plt.xticks(x, [get_test_display_name_from_conf(os.path.join(os.path.dirname(resultados_dir), test)) for test in tests_sorted])
-    plt.ylim(bottom=0, top=top)
+        y = v + (e if mostrar_intervalo_confianca else 0) + label_offset
+        chart.call("text", xi, y, f"{v:.4f}", ha='center', va='bottom')
 
-    png_path = os.path.join(resultados_dir, f"{prefix}-perda_barra_comparativo.png")
-    svg_path = os.path.join(resultados_dir, f"{prefix}-perda_barra_comparativo.svg")
-    plt.tight_layout()
-    plt.savefig(png_path)
-    plt.savefig(svg_path)
-    plt.close()
+    chart.call("set_ylabel", "Perda (%)")
+    chart.call("set_xlabel", "Teste")
+    chart.call("set_title", "Perda Comparativo por Teste")
+    chart.call("set_xticks", x, [get_test_display_name_from_conf(os.path.join(os.path.dirname(resultados_dir), test)) for test in tests_sorted])
+    chart.call("set_ylim", bottom=0, top=top)
+    submit_chart(chart)
 
-def plot_vazao_comparativo_por_rodada(test_dir, test_name, mostrar_intervalo_confianca=False):
-    rounds = get_round_dirs(test_dir)
+def plot_vazao_comparativo_por_rodada(dados, mostrar_intervalo_confianca=False):
     data_client = {}
     data_server = {}
     err_client = {}
     err_server = {}
-    test_display_name = get_test_display_name_from_conf(test_dir)
+    test_dir, test_name = dados.path, dados.name
+    test_display_name = dados.display_name
 
-    for rodada in rounds:
-        rodada_path = os.path.join(test_dir, rodada)
-        client_file = os.path.join(rodada_path, f"{rodada}-{test_name}-iperf3_client.csv")
-        server_file = os.path.join(rodada_path, f"{rodada}-{test_name}-iperf3_server.csv")
-        if not os.path.exists(client_file) or not os.path.exists(server_file):
+    for r in dados.rounds:
+        rodada = r.name
+        if r.client is None or r.server is None:
             continue
 
-        df_client = pd.read_csv(client_file)
-        df_server = pd.read_csv(server_file)
+        df_client = r.client
+        df_server = r.server
 
         # Cliente (em bps)
         if 'bits_por_segundo' in df_client.columns and len(df_client) > 0:
-            n_client  = len(df_client)
             m_client  = df_client['bits_por_segundo'].mean()  # bps
-            e_client  = 1.96 * df_client['bits_por_segundo'].std(ddof=1) / np.sqrt(n_client) if n_client > 1 else 0.0
+            e_client  = half_width(df_client['bits_por_segundo'].to_numpy(dtype=float), bootstrap=False)
             data_client[rodada] = float(m_client)
             err_client[rodada]  = float(e_client)
 
         # Servidor (em bps)
         if 'bits_por_segundo' in df_server.columns and len(df_server) > 0:
-            n_server  = len(df_server)
             m_server  = df_server['bits_por_segundo'].mean()  # bps
-            e_server  = 1.96 * df_server['bits_por_segundo'].std(ddof=1) / np.sqrt(n_server) if n_server > 1 else 0.0
+            e_server  = half_width(df_server['bits_por_segundo'].to_numpy(dtype=float), bootstrap=False)
             data_server[rodada] = float(m_server)
             err_server[rodada]  = float(e_server)
 
@@ -983,9 +1022,11 @@ def plot_vazao_comparativo_por_rodada(test_dir, test_name, mostrar_intervalo_con
     rounds_sorted_numbers = [re.search(r'rodada_(\d+)', r).group(1) for r in rounds_sorted]
 
     width = 0.35
-    plt.figure(figsize=(8, 6))
-    bars1 = plt.bar(x - width/2, client_values, width, yerr=client_err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label="Cliente")
-    bars2 = plt.bar(x + width/2, server_values, width, yerr=server_err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label="Servidor")
+    png_path = os.path.join(test_dir, f"{test_name}-vazao_barra_comparativo_por_rodada.png")
+    svg_path = os.path.join(test_dir, f"{test_name}-vazao_barra_comparativo_por_rodada.svg")
+    chart = ChartSpec(png_path, svg_path, figsize=(8, 6))
+    chart.call("bar", x - width/2, client_values, width, yerr=client_err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label="Cliente")
+    chart.call("bar", x + width/2, server_values, width, yerr=server_err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label="Servidor")
 
     # Ajuste do topo para caber os rótulos
     y_max_cli = max((_safe(v) + _safe(e)) for v, e in zip(client_values, client_err_values)) if client_values else 0.0
@@ -993,38 +1034,32 @@ def plot_vazao_comparativo_por_rodada(test_dir, test_name, mostrar_intervalo_con
     y_max_total = max(y_max_cli, y_max_srv)
     top = (y_max_total * 1.08) if y_max_total > 0 else 1.0   # 8% de folga
     label_offset = 0.005 * top                               # distância do valor até o topo da barra
-    plt.ylim(bottom=0, top=top)
+    chart.call("set_ylim", bottom=0, top=top)
 
     # Rótulos acima das barras
-    for bar, raw_bps, err in zip(bars1, client_values_bps, client_err_values):
-        y = bar.get_height() + (_safe(err) if mostrar_intervalo_confianca else 0) + label_offset
-        plt.text(bar.get_x() + bar.get_width()/2, y,
-                 f"{format_value(raw_bps, fator):.2f}",
-                 ha='center', va='bottom')
-
-    for bar, raw_bps, err in zip(bars2, server_values_bps, server_err_values):
-        y = bar.get_height() + (_safe(err) if mostrar_intervalo_confianca else 0) + label_offset
-        plt.text(bar.get_x() + bar.get_width()/2, y,
-                 f"{format_value(raw_bps, fator):.2f}",
-                 ha='center', va='bottom')
+    for xi, v, raw_bps, err in zip(x - width/2, client_values, client_values_bps, client_err_values):
+        y = v + (_safe(err) if mostrar_intervalo_confianca else 0) + label_offset
+        chart.call("text", xi, y,
+                   f"{format_value(raw_bps, fator):.2f}",
+                   ha='center', va='bottom')
+
+    for xi, v, raw_bps, err in zip(x + width/2, server_values, server_values_bps, server_err_values):
+        y = v + (_safe(err) if mostrar_intervalo_confianca else 0) + label_offset
+        chart.call("text", xi, y,
+                   f"{format_value(raw_bps, fator):.2f}",
+                   ha='center', va='bottom')
 
     # Eixos e título
-    plt.ylabel(f"Vazão Média ({unidade})")
-    plt.xlabel("Rodada")
-    plt.title(f"{test_display_name} - Vazão média por rodada")
-    plt.xticks(x, rounds_sorted_numbers)
+    chart.call("set_ylabel", f"Vazão Média ({unidade})")
+    chart.call("set_xlabel", "Rodada")
+    chart.call("set_title", f"{test_display_name} - Vazão média por rodada")
+    chart.call("set_xticks", x, rounds_sorted_numbers)
 
-    plt.legend()
-    plt.tight_layout()
-
-    png_path = os.path.join(test_dir, f"{test_name}-vazao_barra_comparativo_por_rodada.png")
-    svg_path = os.path.join(test_dir, f"{test_name}-vazao_barra_comparativo_por_rodada.svg")
-    plt.savefig(png_path)
-    plt.savefig(svg_path)
-    plt.close()
+    chart.call("legend")
+    submit_chart(chart)
 
 def plot_vazao_comparativo_por_teste(resultados_dir, tests, vazao_aggregate, mostrar_intervalo_confianca=False):
-    prefix = "-".join(sorted(tests))
+    prefix = join_test_names(sorted(tests))
     tests_sorted = sorted(vazao_aggregate.keys())
     x = np.arange(len(tests_sorted))
 
@@ -1046,9 +1081,11 @@ def plot_vazao_comparativo_por_teste(resultados_dir, tests, vazao_aggregate, mos
     server_err    = [e / fator for e in server_err_bps]
 
     width = 0.35
-    plt.figure(figsize=(8,6))
-    bars1 = plt.bar(x - width/2, client_values, width, yerr=client_err if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label="Cliente")
-    bars2 = plt.bar(x + width/2, server_values, width, yerr=server_err if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label="Servidor")
+    png_path = os.path.join(resultados_dir, f"{prefix}-vazao_barra_comparativo_por_teste.png")
+    svg_path = os.path.join(resultados_dir, f"{prefix}-vazao_barra_comparativo_por_teste.svg")
+    chart = ChartSpec(png_path, svg_path, figsize=(8,6))
+    chart.call("bar", x - width/2, client_values, width, yerr=client_err if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label="Cliente")
+    chart.call("bar", x + width/2, server_values, width, yerr=server_err if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label="Servidor")
 
     # Ajuste para que o topo se ajuste à barra e o valor de amplitude no topo dela
     y_max_client = max((_safe(v) + _safe(e) for v, e in zip(client_values, client_err)), default=0.0)
@@ -1056,35 +1093,29 @@ def plot_vazao_comparativo_por_teste(resultados_dir, tests, vazao_aggregate, mos
     y_max_total  = max(y_max_client, y_max_server)
     top = (y_max_total * 1.08) if y_max_total > 0 else 1.0   # 8% de folga no topo
     label_offset = 0.005 * top                               # distância do valor até o topo da barra
-    plt.ylim(bottom=0, top=top)
+    chart.call("set_ylim", bottom=0, top=top)
 
     # Rótulos acima das barras (na mesma unidade do eixo)
-    for bar, raw_bps, err in zip(bars1, client_values_bps, client_err):
+    for xi, v, raw_bps, err in zip(x - width/2, client_values, client_values_bps, client_err):
         e = _safe(err)
-        y = bar.get_height() + (e if mostrar_intervalo_confianca else 0) + label_offset
-        plt.text(bar.get_x()+bar.get_width()/2, y,
-                 f"{format_value(raw_bps, fator):.2f}",
-                 ha='center', va='bottom')
+        y = v + (e if mostrar_intervalo_confianca else 0) + label_offset
+        chart.call("text", xi, y,
+                   f"{format_value(raw_bps, fator):.2f}",
+                   ha='center', va='bottom')
 
-    for bar, raw_bps, err in zip(bars2, server_values_bps, server_err):
+    for xi, v, raw_bps, err in zip(x + width/2, server_values, server_values_bps, server_err):
         e = _safe(err)
-        y = bar.get_height() + (e if mostrar_intervalo_confianca else 0) + label_offset
-        plt.text(bar.get_x()+bar.get_width()/2, y,
-                 f"{format_value(raw_bps, fator):.2f}",
-                 ha='center', va='bottom')
-
-    plt.ylabel(f"Vazão Média ({unidade})")
-    plt.xlabel("Teste")
-    plt.title("Vazão média por teste")
-    plt.xticks(x, [get_test_display_name_from_conf(os.path.join(os.path.dirname(resultados_dir), test)) for test in tests_sorted])
-    plt.legend()
-
-    png_path = os.path.join(resultados_dir, f"{prefix}-vazao_barra_comparativo_por_teste.png")
-    svg_path = os.path.join(resultados_dir, f"{prefix}-vazao_barra_comparativo_por_teste.svg")
-    plt.tight_layout()
-    plt.savefig(png_path)
-    plt.savefig(svg_path)
-    plt.close()
+        y = v + (e if mostrar_intervalo_confianca else 0) + label_offset
+        chart.call("text", xi, y,
+                   f"{format_value(raw_bps, fator):.2f}",
+                   ha='center', va='bottom')
+
+    chart.call("set_ylabel", f"Vazão Média ({unidade})")
+    chart.call("set_xlabel", "Teste")
+    chart.call("set_title", "Vazão média por teste")
+    chart.call("set_xticks", x, [get_test_display_name_from_conf(os.path.join(os.path.dirname(resultados_dir), test)) for test in tests_sorted])
+    chart.call("legend")
+    submit_chart(chart)
 
 def plot_vazao_servidor_comparativo(resultados_dir, tests, vazao_aggregate, mostrar_intervalo_confianca=False, mostrar_media=False, ordenar_barras=False, inverter_barras=False):
     # Mantém apenas testes presentes no agregado e na mesma ordem do parâmetro 'tests'
@@ -1125,16 +1156,19 @@ def plot_vazao_servidor_comparativo(resultados_dir, tests, vazao_aggregate, most
     label_offset = 0.005 * top                       # distância do valor até o topo da barra
 
     width = 0.5
-    plt.figure(figsize=(8,6))
-    ax = plt.gca()
-    bars = plt.bar(x, server_values, width, yerr=server_err if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label="Servidor")
+    prefix = join_test_names(tests_sorted)
+    png_path = os.path.join(resultados_dir, f"{prefix}-vazao_servidor_comparativo.png")
+    svg_path = os.path.join(resultados_dir, f"{prefix}-vazao_servidor_comparativo.svg")
+    chart = ChartSpec(png_path, svg_path, figsize=(8,6))
+    chart.call("bar", x, server_values, width, yerr=server_err if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label="Servidor")
 
     # Linha de média das barras
     if mostrar_media and len(server_values) > 0:
         # Extremos horizontais cobrindo todas as barras
         x_start = (x[0] - width/2) if len(x) > 0 else -0.5
         x_end   = (x[-1] + width/2) if len(x) > 0 else 0.5
-        ax.hlines(
+        chart.call(
+            "hlines",
             media_barras,
             x_start,
             x_end,
@@ -1144,7 +1178,8 @@ def plot_vazao_servidor_comparativo(resultados_dir, tests, vazao_aggregate, most
             label="Média"
         )
         # Rótulo do valor da média na escala do gráfico
-        plt.text(
+        chart.call(
+            "text",
             x_end + width * 0.3,
             media_barras,
             f"{format_value(media_bps, fator):.2f}",
@@ -1156,98 +1191,694 @@ def plot_vazao_servidor_comparativo(resultados_dir, tests, vazao_aggregate, most
         )
 
     # Rótulos acima das barras
-    for i, (bar, raw_bps) in enumerate(zip(bars, server_values_bps)):
+    for i, (xi, v, raw_bps) in enumerate(zip(x, server_values, server_values_bps)):
         e = _safe(server_err[i]) if i < len(server_err) else 0.0
-        y = bar.get_height() + (e if mostrar_intervalo_confianca else 0) + label_offset
-        plt.text(
-            bar.get_x() + bar.get_width()/2,
+        y = v + (e if mostrar_intervalo_confianca else 0) + label_offset
+        chart.call(
+            "text",
+            xi,
             y,
             f"{format_value(raw_bps, fator):.2f}",
             ha='center', va='bottom'
         )
 
-    plt.ylabel(f"Vazão média do servidor ({unidade})")
-    plt.xlabel("Teste")
-    plt.title("Vazão do servidor por teste")
-    plt.xticks(x, [get_test_display_name_from_conf(os.path.join(os.path.dirname(resultados_dir), test)) for test in tests_sorted])
-    plt.ylim(bottom=0, top=top)
-    plt.legend()
-
-    prefix = "-".join(tests_sorted)
-    png_path = os.path.join(resultados_dir, f"{prefix}-vazao_servidor_comparativo.png")
-    svg_path = os.path.join(resultados_dir, f"{prefix}-vazao_servidor_comparativo.svg")
-    plt.tight_layout()
-    plt.savefig(png_path)
-    plt.savefig(svg_path)
-    plt.close()
+    chart.call("set_ylabel", f"Vazão média do servidor ({unidade})")
+    chart.call("set_xlabel", "Teste")
+    chart.call("set_title", "Vazão do servidor por teste")
+    chart.call("set_xticks", x, [get_test_display_name_from_conf(os.path.join(os.path.dirname(resultados_dir), test)) for test in tests_sorted])
+    chart.call("set_ylim", bottom=0, top=top)
+    chart.call("legend")
+    submit_chart(chart)
 
 ########################################
 # FUNÇÕES AGREGADAS – SÉRIES TEMPORAIS #
 ########################################
-def aggregate_perda_temporal_for_test(test_dir, test_name):
-    rounds = get_round_dirs(test_dir)
-    dfs = []
+def aggregate_perda_temporal_for_test(dados):
+    series = []
     col = None
-    for rodada in rounds:
-        rodada_path = os.path.join(test_dir, rodada)
-        server_file = os.path.join(rodada_path, f"{rodada}-{test_name}-iperf3_server.csv")
-        client_file = os.path.join(rodada_path, f"{rodada}-{test_name}-iperf3_client.csv")
-
+    for r in dados.rounds:
         df = None
         # Prioridade: UDP servidor
-        if os.path.exists(server_file):
-            df_srv = pd.read_csv(server_file)
+        if r.server is not None:
+            df_srv = r.server
             if "porcentagem_pacotes_perdidos" in df_srv.columns:
                 df = df_srv
                 col = "porcentagem_pacotes_perdidos"
         # Se não, TCP cliente
-        if df is None and os.path.exists(client_file):
-            df_cli = pd.read_csv(client_file)
+        if df is None and r.client is not None:
+            df_cli = r.client
             if "retransmissoes" in df_cli.columns:
                 df = df_cli
                 col = "retransmissoes"
         if df is not None and col is not None:
-            df = df.reset_index(drop=True)
-            df['tempo'] = range(len(df))
-            dfs.append(df[['tempo', col]])
+            series.append((*sample_times(df), df[col].to_numpy(dtype=float)))
 
-    if not dfs:
+    if not series:
         return None, None
-    common_length = min(len(df) for df in dfs)
-    tempos = dfs[0]['tempo'].iloc[:common_length].values
-    values = np.mean([df[col].iloc[:common_length].values.astype(float) for df in dfs if col in df.columns], axis=0)
-    return tempos, values
+    serie = resample_rounds(series)
+    return serie.tempo, serie.media
 
-def aggregate_all_perda_temporal(resultados_dir, tests):
+def aggregate_all_perda_temporal(dados_testes, tests):
     agg = {}
     for test in tests:
-        test_dir = os.path.join(resultados_dir, test)
-        tempo, values = aggregate_perda_temporal_for_test(test_dir, test)
+        if test not in dados_testes:
+            continue
+        tempo, values = aggregate_perda_temporal_for_test(dados_testes[test])
         if tempo is not None:
             agg[test] = (tempo, values)
     return agg
 
 def plot_perda_temporal_comparativo_por_teste(resultados_dir, tests, perda_temporal_agg):
-    prefix = "-".join(sorted(tests))
+    prefix = join_test_names(sorted(tests))
     tests_sorted = sorted(perda_temporal_agg.keys())
-    plt.figure(figsize=(10,6))
+    png_path = os.path.join(resultados_dir, f"{prefix}-perda_temporal_comparativo.png")
+    svg_path = os.path.join(resultados_dir, f"{prefix}-perda_temporal_comparativo.svg")
+    chart = ChartSpec(png_path, svg_path, figsize=(10,6))
     for test in tests_sorted:
         # Obtém o diretório pai de resultados_dir
         test_dir = os.path.join(os.path.dirname(resultados_dir), test)
         test_display_name = get_test_display_name_from_conf(test_dir)
         tempo, perda = perda_temporal_agg[test]
-        plt.plot(tempo, perda, label=test_display_name)
-    plt.ylabel("Perda (%)")
-    plt.xlabel("Tempo (s)")
-    plt.title("Perda Temporal Comparativo por Teste")
-    plt.legend()
-    plt.ylim(bottom=0)
-    png_path = os.path.join(resultados_dir, f"{prefix}-perda_temporal_comparativo.png")
-    svg_path = os.path.join(resultados_dir, f"{prefix}-perda_temporal_comparativo.svg")
-    plt.tight_layout()
-    plt.savefig(png_path)
-    plt.savefig(svg_path)
-    plt.close()
+        _plot_temporal(chart, tempo, perda, label=test_display_name)
+    chart.call("set_ylabel", "Perda (%)")
+    chart.call("set_xlabel", "Tempo (s)")
+    chart.call("set_title", "Perda Temporal Comparativo por Teste")
+    chart.call("legend")
+    chart.call("set_ylim", bottom=0)
+    submit_chart(chart)
+
+##########################################
+# REGIME PERMANENTE (FIM DO AQUECIMENTO) #
+##########################################
+def steady_state_for_test(dados):
+    """
+    Início do regime permanente (s) de cada rodada: o gravado na conversão
+    (rodada_N-<teste>-regime.ini) ou, em resultados convertidos antes dele,
+    o detectado aqui com a mesma regra. Retorna {rodada: (início, origem)}.
+    """
+    cortes = {}
+    for r in dados.rounds:
+        if r.steady_start is not None:
+            cortes[r.name] = (r.steady_start, "conversão")
+            continue
+        detectado = detect_round_warmup(r)
+        if detectado is not None:
+            cortes[r.name] = (detectado[1], "sumarizador")
+    return cortes
+
+def plot_regime_for_test(dados, cortes):
+    """
+    Vazão do servidor (ou do cliente) de cada rodada ao longo de toda a
+    medição, com uma linha vertical no início do regime permanente detectado.
+    """
+    test_dir, test_name = dados.path, dados.name
+    png_path = os.path.join(test_dir, f"{test_name}-regime_permanente.png")
+    svg_path = os.path.join(test_dir, f"{test_name}-regime_permanente.svg")
+    chart = ChartSpec(png_path, svg_path, figsize=(10,6))
+    desenhadas = 0
+    for r in dados.rounds:
+        df = next((d for d in (r.server, r.client) if d is not None and "bits_por_segundo" in d.columns and len(d) > 0), None)
+        if df is None or r.name not in cortes:
+            continue
+        cor = f"C{desenhadas % 10}"
+        inicio, _ = sample_times(df)
+        _plot_temporal(chart, inicio, (df["bits_por_segundo"] / 1e6).to_numpy(), color=cor, label=format_label(r.name))
+        chart.call("axvline", cortes[r.name][0], color=cor, linestyle="--", alpha=0.7)
+        desenhadas += 1
+    if not desenhadas:
+        return
+    chart.call("set_ylabel", "Vazão (Mbps)")
+    chart.call("set_xlabel", "Tempo (s)")
+    chart.call("set_title", f"{dados.display_name} - Fim do Aquecimento (linhas tracejadas)")
+    chart.call("legend", ncol=2, fontsize="small")
+    chart.call("set_ylim", bottom=0)
+    submit_chart(chart)
+
+def apply_steady_state(dados):
+    """
+    Marca o fim do aquecimento de cada rodada no gráfico do teste e descarta,
+    em todas as séries da rodada (vazão, perda, CPU e fluxos), as amostras
+    anteriores a ele. Retorna o início de cada rodada e a média entre rodadas
+    (com IC de 95%), ou None se nenhuma rodada tiver dados de vazão.
+    """
+    cortes = steady_state_for_test(dados)
+    if not cortes:
+        return None
+    plot_regime_for_test(dados, cortes)
+    for r in dados.rounds:
+        if r.name in cortes:
+            drop_warmup(r, cortes[r.name][0])
+    inicios = [inicio for inicio, _ in cortes.values()]
+    rodadas = [(r.number, *cortes[r.name]) for r in dados.rounds if r.name in cortes]
+    return {"rodadas": rodadas, "inicio": (float(np.mean(inicios)), half_width(inicios))}
+
+################################
+# FLUXOS PARALELOS (IPERF3 -P) #
+################################
+def jain_index(valores):
+    """
+    Índice de justiça de Jain: (Σx)² / (n·Σx²). Vale 1 quando todos os fluxos
+    têm a mesma vazão e 1/n quando um único fluxo ocupa todo o enlace.
+    """
+    x = np.asarray(valores, dtype=float)
+    soma_quadrados = float(np.sum(x * x))
+    if len(x) == 0 or soma_quadrados == 0:
+        return float("nan")
+    return float(np.sum(x)) ** 2 / (len(x) * soma_quadrados)
+
+def stream_round_stats(r):
+    """
+    Vazão média de cada fluxo paralelo de uma rodada (com IC de 95% entre os
+    intervalos), índice de Jain e dispersão entre fluxos ((máx - mín) / média,
+    em %). Retorna None se a rodada não tiver o CSV por fluxo ou tiver um
+    único fluxo.
+    """
+    df = r.streams
+    if df is None or len(df) == 0 or "fluxo" not in df.columns or "bits_por_segundo" not in df.columns:
+        return None
+    # Matriz (intervalos × fluxos), com NaN nos intervalos em que o fluxo não aparece
+    por_intervalo = df.groupby(["intervalo", "fluxo"], sort=True)["bits_por_segundo"].mean().unstack("fluxo")
+    if por_intervalo.shape[1] < 2:
+        return None
+    matriz = por_intervalo.to_numpy(dtype=float)
+    valores = np.nanmean(matriz, axis=0)
+    media = float(valores.mean())
+    dispersao = 100.0 * (valores.max() - valores.min()) / media if media > 0 else 0.0
+    return {
+        "fluxos": [int(f) for f in por_intervalo.columns],
+        "medias_bps": valores,
+        "erros_bps": half_width(matriz, bootstrap=False),
+        "jain": jain_index(valores),
+        "dispersao": float(dispersao),
+    }
+
+def plot_fluxos_temporal_for_round(dados):
+    """Gráfico temporal com a vazão de cada fluxo paralelo, um por rodada."""
+    test_name = dados.name
+    test_display_name = dados.display_name
+    for r in dados.rounds:
+        df = r.streams
+        if df is None or len(df) == 0 or df["fluxo"].nunique() < 2:
+            continue
+        png_path = os.path.join(r.path, f"{r.name}-{test_name}-fluxos_temporal.png")
+        svg_path = os.path.join(r.path, f"{r.name}-{test_name}-fluxos_temporal.svg")
+        chart = ChartSpec(png_path, svg_path, figsize=(10,6))
+        # Cada linha dos fluxos é desenhada no início do intervalo correspondente do cliente
+        inicio = sample_times(r.client)[0] if r.client is not None else np.zeros(0)
+        for fluxo, df_fluxo in df.groupby("fluxo", sort=True):
+            intervalo = df_fluxo["intervalo"].to_numpy(dtype=np.int64)
+            tempo = inicio[intervalo] if len(intervalo) and 0 <= intervalo.min() and intervalo.max() < len(inicio) else intervalo.astype(float)
+            _plot_temporal(chart, tempo, (df_fluxo["bits_por_segundo"] / 1e6).to_numpy(), label=f"Fluxo {int(fluxo)}")
+        chart.call("set_ylabel", "Vazão (Mbps)")
+        chart.call("set_xlabel", "Tempo (s)")
+        chart.call("set_title", f"Vazão por Fluxo - {format_label(r.name)} - {test_display_name}")
+        chart.call("legend", ncol=2, fontsize="small")
+        chart.call("set_ylim", bottom=0)
+        submit_chart(chart)
+
+def plot_fluxos_barra_for_test(dados, mostrar_intervalo_confianca=False):
+    """
+    Gráfico de barras agrupadas com a vazão média de cada fluxo em cada
+    rodada (com -i, e o IC de 95% entre os intervalos da rodada), com o
+    índice de Jain da rodada sobre cada grupo. Retorna as
+    estatísticas por rodada e as médias (com IC de 95%) do índice de Jain e da
+    dispersão entre fluxos, ou None se o teste não tiver fluxos paralelos.
+    """
+    test_dir, test_name = dados.path, dados.name
+    test_display_name = dados.display_name
+
+    rodadas = []
+    for r in dados.rounds:
+        stats = stream_round_stats(r)
+        if stats is not None:
+            rodadas.append((r, stats))
+    if not rodadas:
+        return None
+
+    # Topo de cada grupo de barras (com o IC, quando desenhado), usado na escala e no rótulo do índice de Jain
+    topos_bps = [float((stats["medias_bps"] + (stats["erros_bps"] if mostrar_intervalo_confianca else 0.0)).max()) for _, stats in rodadas]
+    max_bps = max(topos_bps)
+    unidade, fator = choose_bps_scale(max_bps if max_bps > 0 else 1.0)
+    n_fluxos = max(len(stats["fluxos"]) for _, stats in rodadas)
+    width = 0.8 / n_fluxos
+    x = np.arange(len(rodadas))
+    top = (max_bps / fator) * 1.15 if max_bps > 0 else 1.0
+
+    png_path = os.path.join(test_dir, f"{test_name}-fluxos_barra.png")
+    svg_path = os.path.join(test_dir, f"{test_name}-fluxos_barra.svg")
+    chart = ChartSpec(png_path, svg_path, figsize=(10,6))
+    for j in range(n_fluxos):
+        offset = (j - (n_fluxos - 1) / 2) * width
+        valores = [stats["medias_bps"][j] / fator if j < len(stats["medias_bps"]) else 0.0 for _, stats in rodadas]
+        erros = [stats["erros_bps"][j] / fator if j < len(stats["erros_bps"]) else 0.0 for _, stats in rodadas]
+        chart.call("bar", x + offset, valores, width, yerr=erros if mostrar_intervalo_confianca else None, capsize=3 if mostrar_intervalo_confianca else 0, label=f"Fluxo {j + 1}")
+    for xi, (_, stats), topo_bps in zip(x, rodadas, topos_bps):
+        chart.call("text", xi, topo_bps / fator + 0.02 * top, f"J = {stats['jain']:.3f}", ha='center', va='bottom')
+    chart.call("set_ylabel", f"Vazão Média ({unidade})")
+    chart.call("set_xlabel", "Rodada")
+    chart.call("set_title", f"{test_display_name} - Vazão por Fluxo")
+    chart.call("set_xticks", x, [str(r.number) for r, _ in rodadas])
+    chart.call("set_ylim", bottom=0, top=top)
+    if n_fluxos <= 16:
+        chart.call("legend", ncol=4, fontsize="small")
+    submit_chart(chart)
+
+    jains = [stats["jain"] for _, stats in rodadas]
+    dispersoes = [stats["dispersao"] for _, stats in rodadas]
+    err_jain, err_disp = (float(e) for e in half_width(np.column_stack([jains, dispersoes])))
+    return {
+        "rodadas": [(r.number, stats) for r, stats in rodadas],
+        "n_fluxos": n_fluxos,
+        "jain": (float(np.mean(jains)), err_jain),
+        "dispersao": (float(np.mean(dispersoes)), err_disp),
+    }
+
+def plot_fluxos_jain_comparativo_por_teste(resultados_dir, tests, fluxos_aggregate, mostrar_intervalo_confianca=False):
+    tests_sorted = sorted([test for test in tests if fluxos_aggregate.get(test)])
+    if not tests_sorted:
+        return
+    prefix = join_test_names(sorted(tests))
+    valores = [fluxos_aggregate[test]["jain"][0] for test in tests_sorted]
+    erros = [fluxos_aggregate[test]["jain"][1] for test in tests_sorted]
+    x = np.arange(len(tests_sorted))
+    png_path = os.path.join(resultados_dir, f"{prefix}-fluxos_jain_comparativo.png")
+    svg_path = os.path.join(resultados_dir, f"{prefix}-fluxos_jain_comparativo.svg")
+    chart = ChartSpec(png_path, svg_path, figsize=(10,6))
+    chart.call("bar", x, valores, 0.5, yerr=erros if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0)
+    for xi, v in zip(x, valores):
+        chart.call("text", xi, v + 0.01, f"{v:.3f}", ha='center', va='bottom')
+    chart.call("set_ylabel", "Índice de Jain")
+    chart.call("set_xlabel", "Teste")
+    chart.call("set_title", "Justiça entre Fluxos Paralelos por Teste")
+    chart.call("set_xticks", x, [get_test_display_name_from_conf(os.path.join(os.path.dirname(resultados_dir), test)) for test in tests_sorted])
+    chart.call("set_ylim", bottom=0, top=1.1)
+    submit_chart(chart)
+
+#########################
+# DADOS INTERNOS DO TCP #
+#########################
+def _mean_or_nan(df, col, escala=1.0):
+    if col not in df.columns:
+        return float("nan")
+    valores = df[col].dropna()
+    return float(valores.mean()) / escala if len(valores) > 0 else float("nan")
+
+def tcp_round_stats(r):
+    """
+    Retransmissões normalizadas (por GB transferido e por segundo) e médias de
+    RTT, rttvar (ms), snd_cwnd e snd_wnd (KiB) do cliente em uma rodada TCP.
+    Retorna None para rodadas UDP. Campos ausentes no CSV ficam como NaN.
+    """
+    df = r.client
+    if df is None or len(df) == 0 or "retransmissoes" not in df.columns:
+        return None
+    retransmissoes = float(df["retransmissoes"].sum())
+    gb = float(df["bytes_transferidos"].sum()) / 1e9 if "bytes_transferidos" in df.columns else 0.0
+    # Sem a coluna 'segundos' (CSVs antigos), assume intervalos de 1 s (-i 1)
+    segundos = float(df["segundos"].sum()) if "segundos" in df.columns and df["segundos"].notna().all() else float(len(df))
+    return {
+        "retrans_gb": retransmissoes / gb if gb > 0 else float("nan"),
+        "retrans_s": retransmissoes / segundos if segundos > 0 else float("nan"),
+        "rtt_ms": _mean_or_nan(df, "rtt", 1000.0),
+        "rttvar_ms": _mean_or_nan(df, "rttvar", 1000.0),
+        "cwnd_kib": _mean_or_nan(df, "snd_cwnd", 1024.0),
+        "wnd_kib": _mean_or_nan(df, "snd_wnd", 1024.0),
+    }
+
+# Métricas TCP, na ordem das colunas do Markdown: (chave, cabeçalho, casas decimais)
+METRICAS_TCP = [
+    ("retrans_gb", "Retrans./GB", 2),
+    ("retrans_s", "Retrans./s", 2),
+    ("rtt_ms", "RTT (ms)", 3),
+    ("cwnd_kib", "cwnd (KiB)", 1),
+    ("wnd_kib", "snd_wnd (KiB)", 1),
+]
+
+def tcp_stats_for_test(dados):
+    """
+    Estatísticas TCP de cada rodada e a média das rodadas (com IC de 95%) de
+    cada métrica. Retorna None se o teste não tiver rodadas TCP.
+    """
+    rodadas = []
+    for r in dados.rounds:
+        stats = tcp_round_stats(r)
+        if stats is not None:
+            rodadas.append((r.number, stats))
+    if not rodadas:
+        return None
+    resultado = {"rodadas": rodadas}
+    # Todas as métricas de uma só vez (rodadas × métricas, NaN onde a rodada não tem o dado)
+    chaves = list(rodadas[0][1])
+    matriz = np.array([[stats[chave] for chave in chaves] for _, stats in rodadas], dtype=float)
+    for j, (chave, err) in enumerate(zip(chaves, half_width(matriz))):
+        valores = matriz[:, j][~np.isnan(matriz[:, j])]
+        resultado[chave] = (float(np.mean(valores)), float(err)) if len(valores) else (float("nan"), 0.0)
+    return resultado
+
+def plot_tcp_temporal_for_test(dados, mostrar_intervalo_confianca=False):
+    """
+    Vazão, RTT e janelas (snd_cwnd e snd_wnd) do cliente ao longo do tempo,
+    na média das rodadas, em três painéis com o mesmo eixo de tempo. Com cwnd
+    próxima de snd_wnd, a vazão está limitada pela janela do receptor (-w);
+    com cwnd abaixo dela, pelo controle de congestionamento.
+    """
+    test_dir, test_name = dados.path, dados.name
+    test_display_name = dados.display_name
+    dfs = [r.client for r in dados.rounds
+           if r.client is not None and len(r.client) > 0 and "rtt" in r.client.columns and r.client["rtt"].notna().any()]
+    if not dfs:
+        return
+    # (coluna, escala, painel, rótulo, estilo)
+    curvas = [
+        ("bits_por_segundo", 1e6, 0, "Vazão", "-"),
+        ("rtt", 1000.0, 1, "RTT", "-"),
+        ("rttvar", 1000.0, 1, "rttvar", "--"),
+        ("snd_cwnd", 1024.0, 2, "snd_cwnd", "-"),
+        ("snd_wnd", 1024.0, 2, "snd_wnd", "--"),
+    ]
+    colunas = [c for c, *_ in curvas]
+    serie = resample_rounds([(*sample_times(df), df.reindex(columns=colunas).to_numpy(dtype=float)) for df in dfs])
+
+    png_path = os.path.join(test_dir, f"{test_name}-tcp_temporal.png")
+    svg_path = os.path.join(test_dir, f"{test_name}-tcp_temporal.svg")
+    chart = ChartSpec(png_path, svg_path, figsize=(10,9), nrows=3)
+    for j, (col, escala, painel, rotulo, estilo) in enumerate(curvas):
+        if serie.contagem[:, j].any():
+            _plot_media_temporal(chart, serie.tempo, serie.media[:, j] / escala, serie.meia_largura[:, j] / escala,
+                                 mostrar_intervalo_confianca, painel=painel, label=rotulo, linestyle=estilo)
+    chart.call_at(0, "set_ylabel", "Vazão (Mbps)")
+    chart.call_at(0, "set_ylim", bottom=0)
+    chart.call_at(0, "set_title", f"{test_display_name} - Vazão, RTT e Janelas TCP")
+    chart.call_at(1, "set_ylabel", "RTT (ms)")
+    chart.call_at(1, "set_ylim", bottom=0)
+    chart.call_at(1, "legend")
+    chart.call_at(2, "set_ylabel", "Janela (KiB)")
+    chart.call_at(2, "set_xlabel", "Tempo (s)")
+    chart.call_at(2, "set_ylim", bottom=0)
+    chart.call_at(2, "legend")
+    submit_chart(chart)
+
+###############################################
+# DISTRIBUIÇÃO DAS AMOSTRAS (PERCENTIS E CDF) #
+###############################################
+# Métricas da distribuição, na ordem do Markdown: (chave, título, casas decimais)
+METRICAS_DISTRIBUICAO = [
+    ("vazao_cliente", "Vazão do cliente", 2),
+    ("vazao_servidor", "Vazão do servidor", 2),
+    ("perda", "Perda", 4),
+    ("jitter", "Jitter (ms)", 4),
+]
+TITULOS_ESTATISTICAS = {"min": "Mín", "p1": "P1", "p5": "P5", "p50": "P50", "p95": "P95", "p99": "P99", "cv": "CV (%)"}
+
+def _distribution_samples(r):
+    """Amostras de cada métrica da distribuição em uma rodada: {chave: (valores, unidade)}."""
+    amostras = {}
+    for chave, df in (("vazao_cliente", r.client), ("vazao_servidor", r.server)):
+        if df is not None and "bits_por_segundo" in df.columns and len(df) > 0:
+            amostras[chave] = (df["bits_por_segundo"].to_numpy(dtype=float), "bps")
+    df, col, unidade = _loss_column(r)
+    if col and len(df) > 0:
+        amostras["perda"] = (df[col].to_numpy(dtype=float), unidade)
+    if r.server is not None and "jitter" in r.server.columns and len(r.server) > 0:
+        amostras["jitter"] = (r.server["jitter"].to_numpy(dtype=float), "ms")
+    return amostras
+
+def distribution_stats_for_test(dados):
+    """
+    Distribuição das amostras de cada métrica (veja distribution.py): por
+    rodada e de todas as rodadas juntas, com a CDF destas. Retorna {chave:
+    {"unidade", "rodadas": [(número, estatísticas)], "teste": estatísticas,
+    "cdf": (valores, probabilidades)}}, só com as métricas presentes.
+    """
+    coletadas = {}
+    for r in dados.rounds:
+        for chave, (valores, unidade) in _distribution_samples(r).items():
+            numeros, series, _ = coletadas.setdefault(chave, ([], [], unidade))
+            numeros.append(r.number)
+            series.append(valores)
+    distribuicao = {}
+    for chave, (numeros, series, unidade) in coletadas.items():
+        por_rodada = distribution_stats(series)
+        teste, cdf = pooled_distribution(series)
+        distribuicao[chave] = {
+            "unidade": unidade,
+            "rodadas": [(n, {e: float(por_rodada[e][i]) for e in ESTATISTICAS}) for i, n in enumerate(numeros)],
+            "teste": teste,
+            "cdf": cdf,
+        }
+    return distribuicao
+
+def _distribution_title(chave, unidade, unidade_vazao=None):
+    """Título de uma métrica da distribuição, com a unidade."""
+    if chave == "perda":
+        return "Perda (%)" if unidade == "%" else "Retransmissões"
+    titulo = dict((c, t) for c, t, _ in METRICAS_DISTRIBUICAO)[chave]
+    return f"{titulo} ({unidade_vazao})" if unidade_vazao else titulo
+
+# Gráficos de CDF de cada teste: (nome do arquivo, métricas, escala)
+GRAFICOS_CDF = [("vazao", ("vazao_cliente", "vazao_servidor"), 1e6), ("perda", ("perda",), 1.0), ("jitter", ("jitter",), 1.0)]
+ROTULOS_CDF = {"vazao_cliente": "Cliente", "vazao_servidor": "Servidor"}
+
+def plot_cdf_for_test(dados, distribuicao):
+    """CDF das amostras de vazão (cliente e servidor), perda e jitter do teste, com todas as rodadas juntas."""
+    test_dir, test_name = dados.path, dados.name
+    for nome, chaves, escala in GRAFICOS_CDF:
+        chaves = [c for c in chaves if c in distribuicao]
+        if not chaves:
+            continue
+        png_path = os.path.join(test_dir, f"{test_name}-cdf_{nome}.png")
+        svg_path = os.path.join(test_dir, f"{test_name}-cdf_{nome}.svg")
+        chart = ChartSpec(png_path, svg_path, figsize=(8,6))
+        for chave in chaves:
+            valores, probabilidades = distribuicao[chave]["cdf"]
+            chart.call("plot", valores / escala, probabilidades, label=ROTULOS_CDF.get(chave))
+        if nome == "vazao":
+            chart.call("set_xlabel", "Vazão (Mbps)")
+            chart.call("legend")
+        else:
+            chart.call("set_xlabel", _distribution_title(chaves[0], distribuicao[chaves[0]]["unidade"]))
+        chart.call("set_ylabel", "Probabilidade acumulada")
+        chart.call("set_title", f"{dados.display_name} - CDF das Amostras (Todas as Rodadas)")
+        chart.call("set_ylim", 0, 1)
+        chart.call("grid", alpha=0.3)
+        submit_chart(chart)
+
+def plot_cdf_comparativo_por_teste(resultados_dir, tests, distribuicao_aggregate, dados_testes):
+    """CDF de cada teste, sobrepostas, em um gráfico por métrica da distribuição."""
+    prefix = join_test_names(sorted(tests))
+    for chave, _, _ in METRICAS_DISTRIBUICAO:
+        escala = 1e6 if chave.startswith("vazao") else 1.0
+        testes = [t for t in tests if chave in distribuicao_aggregate.get(t, {})]
+        if not testes:
+            continue
+        png_path = os.path.join(resultados_dir, f"{prefix}-cdf_{chave}_comparativo.png")
+        svg_path = os.path.join(resultados_dir, f"{prefix}-cdf_{chave}_comparativo.svg")
+        chart = ChartSpec(png_path, svg_path, figsize=(10,6))
+        for t in testes:
+            valores, probabilidades = distribuicao_aggregate[t][chave]["cdf"]
+            chart.call("plot", valores / escala, probabilidades, label=dados_testes[t].display_name)
+        unidade = distribuicao_aggregate[testes[0]][chave]["unidade"]
+        chart.call("set_xlabel", _distribution_title(chave, unidade, "Mbps" if chave.startswith("vazao") else None))
+        chart.call("set_ylabel", "Probabilidade acumulada")
+        chart.call("set_title", "CDF das Amostras por Teste")
+        chart.call("legend")
+        chart.call("set_ylim", 0, 1)
+        chart.call("grid", alpha=0.3)
+        submit_chart(chart)
+
+#####################
+# EFICIÊNCIA DE CPU #
+#####################
+# Ocupação mínima (em núcleos) para que um segundo entre no cálculo da eficiência
+OCUPACAO_MINIMA = 0.01
+
+def _core_number(col):
+    m = re.search(r'\d+', col)
+    return m.group() if m else col
+
+def efficiency_round_stats(r, nucleos=None, frequencia_hz=None):
+    """
+    Eficiência de CPU de uma rodada: a vazão do servidor (ou do cliente, se
+    não houver) e a soma do uso dos núcleos selecionados são juntadas segundo
+    a segundo na grade comum, e cada segundo fornece Gbps por núcleo ocupado
+    (e bits por ciclo, se a frequência for informada). Retorna a média e o IC
+    de 95% de cada métrica, ou None se faltarem dados.
+    """
+    df_vazao = r.server if r.server is not None and "bits_por_segundo" in r.server.columns else r.client
+    if df_vazao is None or "bits_por_segundo" not in df_vazao.columns or r.mpstat is None:
+        return None
+    colunas = [c for c in r.mpstat.columns if not nucleos or _core_number(c) in nucleos]
+    if not colunas:
+        return None
+    ocupados = r.mpstat[colunas].to_numpy(dtype=float).sum(axis=1) / 100.0
+    _, juntos = join_series([
+        (*sample_times(df_vazao), df_vazao["bits_por_segundo"].to_numpy(dtype=float)),
+        (*_mpstat_times(r), ocupados),
+    ])
+    juntos = juntos[juntos[:, 1] >= OCUPACAO_MINIMA]
+    if len(juntos) == 0:
+        return None
+
+    def media_ic(valores):
+        return (float(np.mean(valores)), half_width(valores, bootstrap=False))
+
+    stats = {"gbps_nucleo": media_ic(juntos[:, 0] / 1e9 / juntos[:, 1]), "segundos": len(juntos)}
+    if frequencia_hz:
+        stats["bits_ciclo"] = media_ic(juntos[:, 0] / (juntos[:, 1] * frequencia_hz))
+    return stats
+
+def plot_eficiencia_barra_for_test(dados, nucleos=None, frequencia_hz=None, mostrar_intervalo_confianca=False):
+    """
+    Gráfico de barras com a eficiência (Gbps por núcleo ocupado) de cada
+    rodada. Retorna as estatísticas por rodada e a média das rodadas (com IC
+    de 95%) de cada métrica, ou None se nenhuma rodada tiver dados.
+    """
+    test_dir, test_name = dados.path, dados.name
+    test_display_name = dados.display_name
+    rodadas = []
+    for r in dados.rounds:
+        stats = efficiency_round_stats(r, nucleos, frequencia_hz)
+        if stats is not None:
+            rodadas.append((r.number, stats))
+    if not rodadas:
+        return None
+
+    resultado = {"rodadas": rodadas, "nucleos": nucleos}
+    chaves = [chave for chave in ("gbps_nucleo", "bits_ciclo") if chave in rodadas[0][1]]
+    medias = np.array([[stats[chave][0] for chave in chaves] for _, stats in rodadas])
+    for j, (chave, err) in enumerate(zip(chaves, half_width(medias))):
+        resultado[chave] = (float(np.mean(medias[:, j])), float(err))
+
+    valores = [stats["gbps_nucleo"][0] for _, stats in rodadas]
+    erros = [stats["gbps_nucleo"][1] for _, stats in rodadas]
+    x = np.arange(len(rodadas))
+    y_max = max(v + (e if mostrar_intervalo_confianca else 0) for v, e in zip(valores, erros))
+    top = (y_max * 1.08) if y_max > 0 else 1.0
+    texto_nucleos = ", ".join(nucleos) if nucleos else "todos"
+    png_path = os.path.join(test_dir, f"{test_name}-eficiencia_cpu_barra.png")
+    svg_path = os.path.join(test_dir, f"{test_name}-eficiencia_cpu_barra.svg")
+    chart = ChartSpec(png_path, svg_path, figsize=(8,6))
+    chart.call("bar", x, valores, 0.5, yerr=erros if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0)
+    for xi, v, e in zip(x, valores, erros):
+        chart.call("text", xi, v + (e if mostrar_intervalo_confianca else 0) + 0.005 * top, f"{v:.3f}", ha='center', va='bottom')
+    chart.call("set_ylabel", "Gbps por núcleo ocupado")
+    chart.call("set_xlabel", "Rodada")
+    chart.call("set_title", f"{test_display_name} - Eficiência de CPU (núcleos: {texto_nucleos})")
+    chart.call("set_xticks", x, [str(numero) for numero, _ in rodadas])
+    chart.call("set_ylim", bottom=0, top=top)
+    submit_chart(chart)
+    return resultado
+
+def plot_eficiencia_comparativo_por_teste(resultados_dir, tests, eficiencia_aggregate, mostrar_intervalo_confianca=False):
+    tests_sorted = sorted([test for test in tests if eficiencia_aggregate.get(test)])
+    if not tests_sorted:
+        return
+    prefix = join_test_names(sorted(tests))
+    valores = [eficiencia_aggregate[test]["gbps_nucleo"][0] for test in tests_sorted]
+    erros = [eficiencia_aggregate[test]["gbps_nucleo"][1] for test in tests_sorted]
+    x = np.arange(len(tests_sorted))
+    y_max = max(v + (e if mostrar_intervalo_confianca else 0) for v, e in zip(valores, erros))
+    top = (y_max * 1.08) if y_max > 0 else 1.0
+    png_path = os.path.join(resultados_dir, f"{prefix}-eficiencia_cpu_comparativo.png")
+    svg_path = os.path.join(resultados_dir, f"{prefix}-eficiencia_cpu_comparativo.svg")
+    chart = ChartSpec(png_path, svg_path, figsize=(10,6))
+    chart.call("bar", x, valores, 0.5, yerr=erros if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0)
+    for xi, v, e in zip(x, valores, erros):
+        chart.call("text", xi, v + (e if mostrar_intervalo_confianca else 0) + 0.005 * top, f"{v:.3f}", ha='center', va='bottom')
+    chart.call("set_ylabel", "Gbps por núcleo ocupado")
+    chart.call("set_xlabel", "Teste")
+    chart.call("set_title", "Eficiência de CPU por Teste")
+    chart.call("set_xticks", x, [get_test_display_name_from_conf(os.path.join(os.path.dirname(resultados_dir), test)) for test in tests_sorted])
+    chart.call("set_ylim", bottom=0, top=top)
+    submit_chart(chart)
+
+############################################
+# COMPARAÇÕES ENTRE TESTES (SIGNIFICÂNCIA) #
+############################################
+# Métricas comparadas entre os testes: chave, título, unidade e escala
+METRICAS_COMPARACAO = [
+    ("vazao", "Vazão", "Gbps", 1e9),
+    ("perda", "Perda (%) / Retransmissões", "", 1.0),
+    ("cpu", "Uso de CPU (soma dos núcleos)", "%", 1.0),
+]
+
+NOMES_CORRECAO = {"holm": "Holm", "bh": "Benjamini-Hochberg"}
+
+def round_means_for_test(dados, nucleos=None):
+    """
+    Média de cada rodada, para cada métrica de METRICAS_COMPARACAO (NaN onde a
+    rodada não tem o dado): vazão do servidor (ou do cliente), perda do
+    servidor UDP (ou retransmissões do cliente TCP) e a soma do uso dos
+    núcleos selecionados.
+    """
+    medias = {chave: [] for chave, *_ in METRICAS_COMPARACAO}
+    for r in dados.rounds:
+        df_vazao = next((d for d in (r.server, r.client) if d is not None and "bits_por_segundo" in d.columns and len(d) > 0), None)
+        medias["vazao"].append(float(df_vazao["bits_por_segundo"].mean()) if df_vazao is not None else np.nan)
+
+        if r.server is not None and "porcentagem_pacotes_perdidos" in r.server.columns:
+            medias["perda"].append(float(r.server["porcentagem_pacotes_perdidos"].mean()))
+        elif r.client is not None and "retransmissoes" in r.client.columns:
+            medias["perda"].append(float(r.client["retransmissoes"].mean()))
+        else:
+            medias["perda"].append(np.nan)
+
+        colunas = [c for c in r.mpstat.columns if not nucleos or _core_number(c) in nucleos] if r.mpstat is not None else []
+        medias["cpu"].append(float(r.mpstat[colunas].mean().sum()) if colunas else np.nan)
+    return {chave: np.array(valores, dtype=float) for chave, valores in medias.items()}
+
+def compare_all_tests(tests, medias_rodadas, correcao=CORRECAO_PADRAO):
+    """
+    Compara todos os pares de testes em cada métrica (veja significance.py).
+    Retorna {métrica: (testes, ComparacaoPareada)}, considerando só os testes
+    com ao menos duas rodadas com a métrica, e omite as métricas com menos de
+    dois testes.
+    """
+    comparacoes = {}
+    for chave, *_ in METRICAS_COMPARACAO:
+        testes = [t for t in tests if t in medias_rodadas and np.count_nonzero(~np.isnan(medias_rodadas[t][chave])) > 1]
+        if len(testes) < 2:
+            continue
+        amostras = np.full((len(testes), max(len(medias_rodadas[t][chave]) for t in testes)), np.nan)
+        for i, t in enumerate(testes):
+            amostras[i, :len(medias_rodadas[t][chave])] = medias_rodadas[t][chave]
+        comparacoes[chave] = (testes, compare_tests(amostras, correcao))
+    return comparacoes
+
+def _relative_difference(comp):
+    """Diferença da média da linha para a da coluna, em % da média da coluna."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relativa = 100.0 * comp.diferenca / np.abs(comp.media[None, :])
+    return np.where(np.isfinite(relativa), relativa, np.nan)
+
+def plot_significancia_heatmap(resultados_dir, tests, comparacoes, dados_testes, correcao=CORRECAO_PADRAO):
+    """
+    Mapa de calor, por métrica, com a diferença relativa entre cada par de
+    testes (linha em relação à coluna) e um asterisco nos pares com diferença
+    significativa pelo teste de Welch, após a correção para comparações
+    múltiplas.
+    """
+    prefix = join_test_names(sorted(tests))
+    for chave, titulo, _, _ in METRICAS_COMPARACAO:
+        if chave not in comparacoes:
+            continue
+        testes, comp = comparacoes[chave]
+        n = len(testes)
+        relativa = _relative_difference(comp)
+        limite = float(np.nanmax(np.abs(relativa))) if np.isfinite(relativa).any() else 0.0
+        limite = limite if limite > 0 else 1.0
+        rotulos = [dados_testes[t].display_name for t in testes]
+        png_path = os.path.join(resultados_dir, f"{prefix}-significancia_{chave}.png")
+        svg_path = os.path.join(resultados_dir, f"{prefix}-significancia_{chave}.svg")
+        chart = ChartSpec(png_path, svg_path, figsize=(max(7, 0.35 * n + 4), max(6, 0.35 * n + 3)))
+        chart.call("imshow", np.nan_to_num(relativa), cmap="RdBu_r", vmin=-limite, vmax=limite)
+        chart.call("colorbar", label="Diferença da linha para a coluna (%)")
+        for i, j in np.argwhere(comp.p_welch < ALFA):
+            chart.call("text", j, i, "*", ha="center", va="center")
+        chart.call("set_xticks", np.arange(n), rotulos, rotation=90)
+        chart.call("set_yticks", np.arange(n), rotulos)
+        chart.call("set_title", f"{titulo} - Comparação entre Testes\n(* p < {ALFA} no teste de Welch, correção de {NOMES_CORRECAO[correcao]})")
+        submit_chart(chart)
 
 ###########################################################
 # GRÁFICO COMPARATIVO DE VAZÃO DO SERVIDOR COM REFERÊNCIA #
@@ -1270,30 +1901,149 @@ def plot_vazao_com_referencia(resultados_dir, tests, vazao_aggregate, ref_srv, r
 
     x = np.arange(n_tests)
     width = 0.35
-    plt.figure(figsize=(10,6))
-    bars1 = plt.bar(x - width/2, ref_values, width, yerr=ref_errs if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label="Referência")
-    bars2 = plt.bar(x + width/2, test_srv_values, width, yerr=test_srv_errs if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label="Teste")
-    for bar in bars1:
-        plt.text(bar.get_x()+bar.get_width()/2, bar.get_height(), format_throughput(bar.get_height()),
-                 ha='center', va='bottom')
-    for bar in bars2:
-        plt.text(bar.get_x()+bar.get_width()/2, bar.get_height(), format_throughput(bar.get_height()),
-                 ha='center', va='bottom')
-    plt.ylabel("Vazão média do servidor (Mbps)")
-    plt.xlabel("Teste")
-    plt.title("Vazão do servidor - Comparativo com Referência")
-    plt.xticks(x, [get_test_display_name_from_conf(os.path.join(resultados_dir, test)) for test in tests_ordered])
-    plt.legend()
-    plt.ylim(bottom=0)
-    plt.tight_layout()
-    prefix_filename = f"{ref_test}-{'-'.join(tests_ordered)}-comparativo_vazao_com_referencia"
+    prefix_filename = f"{ref_test}-{join_test_names(tests_ordered)}-comparativo_vazao_com_referencia"
     filename_png = f"{prefix_filename}.png"
     filepath_png = os.path.join(resultados_dir, filename_png)
-    plt.savefig(filepath_png)
     filename_svg = f"{prefix_filename}.svg"
     filepath_svg = os.path.join(resultados_dir, filename_svg)
-    plt.savefig(filepath_svg)
-    plt.close()
+    chart = ChartSpec(filepath_png, filepath_svg, figsize=(10,6))
+    chart.call("bar", x - width/2, ref_values, width, yerr=ref_errs if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label="Referência")
+    chart.call("bar", x + width/2, test_srv_values, width, yerr=test_srv_errs if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label="Teste")
+    for xi, v in zip(x - width/2, ref_values):
+        chart.call("text", xi, v, format_throughput(v),
+                   ha='center', va='bottom')
+    for xi, v in zip(x + width/2, test_srv_values):
+        chart.call("text", xi, v, format_throughput(v),
+                   ha='center', va='bottom')
+    chart.call("set_ylabel", "Vazão média do servidor (Mbps)")
+    chart.call("set_xlabel", "Teste")
+    chart.call("set_title", "Vazão do servidor - Comparativo com Referência")
+    chart.call("set_xticks", x, [get_test_display_name_from_conf(os.path.join(resultados_dir, test)) for test in tests_ordered])
+    chart.call("legend")
+    chart.call("set_ylim", bottom=0)
+    submit_chart(chart)
+
+############################
+# VERIFICAÇÃO DE REGRESSÃO #
+############################
+def check_regression(tests, medias_rodadas, medias_referencia, referencia, limites, veredito_path, dados_testes):
+    """
+    Compara cada teste com a sua referência ({teste: médias por rodada}),
+    grava o veredito em JSON e exibe o resultado de cada métrica. Retorna
+    CODIGO_REGRESSAO se alguma métrica regrediu e 0 caso contrário.
+    """
+    vereditos = {
+        test: compare_to_reference(medias_rodadas[test], medias_referencia.get(test, {}), limites)
+        for test in tests if test in medias_rodadas and test != referencia.get("teste")
+    }
+    with open(veredito_path, "w", encoding="utf-8") as f:
+        verdict_to_json(f, vereditos, referencia, limites)
+
+    descricao = referencia.get("teste") or referencia.get("linha_base")
+    print(f"\nVerificação de regressão (referência: {descricao}):")
+    unidades = {"vazao": "%", "perda": "", "cpu": "%"}
+    nomes = {chave: titulo for chave, titulo, _, _ in METRICAS_COMPARACAO}
+    for test, metricas in vereditos.items():
+        print(f"  {dados_testes[test].display_name}:")
+        for metrica, v in metricas.items():
+            if v["status"] == STATUS_SEM_DADOS:
+                print(f"    {nomes[metrica]}: sem dados")
+                continue
+            p = f"{v['p_welch']:.3g}" if np.isfinite(v["p_welch"]) else "indefinido"
+            print(f"    {nomes[metrica]}: piora de {v['piora']:+.2f}{unidades[metrica]} "
+                  f"(limite: {v['limite']:g}{unidades[metrica]}, p = {p}) -> {v['status'].upper()}")
+    print(f"Veredito gravado em: {veredito_path}")
+    if has_regression(vereditos):
+        print("Regressão detectada.")
+        return CODIGO_REGRESSAO
+    return 0
+
+#########################################
+# EXPORTAÇÃO DOS AGREGADOS (JSON E CSV) #
+#########################################
+UNIDADES_TCP = {"retrans_gb": "retransmissoes/GB", "retrans_s": "retransmissoes/s", "rtt_ms": "ms",
+                "rttvar_ms": "ms", "cwnd_kib": "KiB", "wnd_kib": "KiB"}
+UNIDADES_EFICIENCIA = {"gbps_nucleo": "Gbps/nucleo", "bits_ciclo": "bits/ciclo"}
+
+def _loss_column(r):
+    """Coluna da perda de uma rodada: a do servidor UDP ou, se não houver, as retransmissões do cliente TCP."""
+    if r.server is not None and "porcentagem_pacotes_perdidos" in r.server.columns:
+        return r.server, "porcentagem_pacotes_perdidos", "%"
+    if r.client is not None and "retransmissoes" in r.client.columns:
+        return r.client, "retransmissoes", "retransmissoes"
+    return None, None, ""
+
+def export_records_for_test(dados, cpu_overall, vazao, perda, tcp=None, eficiencia=None, fluxos=None, regime=None,
+                            perda_temporal=(None, None), distribuicao=None):
+    """
+    Registros da exportação (veja export.py) de um teste: as médias do teste
+    (com o IC de 95% entre rodadas), as de cada rodada (com o IC entre as
+    medições da rodada), os percentis das medições (métricas <métrica>_p1,
+    <métrica>_cv, ...) e a série temporal da perda, média das rodadas.
+    """
+    registros = []
+    unidade_perda = next((_loss_column(r)[2] for r in dados.rounds if _loss_column(r)[1]), "")
+
+    (cli, err_cli), (srv, err_srv) = vazao[0], vazao[1]
+    registros += [Registro(ESCOPO_TESTE, "vazao_cliente", cli, err_cli, "bps"),
+                  Registro(ESCOPO_TESTE, "vazao_servidor", srv, err_srv, "bps"),
+                  Registro(ESCOPO_TESTE, "perda", perda[0], perda[1], unidade_perda)]
+    for col, (media, err) in cpu_overall.items():
+        registros.append(Registro(ESCOPO_TESTE, "cpu", media, err, "%", nucleo=_core_number(col)))
+    for chave, unidade in UNIDADES_TCP.items():
+        if tcp and chave in tcp:
+            registros.append(Registro(ESCOPO_TESTE, chave, *tcp[chave], unidade))
+    for chave, unidade in UNIDADES_EFICIENCIA.items():
+        if eficiencia and chave in eficiencia:
+            registros.append(Registro(ESCOPO_TESTE, chave, *eficiencia[chave], unidade))
+    if fluxos:
+        registros += [Registro(ESCOPO_TESTE, "jain", *fluxos["jain"]),
+                      Registro(ESCOPO_TESTE, "dispersao_fluxos", *fluxos["dispersao"], "%")]
+    if regime:
+        registros.append(Registro(ESCOPO_TESTE, "inicio_regime", *regime["inicio"], "s"))
+    for chave, d in (distribuicao or {}).items():
+        for e in ESTATISTICAS:
+            registros.append(Registro(ESCOPO_TESTE, f"{chave}_{e}", d["teste"][e], None, "%" if e == "cv" else d["unidade"]))
+        for numero, estatisticas in d["rodadas"]:
+            registros += [Registro(ESCOPO_RODADA, f"{chave}_{e}", estatisticas[e], None, "%" if e == "cv" else d["unidade"], rodada=numero)
+                          for e in ESTATISTICAS]
+
+    tcp_rodadas = dict(tcp["rodadas"]) if tcp else {}
+    eficiencia_rodadas = dict(eficiencia["rodadas"]) if eficiencia else {}
+    fluxos_rodadas = dict(fluxos["rodadas"]) if fluxos else {}
+    regime_rodadas = {numero: inicio for numero, inicio, _ in regime["rodadas"]} if regime else {}
+    for r in dados.rounds:
+        n = r.number
+        for metrica, df in (("vazao_cliente", r.client), ("vazao_servidor", r.server)):
+            if df is not None and "bits_por_segundo" in df.columns and len(df) > 0:
+                valores = df["bits_por_segundo"].to_numpy(dtype=float)
+                registros.append(Registro(ESCOPO_RODADA, metrica, np.nanmean(valores), half_width(valores, bootstrap=False), "bps", rodada=n))
+        df, col, unidade = _loss_column(r)
+        if col and len(df) > 0:
+            valores = df[col].to_numpy(dtype=float)
+            registros.append(Registro(ESCOPO_RODADA, "perda", np.nanmean(valores), half_width(valores, bootstrap=False), unidade, rodada=n))
+        if r.mpstat is not None and len(r.mpstat) > 0:
+            matriz = r.mpstat.to_numpy(dtype=float)
+            for col, media, err in zip(r.mpstat.columns, np.nanmean(matriz, axis=0), np.atleast_1d(half_width(matriz, bootstrap=False))):
+                registros.append(Registro(ESCOPO_RODADA, "cpu", media, err, "%", rodada=n, nucleo=_core_number(col)))
+        for chave, valor in tcp_rodadas.get(n, {}).items():
+            registros.append(Registro(ESCOPO_RODADA, chave, valor, None, UNIDADES_TCP.get(chave, ""), rodada=n))
+        for chave, unidade in UNIDADES_EFICIENCIA.items():
+            if chave in eficiencia_rodadas.get(n, {}):
+                registros.append(Registro(ESCOPO_RODADA, chave, *eficiencia_rodadas[n][chave], unidade, rodada=n))
+        if n in fluxos_rodadas:
+            stats = fluxos_rodadas[n]
+            registros += [Registro(ESCOPO_RODADA, "jain", stats["jain"], None, rodada=n),
+                          Registro(ESCOPO_RODADA, "dispersao_fluxos", stats["dispersao"], None, "%", rodada=n)]
+            for fluxo, media, err in zip(stats["fluxos"], stats["medias_bps"], stats["erros_bps"]):
+                registros.append(Registro(ESCOPO_RODADA, "vazao_fluxo", media, err, "bps", rodada=n, fluxo=fluxo))
+        if n in regime_rodadas:
+            registros.append(Registro(ESCOPO_RODADA, "inicio_regime", regime_rodadas[n], None, "s", rodada=n))
+
+    tempo, media = perda_temporal
+    if tempo is not None:
+        registros += [Registro(ESCOPO_TEMPO, "perda", v, None, unidade_perda, tempo=t) for t, v in zip(tempo, media)]
+    return registros
 
 #####################################################
 # FUNÇÃO DE SUMARIZAÇÃO, GERAÇÃO DO MARKDOWN E MAIN #
@@ -1314,40 +2064,114 @@ def print_summarization(test_name, cpu_usage, vazao_cli_srv_formatada, unidade,
 
     print(f"\nNúmero de rodadas computadas: {round_count}\n")
 
-def _compute_round_tables_for_test(resultados_dir, test_name, cpu_keys_sorted, fator_vazao, unidade_vazao):
+def _fmt(valor, casas):
+    return "" if valor is None or np.isnan(valor) else f"{valor:.{casas}f}"
+
+def print_eficiencia_summarization(eficiencia):
+    if not eficiencia:
+        return
+    nucleos = ", ".join(eficiencia["nucleos"]) if eficiencia["nucleos"] else "todos"
+    print(f"Eficiência de CPU (núcleos: {nucleos}):")
+    media, err = eficiencia["gbps_nucleo"]
+    print(f"    {'Gbps/núcleo':<15}{media:.4f} ± {err:.4f}")
+    if "bits_ciclo" in eficiencia:
+        media, err = eficiencia["bits_ciclo"]
+        print(f"    {'Bits/ciclo':<15}{media:.4f} ± {err:.4f}")
+    print()
+
+def print_tcp_summarization(tcp):
+    if not tcp:
+        return
+    print("TCP (cliente):")
+    for chave, titulo, casas in METRICAS_TCP:
+        media, err = tcp[chave]
+        if not np.isnan(media):
+            print(f"    {titulo:<15}{media:.{casas}f} ± {err:.{casas}f}")
+    print()
+
+def print_regime_summarization(regime):
+    if not regime:
+        return
+    print("Aquecimento descartado (início do regime permanente, em s):")
+    print(f"{'Rodada':<10}{'Início (s)':<15}{'Origem':<15}")
+    for numero, inicio, origem in regime["rodadas"]:
+        print(f"{numero:<10}{inicio:<15.2f}{origem:<15}")
+    media, err = regime["inicio"]
+    print(f"{'Média':<10}{media:.2f} ± {err:.2f}\n")
+
+def print_comparacoes_summarization(comparacoes, correcao=CORRECAO_PADRAO):
+    if not comparacoes:
+        return
+    print(f"\nComparações entre testes (p < {ALFA}, correção de {NOMES_CORRECAO[correcao]}):")
+    for chave, titulo, _, _ in METRICAS_COMPARACAO:
+        if chave not in comparacoes:
+            continue
+        testes, comp = comparacoes[chave]
+        i, j = np.triu_indices(len(testes), k=1)
+        welch = int(np.count_nonzero(comp.p_welch[i, j] < ALFA))
+        mann_whitney = int(np.count_nonzero(comp.p_mann_whitney[i, j] < ALFA))
+        print(f"    {titulo}: {welch} de {len(i)} pares diferentes pelo teste de Welch, {mann_whitney} pelo de Mann-Whitney")
+
+def _distribution_cells(estatisticas, escala, casas):
+    """Células (ESTATISTICAS) de uma linha da distribuição; o CV não é escalado."""
+    return [_fmt(estatisticas[e], 2) if e == "cv" else _fmt(estatisticas[e] / escala, casas) for e in ESTATISTICAS]
+
+def print_distribuicao_summarization(distribuicao):
+    if not distribuicao:
+        return
+    print("Distribuição das amostras (todas as rodadas):")
+    print(f"{'Métrica':<28}" + "".join(f"{TITULOS_ESTATISTICAS[e]:>12}" for e in ESTATISTICAS))
+    for chave, _, casas in METRICAS_DISTRIBUICAO:
+        if chave not in distribuicao:
+            continue
+        d = distribuicao[chave]
+        unidade_vazao, escala = choose_bps_scale(_safe(d["teste"]["p99"])) if d["unidade"] == "bps" else (None, 1.0)
+        celulas = _distribution_cells(d["teste"], escala, casas)
+        print(f"{_distribution_title(chave, d['unidade'], unidade_vazao):<28}" + "".join(f"{c:>12}" for c in celulas))
+    print()
+
+def print_fluxos_summarization(fluxos):
+    if not fluxos:
+        return
+    print(f"Fluxos paralelos ({fluxos['n_fluxos']} por rodada):")
+    print(f"{'Rodada':<10}{'Jain':<10}{'Dispersão (%)':<15}")
+    for numero, stats in fluxos["rodadas"]:
+        print(f"{numero:<10}{stats['jain']:<10.4f}{stats['dispersao']:<15.2f}")
+    print(f"{'Média':<10}{fluxos['jain'][0]:<10.4f}{fluxos['dispersao'][0]:<15.2f}\n")
+
+def _compute_round_tables_for_test(dados, cpu_keys_sorted, fator_vazao, unidade_vazao, tcp=None, com_tcp=False,
+                                   eficiencia=None, colunas_eficiencia=()):
     """
-    Lê os arquivos por rodada do teste e retorna:
+    A partir dos dados já carregados de cada rodada do teste, retorna:
       - header_cols: cabeçalho "| Rodada | Cliente (...) | Servidor (...) | Perda (%) | CPU 0 (%) | ... |"
       - lines: linhas da tabela (uma por rodada)
     """
-    test_dir = os.path.join(resultados_dir, test_name)
-    rounds = get_round_dirs(test_dir)
 
     # Cabeçalho fixo para todas as tabelas por rodada (usa mesmas CPUs do resumo global)
-    header_cols = ["Rodada", f"Cliente ({unidade_vazao})", f"Servidor ({unidade_vazao})", "Perda (%)"]
+    header_cols = ["Rodada", f"Cliente ({unidade_vazao})", f"Servidor ({unidade_vazao})"]
+    if com_tcp:
+        header_cols += [titulo for _, titulo, _ in METRICAS_TCP]
+    header_cols.append("Perda (%)")
     for k in cpu_keys_sorted:
         idxm = re.search(r'(\d+)', k or "")
         idx = idxm.group(1) if idxm else k
         header_cols.append(f"CPU {idx} (%)")
+    header_cols += [titulo for _, titulo, _ in colunas_eficiencia]
 
     lines = []
     lines.append("| " + " | ".join(header_cols) + " |")
     lines.append("|" + "|".join([":---:"]*len(header_cols)) + "|")
 
-    for rodada in rounds:
-        rodada_path = os.path.join(test_dir, rodada)
-        rodada_numero = re.search(r'rodada_(\d+)', rodada).group(1)
+    for r in dados.rounds:
+        rodada_numero = str(r.number)
+        df_cli, df_srv = r.client, r.server
 
         # Vazão por rodada
         cli_bps = srv_bps = 0.0
-        client_file = os.path.join(rodada_path, f"{rodada}-{test_name}-iperf3_client.csv")
-        server_file = os.path.join(rodada_path, f"{rodada}-{test_name}-iperf3_server.csv")
-        if os.path.exists(client_file):
-            df_cli = pd.read_csv(client_file)
+        if df_cli is not None:
             if "bits_por_segundo" in df_cli.columns and len(df_cli) > 0:
                 cli_bps = float(df_cli["bits_por_segundo"].mean())
-        if os.path.exists(server_file):
-            df_srv = pd.read_csv(server_file)
+        if df_srv is not None:
             if "bits_por_segundo" in df_srv.columns and len(df_srv) > 0:
                 srv_bps = float(df_srv["bits_por_segundo"].mean())
 
@@ -1356,21 +2180,18 @@ def _compute_round_tables_for_test(resultados_dir, test_name, cpu_keys_sorted, f
 
         # Perda por rodada
         perda_val = ""
-        if os.path.exists(server_file):
-            df_srv = pd.read_csv(server_file)
+        if df_srv is not None:
             if "porcentagem_pacotes_perdidos" in df_srv.columns and len(df_srv) > 0:
                 perda_val = f"{float(df_srv['porcentagem_pacotes_perdidos'].mean()):.4f}"
-        if perda_val == "" and os.path.exists(client_file):
-            df_cli = pd.read_csv(client_file)
+        if perda_val == "" and df_cli is not None:
             if "retransmissoes" in df_cli.columns and len(df_cli) > 0:
                 perda_val = f"{float(df_cli['retransmissoes'].mean()):.4f}"
 
         # CPU por rodada
         cpu_vals = []
-        mpstat_file = os.path.join(rodada_path, f"{rodada}-{test_name}-mpstat.csv")
         cpu_means = {}
-        if os.path.exists(mpstat_file):
-            df_mp = pd.read_csv(mpstat_file)
+        if r.mpstat is not None:
+            df_mp = r.mpstat
             for col in df_mp.columns:
                 try:
                     cpu_means[col] = float(df_mp[col].mean())
@@ -1382,7 +2203,17 @@ def _compute_round_tables_for_test(resultados_dir, test_name, cpu_keys_sorted, f
                 v = f"{cpu_means[k]:.2f}"
             cpu_vals.append(v)
 
-        lines.append("| " + " | ".join([rodada_numero, cli_v, srv_v, perda_val] + cpu_vals) + " |")
+        # Dados TCP por rodada, ao lado da vazão
+        tcp_vals = []
+        if com_tcp:
+            stats = dict(tcp["rodadas"]).get(r.number) if tcp else None
+            tcp_vals = [_fmt(stats[chave], casas) if stats else "" for chave, _, casas in METRICAS_TCP]
+
+        # Eficiência de CPU por rodada
+        stats = dict(eficiencia["rodadas"]).get(r.number) if eficiencia else None
+        eficiencia_vals = [f"{stats[chave][0]:.{casas}f}" if stats and chave in stats else "" for chave, _, casas in colunas_eficiencia]
+
+        lines.append("| " + " | ".join([rodada_numero, cli_v, srv_v] + tcp_vals + [perda_val] + cpu_vals + eficiencia_vals) + " |")
 
     return header_cols, lines
 
@@ -1390,7 +2221,7 @@ def _cpu_idx(k):
     m = re.search(r'(\d+)', k or "")
     return int(m.group(1)) if m else 10**9
 
-def write_markdown_summary(resultados_dir, tests, cpu_aggregate, vazao_aggregate, perda_aggregate):
+def write_markdown_summary(resultados_dir, tests, dados_testes, cpu_aggregate, vazao_aggregate, perda_aggregate, fluxos_aggregate=None, tcp_aggregate=None, eficiencia_aggregate=None, regime_aggregate=None, comparacoes=None, correcao=CORRECAO_PADRAO, distribuicao_aggregate=None):
     # Determina a maior unidade de vazão entre todos os testes
     all_bps = []
     for t in tests:
@@ -1411,23 +2242,35 @@ def write_markdown_summary(resultados_dir, tests, cpu_aggregate, vazao_aggregate
     cpu_keys_sorted = sorted(cpu_keys_set, key=_cpu_idx)
 
     # Tabela com os resultados de todos os testes
+    # Colunas TCP só aparecem se algum teste tiver rodadas TCP
+    com_tcp = any(tcp_aggregate.get(t) for t in tests) if tcp_aggregate else False
     header_cols = ["Nome do teste",
                    f"Cliente ({unidade})",
-                   f"Servidor ({unidade})",
-                   "Perda (%)"]
+                   f"Servidor ({unidade})"]
+    if com_tcp:
+        header_cols += [titulo for _, titulo, _ in METRICAS_TCP]
+    header_cols.append("Perda (%)")
     for k in cpu_keys_sorted:
         idxm = re.search(r'(\d+)', k or "")
         idx = idxm.group(1) if idxm else k
         header_cols.append(f"CPU {idx} (%)")
 
+    # Colunas de eficiência de CPU, se algum teste tiver os dados
+    eficiencias = [eficiencia_aggregate[t] for t in tests if eficiencia_aggregate and eficiencia_aggregate.get(t)]
+    colunas_eficiencia = []
+    if eficiencias:
+        colunas_eficiencia.append(("gbps_nucleo", "Gbps/núcleo", 4))
+        if any("bits_ciclo" in e for e in eficiencias):
+            colunas_eficiencia.append(("bits_ciclo", "Bits/ciclo", 4))
+    header_cols += [titulo for _, titulo, _ in colunas_eficiencia]
+
     # Linhas da tabela, sendo uma por teste, respeitando a ordem informada pelo usuário
     lines = []
     lines.append("| " + " | ".join(header_cols) + " |")
     lines.append("|" + "|".join([":---:"]*len(header_cols)) + "|")
 
     for t in tests:
-        test_dir = os.path.join(resultados_dir, t)
-        nome = get_test_display_name_from_conf(test_dir)
+        nome = dados_testes[t].display_name if t in dados_testes else get_test_display_name_from_conf(os.path.join(resultados_dir, t))
 
         # Vazão
         if t in vazao_aggregate:
@@ -1455,34 +2298,150 @@ def write_markdown_summary(resultados_dir, tests, cpu_aggregate, vazao_aggregate
                     v = f"{mean_err[0]:.2f}"
             cpu_vals.append(v)
 
-        lines.append("| " + " | ".join([nome, cli_val, srv_val, perda_val] + cpu_vals) + " |")
+        tcp_vals = []
+        if com_tcp:
+            tcp = tcp_aggregate.get(t)
+            tcp_vals = [_fmt(tcp[chave][0], casas) if tcp else "" for chave, _, casas in METRICAS_TCP]
+
+        eficiencia = eficiencia_aggregate.get(t) if eficiencia_aggregate else None
+        eficiencia_vals = [f"{eficiencia[chave][0]:.{casas}f}" if eficiencia and chave in eficiencia else "" for chave, _, casas in colunas_eficiencia]
+
+        lines.append("| " + " | ".join([nome, cli_val, srv_val] + tcp_vals + [perda_val] + cpu_vals + eficiencia_vals) + " |")
 
     # Gerando o arquvivo Markdown
-    sumarizado_dir = os.path.join(resultados_dir, "sumarizado-" + "-".join(tests))
-    prefix = "sumarizado-" + "-".join(tests)
+    sumarizado_dir = os.path.join(resultados_dir, "sumarizado-" + join_test_names(tests))
+    prefix = "sumarizado-" + join_test_names(tests)
     md_path = os.path.join(sumarizado_dir, f"{prefix}.md")
-    with open(md_path, "w", encoding="utf-8") as f:
-        # Título e resumo global
-        f.write("# Sumarização dos resultados\n\n")
-        f.write("## Geral\n\n")
-        f.write("Abaixo, está a tabela com a sumarização global dos testes:\n\n")
-        f.write("\n".join(lines) + "\n\n")
-
-        # Tabelas de cada teste
-        if resultados_dir is None:
-            # quando não informado, assume que o diretório pai de sumarizado-... é o diretório de resultados
-            resultados_dir = os.path.dirname(sumarizado_dir)
-
-        f.write("## Por teste\n\n")
-        for t in tests:
-            test_display_name = get_test_display_name_from_conf(os.path.join(resultados_dir, t))
-            f.write(f"### {test_display_name}\n\n")
-            f.write(f"Tabela com os dados de cada rodada para o teste \"{test_display_name}\".\n\n")
-            _hdr, round_lines = _compute_round_tables_for_test(
-                resultados_dir, t, cpu_keys_sorted, fator, unidade
-            )
-            f.write("\n".join(round_lines) + "\n\n")
-
+    f = io.StringIO()
+    # Título e resumo global
+    f.write("# Sumarização dos resultados\n\n")
+    f.write("## Geral\n\n")
+    f.write("Abaixo, está a tabela com a sumarização global dos testes:\n\n")
+    f.write("\n".join(lines) + "\n\n")
+
+    # Tabelas de cada teste
+    if resultados_dir is None:
+        # quando não informado, assume que o diretório pai de sumarizado-... é o diretório de resultados
+        resultados_dir = os.path.dirname(sumarizado_dir)
+
+    f.write("## Por teste\n\n")
+    for t in tests:
+        if t not in dados_testes:
+            continue
+        test_display_name = dados_testes[t].display_name
+        f.write(f"### {test_display_name}\n\n")
+        f.write(f"Tabela com os dados de cada rodada para o teste \"{test_display_name}\".\n\n")
+        _hdr, round_lines = _compute_round_tables_for_test(
+            dados_testes[t], cpu_keys_sorted, fator, unidade, tcp_aggregate.get(t) if tcp_aggregate else None, com_tcp,
+            eficiencia_aggregate.get(t) if eficiencia_aggregate else None, colunas_eficiencia
+        )
+        f.write("\n".join(round_lines) + "\n\n")
+
+    # Distribuição das amostras de cada rodada e de todas as rodadas de cada teste
+    testes_distribuicao = [t for t in tests if distribuicao_aggregate and distribuicao_aggregate.get(t)]
+    if testes_distribuicao:
+        f.write("## Distribuição das amostras\n\n")
+        f.write("Mínimo, percentis e coeficiente de variação (CV) das medições de cada rodada e de todas as rodadas "
+                "de cada teste juntas (\"Todas\"). Percentis baixos da vazão revelam quedas curtas que não aparecem na média.\n\n")
+        for chave, _, casas in METRICAS_DISTRIBUICAO:
+            testes_metrica = [t for t in testes_distribuicao if chave in distribuicao_aggregate[t]]
+            if not testes_metrica:
+                continue
+            escala = fator if chave.startswith("vazao") else 1.0
+            titulo = _distribution_title(chave, distribuicao_aggregate[testes_metrica[0]][chave]["unidade"],
+                                         unidade if chave.startswith("vazao") else None)
+            f.write(f"### {titulo}\n\n")
+            f.write("| Nome do teste | Rodada | " + " | ".join(TITULOS_ESTATISTICAS[e] for e in ESTATISTICAS) + " |\n")
+            f.write("|:---:|:---:|" + ":---:|" * len(ESTATISTICAS) + "\n")
+            for t in testes_metrica:
+                d = distribuicao_aggregate[t][chave]
+                nome = dados_testes[t].display_name
+                for numero, estatisticas in d["rodadas"]:
+                    f.write(f"| {nome} | {numero} | " + " | ".join(_distribution_cells(estatisticas, escala, casas)) + " |\n")
+                f.write(f"| {nome} | Todas | " + " | ".join(_distribution_cells(d["teste"], escala, casas)) + " |\n")
+            f.write("\n")
+
+    # Fim do aquecimento, só com --regime-permanente
+    testes_regime = [t for t in tests if regime_aggregate and regime_aggregate.get(t)]
+    if testes_regime:
+        f.write("## Regime permanente\n\n")
+        f.write("As amostras anteriores ao início do regime permanente de cada rodada (fim do aquecimento) foram descartadas de todas as estatísticas acima:\n\n")
+        f.write("| Nome do teste | Início médio (s) | Início por rodada (s) |\n")
+        f.write("|:---:|:---:|:---:|\n")
+        for t in testes_regime:
+            rg = regime_aggregate[t]
+            por_rodada = " / ".join(f"{inicio:.2f}" for _, inicio, _ in rg["rodadas"])
+            f.write(f"| {dados_testes[t].display_name} | {rg['inicio'][0]:.2f} ± {rg['inicio'][1]:.2f} | {por_rodada} |\n")
+        f.write("\n")
+
+    # Justiça entre fluxos paralelos, só para os testes executados com -P
+    testes_fluxos = [t for t in tests if fluxos_aggregate and fluxos_aggregate.get(t)]
+    if testes_fluxos:
+        f.write("## Fluxos paralelos\n\n")
+        f.write("Índice de justiça de Jain e dispersão entre fluxos ((máx - mín) / média da vazão dos fluxos), com IC de 95% entre rodadas:\n\n")
+        f.write("| Nome do teste | Fluxos | Jain | Dispersão (%) |\n")
+        f.write("|:---:|:---:|:---:|:---:|\n")
+        for t in testes_fluxos:
+            fl = fluxos_aggregate[t]
+            f.write(f"| {dados_testes[t].display_name} | {fl['n_fluxos']} | {fl['jain'][0]:.4f} ± {fl['jain'][1]:.4f} | {fl['dispersao'][0]:.2f} ± {fl['dispersao'][1]:.2f} |\n")
+        f.write("\n")
+        for t in testes_fluxos:
+            f.write(f"### {dados_testes[t].display_name}\n\n")
+            f.write(f"| Rodada | Jain | Dispersão (%) | Vazão por fluxo ({unidade}) |\n")
+            f.write("|:---:|:---:|:---:|:---:|\n")
+            for numero, stats in fluxos_aggregate[t]["rodadas"]:
+                por_fluxo = " / ".join(f"{v / fator:.2f}" for v in stats["medias_bps"])
+                f.write(f"| {numero} | {stats['jain']:.4f} | {stats['dispersao']:.2f} | {por_fluxo} |\n")
+            f.write("\n")
+
+    # Comparações pareadas entre os testes, só com ao menos dois testes com rodadas suficientes
+    if comparacoes:
+        f.write("## Comparações entre testes\n\n")
+        f.write(f"Diferença relativa entre as médias das rodadas de cada par de testes (linha em relação à coluna) "
+                f"e p-valor do teste t de Welch, corrigido para comparações múltiplas por {NOMES_CORRECAO[correcao]}. "
+                f"Diferenças significativas (p < {ALFA}) estão em negrito.\n\n")
+        for chave, titulo, unidade_metrica, escala in METRICAS_COMPARACAO:
+            if chave not in comparacoes:
+                continue
+            testes, comp = comparacoes[chave]
+            nomes = [dados_testes[t].display_name for t in testes]
+            relativa = _relative_difference(comp)
+            f.write(f"### {titulo}\n\n")
+            f.write("| | " + " | ".join(nomes) + " |\n")
+            f.write("|:---:|" + ":---:|" * len(nomes) + "\n")
+            for i, nome in enumerate(nomes):
+                celulas = []
+                for j in range(len(nomes)):
+                    if i == j:
+                        celulas.append("—")
+                        continue
+                    texto = f"{relativa[i, j]:+.2f}% (p={comp.p_welch[i, j]:.3g})" if np.isfinite(relativa[i, j]) else f"(p={comp.p_welch[i, j]:.3g})"
+                    celulas.append(f"**{texto}**" if comp.p_welch[i, j] < ALFA else texto)
+                f.write(f"| {nome} | " + " | ".join(celulas) + " |\n")
+            f.write("\n")
+            linhas, colunas = np.triu_indices(len(testes), k=1)
+            significativos = [(i, j) for i, j in zip(linhas, colunas) if comp.p_welch[i, j] < ALFA or comp.p_mann_whitney[i, j] < ALFA]
+            if significativos:
+                sufixo = f" ({unidade_metrica})" if unidade_metrica else ""
+                f.write("Pares com diferença significativa em ao menos um dos testes:\n\n")
+                f.write(f"| Teste A | Teste B | Diferença A - B{sufixo} | p (Welch) | p (Mann-Whitney) | g de Hedges | Bisserial |\n")
+                f.write("|:---:|:---:|:---:|:---:|:---:|:---:|:---:|\n")
+                for i, j in significativos:
+                    f.write(f"| {nomes[i]} | {nomes[j]} | {comp.diferenca[i, j] / escala:+.4f} | {comp.p_welch[i, j]:.3g} | "
+                            f"{comp.p_mann_whitney[i, j]:.3g} | {comp.hedges_g[i, j]:+.2f} | {comp.bisserial[i, j]:+.2f} |\n")
+                f.write("\n")
+
+    # Só regrava o Markdown se o conteúdo mudou
+    conteudo = f.getvalue()
+    try:
+        with open(md_path, encoding="utf-8") as atual:
+            if atual.read() == conteudo:
+                print(f"Arquivo Markdown inalterado: {md_path}")
+                return
+    except OSError:
+        pass
+    with open(md_path, "w", encoding="utf-8") as out:
+        out.write(conteudo)
     print(f"Arquivo Markdown gerado: {md_path}")
 
 def main():
@@ -1501,8 +2460,59 @@ def main():
                         help="Deixa as barras dos gráficos de vazão ordenadas de forma crescente.")
     parser.add_argument("--inverter", action="store_true",
                         help="Deixa as barras do gráfico que compara a vazão do servidor entre os testes ordenadas de forma decrescente")
+    parser.add_argument("--frequencia-cpu", type=float, metavar="GHZ",
+                        help="Frequência dos núcleos, em GHz, para calcular a eficiência em bits por ciclo.")
+    parser.add_argument("--metodo-ic", choices=METODOS, default=METODO_PADRAO,
+                        help="Método dos intervalos de confiança de 95%%: t de Student (padrão), normal (1,96·s/√n) ou bootstrap percentil.")
+    parser.add_argument("--reamostragens", type=int, default=REAMOSTRAGENS_PADRAO,
+                        help=f"Quantidade de reamostragens do bootstrap (padrão: {REAMOSTRAGENS_PADRAO}).")
+    parser.add_argument("--correcao", choices=CORRECOES, default=CORRECAO_PADRAO,
+                        help="Correção dos p-valores das comparações entre testes: holm (padrão) ou bh (Benjamini-Hochberg).")
+    parser.add_argument("--regressao", action="store_true",
+                        help="Compara cada teste com a referência (-r) ou com a linha de base (--linha-base) e termina "
+                             f"com o código {CODIGO_REGRESSAO} se alguma métrica piorar além do limite.")
+    parser.add_argument("--linha-base", metavar="ARQ",
+                        help="Linha de base (JSON gravado com --salvar-linha-base) usada como referência por --regressao.")
+    parser.add_argument("--salvar-linha-base", metavar="ARQ",
+                        help="Grava as médias por rodada de cada teste como linha de base para execuções futuras.")
+    parser.add_argument("--limite-vazao", type=float, default=LIMITES_PADRAO["vazao"], metavar="PCT",
+                        help=f"Queda máxima da vazão, em %% da referência (padrão: {LIMITES_PADRAO['vazao']:g}).")
+    parser.add_argument("--limite-perda", type=float, default=LIMITES_PADRAO["perda"],
+                        help="Aumento máximo da perda, em pontos percentuais (UDP) ou retransmissões por medição (TCP) "
+                             f"(padrão: {LIMITES_PADRAO['perda']:g}).")
+    parser.add_argument("--limite-cpu", type=float, default=LIMITES_PADRAO["cpu"], metavar="PCT",
+                        help=f"Aumento máximo do uso de CPU, em %% da referência (padrão: {LIMITES_PADRAO['cpu']:g}).")
+    parser.add_argument("--veredito", metavar="ARQ",
+                        help="Arquivo JSON do veredito de --regressao (padrão: veredito_regressao.json no diretório sumarizado).")
+    parser.add_argument("--regime-permanente", action="store_true",
+                        help="Descarta de todas as estatísticas as amostras anteriores ao fim do aquecimento detectado em cada rodada.")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Número de processos usados para renderizar os gráficos (padrão: 1).")
+    parser.add_argument("--refazer", action="store_true",
+                        help="Ignora o manifesto da última sumarização e regenera todos os gráficos.")
+    parser.add_argument("--sem-graficos", action="store_true",
+                        help="Só exibe o resumo e gera o Markdown (e, se pedidos, a linha de base e o veredito), "
+                             "sem desenhar gráficos nem carregar o Matplotlib.")
+    parser.add_argument("--perfil", nargs="?", const="", metavar="ARQ",
+                        help="Mede o tempo de parede e de CPU de cada estágio e de cada gráfico, exibe um resumo e grava "
+                             "um Chrome trace (padrão: perfil.json no diretório sumarizado).")
     args = parser.parse_args()
 
+    set_profile(args.perfil is not None)
+    with stage("total", "sumarizador"):
+        codigo = summarize(parser, args)
+    if args.perfil is not None:
+        perfil_path = args.perfil or os.path.join(args.resultados, "sumarizado-" + join_test_names(args.teste), "perfil.json")
+        os.makedirs(os.path.dirname(os.path.abspath(perfil_path)), exist_ok=True)
+        write_trace(perfil_path)
+        print_summary()
+        print(f"Perfil gravado em: {perfil_path}")
+    return codigo
+
+
+def summarize(parser, args):
+    """Sumariza os testes de 'args' e retorna o código de saída."""
+
     resultados_dir = args.resultados
     tests = args.teste
     cpus = args.cpus.split(",") if args.cpus else None
@@ -1511,61 +2521,150 @@ def main():
     mostrar_media = args.media
     ordenar_barras = args.ordenar
     inverter_barras = args.inverter
+    # Com --sem-graficos, só são calculados os agregados do resumo e do Markdown
+    graficos = not args.sem_graficos
+    if graficos:
+        manifest_path = os.path.join(resultados_dir, "sumarizado-" + join_test_names(tests), MANIFESTO)
+        set_jobs(args.jobs, manifest_path, args.refazer)
+    else:
+        disable_charts()
+    set_method(args.metodo_ic, args.reamostragens)
+
+    linha_base = None
+    if args.regressao and not (referencia or args.linha_base):
+        parser.error("--regressao requer -r/--referencia ou --linha-base")
+    if args.linha_base and not args.regressao:
+        parser.error("--linha-base requer --regressao")
+    if args.regressao and args.linha_base:
+        try:
+            with open(args.linha_base, encoding="utf-8") as f:
+                linha_base = load_baseline(f)
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f"não foi possível ler a linha de base {args.linha_base}: {e}")
 
     cpu_aggregate = {}
     perda_aggregate = {}
     vazao_aggregate = {}
     perda_temporal_agg = {}
+    fluxos_aggregate = {}
+    tcp_aggregate = {}
+    eficiencia_aggregate = {}
+    regime_aggregate = {}
+    distribuicao_aggregate = {}
+    medias_rodadas = {}
+    frequencia_hz = args.frequencia_cpu * 1e9 if args.frequencia_cpu else None
+    dados_testes = {}  # teste -> TestData, carregado uma única vez do disco
+
+    # Os agregados de cada teste são exportados assim que calculados (veja export.py)
+    sumarizado_dir = os.path.join(resultados_dir, "sumarizado-" + join_test_names(tests))
+    os.makedirs(sumarizado_dir, exist_ok=True)
+    exportacao = AggregateExport(os.path.join(sumarizado_dir, "sumarizado-" + join_test_names(tests)),
+                                 {"metodo_ic": args.metodo_ic, "regime_permanente": args.regime_permanente,
+                                  "nucleos": cpus})
 
     for test in tests:
-        test_dir = os.path.join(resultados_dir, test)
-        if not os.path.isdir(test_dir):
-            print(f"Aviso: Diretório do teste {test_dir} não encontrado.")
+        with stage("carga", teste=test):
+            dados = load_test_data(resultados_dir, test)
+        if dados is None:
+            print(f"Aviso: Diretório do teste {os.path.join(resultados_dir, test)} não encontrado.")
             continue
+        dados_testes[test] = dados
 
-        test_display_name = get_test_display_name_from_conf(test_dir)
+        test_display_name = dados.display_name
         print(f"\nProcessando {test_display_name} ...")
-        overall_cpu_values, round_count = plot_cpu_usage_for_round(test_dir, test, mostrar_intervalo_confianca)
-        cpu_overall = plot_cpu_usage_for_test(overall_cpu_values, test_dir, test, mostrar_intervalo_confianca)
-        vazao_cli, vazao_srv, vazao_cli_srv_formatada, unidade = plot_vazao_barra_for_test(test_dir, test, mostrar_intervalo_confianca)
-        perda_overall = plot_perda_barra_for_test(test_dir, test, mostrar_intervalo_confianca)
-        
-        plot_cpu_temporal_for_test(test_dir, test)
-        plot_vazao_temporal_for_test(test_dir, test)
-        plot_perda_temporal_for_test(test_dir, test)
-
-        plot_cpu_comparativo_por_rodada(test_dir, test, mostrar_intervalo_confianca)
-        plot_perda_comparativo_por_rodada(test_dir, test, mostrar_intervalo_confianca)
-        plot_vazao_comparativo_por_rodada(test_dir, test, mostrar_intervalo_confianca)
+        if args.regime_permanente:
+            with stage("regime", teste=test):
+                regime_aggregate[test] = apply_steady_state(dados)
+        with stage("cpu", teste=test):
+            overall_cpu_values, round_count = plot_cpu_usage_for_round(dados, mostrar_intervalo_confianca)
+            cpu_overall = plot_cpu_usage_for_test(overall_cpu_values, dados, mostrar_intervalo_confianca)
+        with stage("vazao", teste=test):
+            vazao_cli, vazao_srv, vazao_cli_srv_formatada, unidade = plot_vazao_barra_for_test(dados, mostrar_intervalo_confianca)
+        with stage("perda", teste=test):
+            perda_overall = plot_perda_barra_for_test(dados, mostrar_intervalo_confianca)
+
+        if graficos:
+            with stage("temporais", teste=test):
+                plot_cpu_temporal_for_test(dados, mostrar_intervalo_confianca)
+                plot_vazao_temporal_for_test(dados, mostrar_intervalo_confianca)
+                plot_perda_temporal_for_test(dados, mostrar_intervalo_confianca)
+                plot_tcp_temporal_for_test(dados, mostrar_intervalo_confianca)
+
+            with stage("comparativos_rodada", teste=test):
+                plot_cpu_comparativo_por_rodada(dados, mostrar_intervalo_confianca)
+                plot_perda_comparativo_por_rodada(dados, mostrar_intervalo_confianca)
+                plot_vazao_comparativo_por_rodada(dados, mostrar_intervalo_confianca)
+
+        with stage("fluxos", teste=test):
+            if graficos:
+                plot_fluxos_temporal_for_round(dados)
+            fluxos_aggregate[test] = plot_fluxos_barra_for_test(dados, mostrar_intervalo_confianca)
 
         print_summarization(test_display_name, cpu_overall, vazao_cli_srv_formatada, unidade, perda_overall, round_count)
+        print_regime_summarization(regime_aggregate.get(test))
+        # Eficiência restrita aos núcleos de -c/--cpus ou, se não informados, aos fixados com -A
+        nucleos = cpus or dados.pinned_cores or None
+        with stage("eficiencia", teste=test):
+            eficiencia_aggregate[test] = plot_eficiencia_barra_for_test(dados, nucleos, frequencia_hz, mostrar_intervalo_confianca)
+        print_eficiencia_summarization(eficiencia_aggregate[test])
+        medias_rodadas[test] = round_means_for_test(dados, nucleos)
+        with stage("tcp", teste=test):
+            tcp_aggregate[test] = tcp_stats_for_test(dados)
+        print_tcp_summarization(tcp_aggregate[test])
+        print_fluxos_summarization(fluxos_aggregate[test])
+        with stage("distribuicao", teste=test):
+            distribuicao_aggregate[test] = distribution_stats_for_test(dados)
+            if graficos:
+                plot_cdf_for_test(dados, distribuicao_aggregate[test])
+        print_distribuicao_summarization(distribuicao_aggregate[test])
 
         cpu_aggregate[test] = cpu_overall
         perda_aggregate[test] = perda_overall
         vazao_aggregate[test] = (vazao_cli, vazao_srv)
-        perda_temporal_agg[test] = aggregate_perda_temporal_for_test(test_dir, test)
-
-    sumarizado_dir = os.path.join(resultados_dir, "sumarizado-" + "-".join(tests))
-    if not os.path.exists(sumarizado_dir):
-        os.makedirs(sumarizado_dir)
-
-    plot_cpu_comparativo_por_teste(sumarizado_dir, tests, cpu_aggregate, mostrar_intervalo_confianca)
-    plot_cpu_comparativo_por_nucleo(sumarizado_dir, tests, cpu_aggregate, mostrar_intervalo_confianca)
-    plot_perda_comparativo_por_teste(sumarizado_dir, tests, perda_aggregate, mostrar_intervalo_confianca)
-    plot_vazao_comparativo_por_teste(sumarizado_dir, tests, vazao_aggregate, mostrar_intervalo_confianca)
-    plot_vazao_servidor_comparativo(sumarizado_dir, tests, vazao_aggregate, mostrar_intervalo_confianca, mostrar_media, ordenar_barras, inverter_barras)
-
-    agg_perda_temp = aggregate_all_perda_temporal(resultados_dir, tests)
-    plot_perda_temporal_comparativo_por_teste(sumarizado_dir, tests, agg_perda_temp)
-
-    if cpus:
+        perda_temporal_agg[test] = aggregate_perda_temporal_for_test(dados)
+
+        with stage("exportacao", teste=test):
+            exportacao.add_test(test, test_display_name, export_records_for_test(
+                dados, cpu_overall, vazao_aggregate[test], perda_overall, tcp_aggregate[test], eficiencia_aggregate[test],
+                fluxos_aggregate[test], regime_aggregate.get(test), perda_temporal_agg[test], distribuicao_aggregate[test]))
+
+    exportacao.close()
+    print(f"\nAgregados exportados em: {exportacao.json_path} e {exportacao.csv_path}")
+
+    if graficos:
+        with stage("comparativos"):
+            plot_cpu_comparativo_por_teste(sumarizado_dir, tests, cpu_aggregate, mostrar_intervalo_confianca)
+            plot_cpu_comparativo_por_nucleo(sumarizado_dir, tests, cpu_aggregate, mostrar_intervalo_confianca)
+            plot_perda_comparativo_por_teste(sumarizado_dir, tests, perda_aggregate, mostrar_intervalo_confianca)
+            plot_vazao_comparativo_por_teste(sumarizado_dir, tests, vazao_aggregate, mostrar_intervalo_confianca)
+            plot_vazao_servidor_comparativo(sumarizado_dir, tests, vazao_aggregate, mostrar_intervalo_confianca, mostrar_media, ordenar_barras, inverter_barras)
+
+            agg_perda_temp = aggregate_all_perda_temporal(dados_testes, tests)
+            plot_perda_temporal_comparativo_por_teste(sumarizado_dir, tests, agg_perda_temp)
+            plot_fluxos_jain_comparativo_por_teste(sumarizado_dir, tests, fluxos_aggregate, mostrar_intervalo_confianca)
+            plot_eficiencia_comparativo_por_teste(sumarizado_dir, tests, eficiencia_aggregate, mostrar_intervalo_confianca)
+            plot_cdf_comparativo_por_teste(sumarizado_dir, tests, distribuicao_aggregate, dados_testes)
+
+    with stage("significancia"):
+        comparacoes = compare_all_tests(tests, medias_rodadas, args.correcao)
+        if graficos:
+            plot_significancia_heatmap(sumarizado_dir, tests, comparacoes, dados_testes, args.correcao)
+    print_comparacoes_summarization(comparacoes, args.correcao)
+
+    if cpus and graficos:
         def plot_cpu_comparativo_por_teste_cpus(resultados_dir, tests, cpu_aggregate, cpus, mostrar_intervalo_confianca=False):
             tests_sorted = sorted([test for test in tests if test in cpu_aggregate])
             n_tests = len(tests_sorted)
             n_cpus = len(cpus)
             x = np.arange(n_tests)
             width = 0.8 / n_cpus
-            plt.figure(figsize=(10,6))
+            prefix = join_test_names(tests_sorted)
+            cpus_str = "-".join([f"cpu_{cpu}" for cpu in cpus])
+            filename_png = f"{prefix}-{cpus_str}-comparativo_cpu_por_teste.png"
+            filepath_png = os.path.join(resultados_dir, filename_png)
+            filename_svg = f"{prefix}-{cpus_str}-comparativo_cpu_por_teste.svg"
+            filepath_svg = os.path.join(resultados_dir, filename_svg)
+            chart = ChartSpec(filepath_png, filepath_svg, figsize=(10,6))
             for j, cpu in enumerate(cpus):
                 values = []
                 err_values = []
@@ -1584,39 +2683,68 @@ def main():
                     values.append(usage)
                     err_values.append(err)
                 offset = (j - (n_cpus - 1)/2) * width
-                bars = plt.bar(x + offset, values, width, yerr=err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label=f"CPU {cpu}")
-                for i, bar in enumerate(bars):
-                    plt.text(bar.get_x()+bar.get_width()/2, bar.get_height(), f"{bar.get_height():.2f}",
-                             ha='center', va='bottom')
-            plt.ylabel("Uso médio de CPU (%)")
-            plt.xlabel("Teste")
-            plt.title("Uso de CPU por teste (CPUs Selecionadas)")
-            plt.xticks(x, [format_label(test) for test in tests_sorted])
-            plt.legend(title="CPU")
-            plt.ylim(bottom=0)
-            plt.tight_layout()
-            prefix = "-".join(tests_sorted)
-            cpus_str = "-".join([f"cpu_{cpu}" for cpu in cpus])
-            filename_png = f"{prefix}-{cpus_str}-comparativo_cpu_por_teste.png"
-            filepath_png = os.path.join(resultados_dir, filename_png)
-            plt.savefig(filepath_png)
-            filename_svg = f"{prefix}-{cpus_str}-comparativo_cpu_por_teste.svg"
-            filepath_svg = os.path.join(resultados_dir, filename_svg)
-            plt.savefig(filepath_svg)
-            plt.close()
+                chart.call("bar", x + offset, values, width, yerr=err_values if mostrar_intervalo_confianca else None, capsize=5 if mostrar_intervalo_confianca else 0, label=f"CPU {cpu}")
+                for xi, v in zip(x + offset, values):
+                    chart.call("text", xi, v, f"{v:.2f}",
+                               ha='center', va='bottom')
+            chart.call("set_ylabel", "Uso médio de CPU (%)")
+            chart.call("set_xlabel", "Teste")
+            chart.call("set_title", "Uso de CPU por teste (CPUs Selecionadas)")
+            chart.call("set_xticks", x, [format_label(test) for test in tests_sorted])
+            chart.call("legend", title="CPU")
+            chart.call("set_ylim", bottom=0)
+            submit_chart(chart)
         plot_cpu_comparativo_por_teste_cpus(sumarizado_dir, tests, cpu_aggregate, cpus, mostrar_intervalo_confianca)
 
+    medias_ref = None
     if referencia:
         ref_test = referencia
         ref_dir = os.path.join(resultados_dir, ref_test)
-        if not os.path.isdir(ref_dir):
+        with stage("carga", teste=ref_test):
+            dados_ref = dados_testes.get(ref_test) or load_test_data(resultados_dir, ref_test)
+        if dados_ref is None:
             print(f"Aviso: Diretório do teste de referência {ref_dir} não encontrado.")
         else:
             print(f"\nProcessando teste de referência {format_label(ref_test)} ...")
-            vazao_ref = plot_vazao_barra_for_test(ref_dir, ref_test, mostrar_intervalo_confianca)
-            plot_vazao_com_referencia(sumarizado_dir, tests, vazao_aggregate, vazao_ref[1], ref_test, mostrar_intervalo_confianca)
-
-    write_markdown_summary(resultados_dir, tests, cpu_aggregate, vazao_aggregate, perda_aggregate)
+            if args.regime_permanente and ref_test not in dados_testes:
+                apply_steady_state(dados_ref)
+            if graficos:
+                # Se a referência também é um dos testes, a vazão e os seus gráficos já foram calculados
+                if ref_test in vazao_aggregate:
+                    vazao_ref_srv = vazao_aggregate[ref_test][1]
+                else:
+                    vazao_ref_srv = plot_vazao_barra_for_test(dados_ref, mostrar_intervalo_confianca)[1]
+                plot_vazao_com_referencia(sumarizado_dir, tests, vazao_aggregate, vazao_ref_srv, ref_test, mostrar_intervalo_confianca)
+            medias_ref = medias_rodadas.get(ref_test) or round_means_for_test(dados_ref, cpus or dados_ref.pinned_cores or None)
+
+    with stage("espera_graficos"):
+        desenhados, reaproveitados = wait_charts()
+    if reaproveitados:
+        print(f"\nGráficos redesenhados: {desenhados}; reaproveitados da última sumarização: {reaproveitados}")
+    with stage("markdown"):
+        write_markdown_summary(resultados_dir, tests, dados_testes, cpu_aggregate, vazao_aggregate, perda_aggregate, fluxos_aggregate, tcp_aggregate, eficiencia_aggregate, regime_aggregate, comparacoes, args.correcao,
+                               distribuicao_aggregate)
+
+    if args.salvar_linha_base:
+        with open(args.salvar_linha_base, "w", encoding="utf-8") as f:
+            save_baseline(f, medias_rodadas)
+        print(f"Linha de base gravada: {args.salvar_linha_base}")
+
+    if args.regressao:
+        limites = {"vazao": args.limite_vazao, "perda": args.limite_perda, "cpu": args.limite_cpu}
+        veredito_path = args.veredito or os.path.join(sumarizado_dir, "veredito_regressao.json")
+        if linha_base is not None:
+            medias_referencia = linha_base
+            descricao = {"linha_base": os.path.abspath(args.linha_base)}
+        elif medias_ref is not None:
+            medias_referencia = {test: medias_ref for test in tests}
+            descricao = {"teste": referencia}
+        else:
+            print("Erro: sem dados do teste de referência para verificar regressões.", file=sys.stderr)
+            return 2
+        with stage("regressao"):
+            return check_regression(tests, medias_rodadas, medias_referencia, descricao, limites, veredito_path, dados_testes)
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
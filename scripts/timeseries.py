@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Reamostragem das séries temporais das rodadas em uma grade de tempo comum.
+
+Cada amostra (intervalo do iperf3 ou janela de CPU) tem um início e um fim,
+em segundos desde o início da medição, e é atribuída ao passo da grade que
+contém o seu ponto médio. Assim, rodadas de durações diferentes não são
+truncadas à menor delas, e as séries do iperf3 e de CPU de uma mesma rodada
+ficam alinhadas passo a passo.
+
+Todas as rodadas (e todas as colunas, como os núcleos de CPU) são tratadas de
+uma só vez, com np.bincount sobre o índice (rodada, passo, coluna).
+
+As séries são reduzidas apenas para o desenho (downsample_minmax e
+envelope): os agregados e a exportação usam sempre a grade completa.
+"""
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+
+from confidence import half_width
+
+# Passo da grade comum (s)
+PASSO_PADRAO = 1.0
+# Duração assumida de cada amostra em CSVs sem as colunas inicio/fim
+INTERVALO_PADRAO = 1.0
+
+
+@dataclass
+class SerieReamostrada:
+    """Média entre rodadas em cada passo da grade, com o IC de 95%."""
+    tempo: np.ndarray         # início de cada passo (s)
+    media: np.ndarray         # NaN nos passos sem dados
+    contagem: np.ndarray      # rodadas com dados em cada passo
+    meia_largura: np.ndarray  # 0 nos passos com menos de duas rodadas
+
+
+def sample_times(df):
+    """
+    Início e fim de cada linha de 'df', em segundos desde o início da
+    medição. CSVs sem as colunas inicio/fim (resultados antigos) são tratados
+    como uma sequência de intervalos de INTERVALO_PADRAO segundos.
+    """
+    if "inicio" in df.columns and "fim" in df.columns:
+        inicio = df["inicio"].to_numpy(dtype=float)
+        fim = df["fim"].to_numpy(dtype=float)
+        if not (np.isnan(inicio).any() or np.isnan(fim).any()):
+            return inicio, fim
+    inicio = np.arange(len(df), dtype=float) * INTERVALO_PADRAO
+    return inicio, inicio + INTERVALO_PADRAO
+
+
+def grid_rounds(series, passo=PASSO_PADRAO):
+    """
+    Coloca as rodadas na grade comum. 'series' é uma lista, com um item por
+    rodada, de (inicio, fim, valores), onde 'valores' tem forma (amostras,) ou
+    (amostras, colunas). Retorna (tempo, matriz), com matriz de forma
+    (rodadas, passos, colunas) contendo a média de cada rodada em cada passo,
+    ou NaN onde a rodada não tem amostras.
+    """
+    if not series:
+        return np.zeros(0), np.zeros((0, 0, 1))
+    meios, valores, rodadas = [], [], []
+    for r, (inicio, fim, v) in enumerate(series):
+        inicio = np.asarray(inicio, dtype=float)
+        meios.append((inicio + np.asarray(fim, dtype=float)) / 2)
+        valores.append(np.asarray(v, dtype=float).reshape(len(inicio), -1))
+        rodadas.append(np.full(len(inicio), r, dtype=np.int64))
+    meio = np.concatenate(meios)
+    valores = np.concatenate(valores)
+    rodada = np.concatenate(rodadas)
+    n_rodadas, n_colunas = len(series), valores.shape[1]
+
+    indice = np.floor(meio / passo)
+    validas = np.isfinite(indice) & (indice >= 0)
+    n_passos = int(indice[validas].max()) + 1 if validas.any() else 0
+    indice = np.where(validas, indice, 0).astype(np.int64)
+
+    celula = (rodada * n_passos + indice)[:, None] * n_colunas + np.arange(n_colunas)
+    usar = validas[:, None] & ~np.isnan(valores)
+    tamanho = n_rodadas * n_passos * n_colunas
+    soma = np.bincount(celula[usar], weights=valores[usar], minlength=tamanho)
+    contagem = np.bincount(celula[usar], minlength=tamanho)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        matriz = soma / contagem
+    return np.arange(n_passos) * passo, matriz.reshape(n_rodadas, n_passos, n_colunas)
+
+
+def resample_rounds(series, passo=PASSO_PADRAO):
+    """
+    Média entre rodadas em cada passo da grade comum (veja grid_rounds), com
+    a quantidade de rodadas que têm dados no passo e a meia largura do IC de
+    95% (veja confidence.py). Se todos os 'valores' forem unidimensionais, os arrays retornados
+    também são.
+    """
+    tempo, matriz = grid_rounds(series, passo)
+    presente = ~np.isnan(matriz)
+    contagem = presente.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media = np.where(presente, matriz, 0.0).sum(axis=0) / contagem
+    meia_largura = half_width(matriz, bootstrap=False) if len(matriz) else np.zeros_like(media)
+    if all(np.ndim(v) == 1 for _, _, v in series):
+        media, contagem, meia_largura = media[:, 0], contagem[:, 0], meia_largura[:, 0]
+    return SerieReamostrada(tempo, media, contagem, meia_largura)
+
+
+def join_series(series, passo=PASSO_PADRAO):
+    """
+    Junta várias séries unidimensionais de uma mesma rodada (por exemplo,
+    vazão do iperf3 e uso de CPU) na grade comum. 'series' é uma lista de
+    (inicio, fim, valores). Retorna (tempo, matriz), com matriz de forma
+    (passos, séries), apenas com os passos em que todas as séries têm dados.
+    """
+    tempo, matriz = grid_rounds(series, passo)
+    matriz = matriz[:, :, 0].T
+    completos = ~np.isnan(matriz).any(axis=1)
+    return tempo[completos], matriz[completos]
+
+
+def _blocks(valores, colunas):
+    """
+    Divide 'valores' em no máximo 'colunas' blocos consecutivos de mesmo
+    tamanho (o último completado com NaN). Retorna (matriz de forma (blocos,
+    tamanho), tamanho).
+    """
+    n = len(valores)
+    tamanho = -(-n // colunas)
+    blocos = -(-n // tamanho)
+    completo = np.full(blocos * tamanho, np.nan)
+    completo[:n] = valores
+    return completo.reshape(blocos, tamanho), tamanho
+
+
+def downsample_minmax(x, y, colunas):
+    """
+    Reduz a série (x, y) para o desenho: divide-a em 'colunas' blocos (um
+    por pixel da largura do gráfico) e mantém, de cada bloco, a amostra de
+    menor e a de maior valor, na ordem do tempo. Picos e vales continuam
+    visíveis, e o tamanho e o tempo de desenho do gráfico passam a depender
+    da largura da figura, não da duração da medição. Blocos só com NaN viram
+    um NaN, mantendo as lacunas da linha. Séries com até 2 × 'colunas'
+    amostras são retornadas sem alteração.
+    """
+    if len(y) <= 2 * colunas:
+        return x, y
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    matriz, tamanho = _blocks(y, colunas)
+    ausente = np.isnan(matriz)
+    menor = np.argmin(np.where(ausente, np.inf, matriz), axis=1)
+    maior = np.argmax(np.where(ausente, -np.inf, matriz), axis=1)
+    indices = np.sort(np.stack([menor, maior], axis=1), axis=1) + (np.arange(len(matriz)) * tamanho)[:, None]
+    valores = y[indices]
+    valores[ausente.all(axis=1)] = np.nan
+    return x[indices].ravel(), valores.ravel()
+
+
+def envelope(x, inferior, superior, colunas):
+    """
+    Reduz uma faixa (por exemplo, o IC de 95%) para o desenho, com os mesmos
+    blocos de downsample_minmax: em cada bloco, o menor limite inferior e o
+    maior limite superior, do início ao fim do bloco. Faixas com até 2 ×
+    'colunas' amostras são retornadas sem alteração.
+    """
+    if len(x) <= 2 * colunas:
+        return x, inferior, superior
+    x = np.asarray(x, dtype=float)
+    matriz_inf, tamanho = _blocks(np.asarray(inferior, dtype=float), colunas)
+    matriz_sup, _ = _blocks(np.asarray(superior, dtype=float), colunas)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # blocos só com NaN
+        menor = np.nanmin(matriz_inf, axis=1)
+        maior = np.nanmax(matriz_sup, axis=1)
+    inicio = np.arange(len(matriz_inf)) * tamanho
+    fim = np.minimum(inicio + tamanho - 1, len(x) - 1)
+    tempo = np.stack([x[inicio], x[fim]], axis=1).ravel()
+    return tempo, np.repeat(menor, 2), np.repeat(maior, 2)